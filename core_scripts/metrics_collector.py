@@ -1,8 +1,9 @@
 """Metrics collection module."""
+import asyncio
 import time
 from typing import Any
 
-import psutil
+from dashboard.metrics import get_engine
 
 
 class MetricsCollector:
@@ -23,11 +24,14 @@ class MetricsCollector:
             return {}
 
         try:
+            # Starting the shared engine waits for its first round, so keep
+            # that off the event loop; afterwards readings are plain lookups.
+            engine = await asyncio.to_thread(get_engine)
             metrics = {
-                "cpu": self._get_cpu_metrics(),
-                "memory": self._get_memory_metrics(),
-                "disk": self._get_disk_metrics(),
-                "network": self._get_network_metrics(),
+                "cpu": self._get_cpu_metrics(engine),
+                "memory": self._get_memory_metrics(engine),
+                "disk": self._get_disk_metrics(engine),
+                "network": self._get_network_metrics(engine),
                 "timestamp": current_time,
             }
             self.last_collection = current_time
@@ -35,29 +39,30 @@ class MetricsCollector:
         except Exception:
             return {}
 
-    def _get_cpu_metrics(self) -> dict[str, float]:
+    def _get_cpu_metrics(self, engine) -> dict[str, float]:
         """Get CPU metrics.
 
         Returns:
             Dict containing CPU metrics.
         """
         try:
+            count, freq = engine.value("cpu_info")
             return {
-                "percent": psutil.cpu_percent(interval=None),
-                "count": psutil.cpu_count(),
-                "frequency": psutil.cpu_freq().current if psutil.cpu_freq() else 0,
+                "percent": engine.value("cpu"),
+                "count": count,
+                "frequency": freq.current if freq else 0,
             }
         except Exception:
             return {"percent": 0, "count": 0, "frequency": 0}
 
-    def _get_memory_metrics(self) -> dict[str, float]:
+    def _get_memory_metrics(self, engine) -> dict[str, float]:
         """Get memory metrics.
 
         Returns:
             Dict containing memory metrics.
         """
         try:
-            memory = psutil.virtual_memory()
+            memory = engine.value("memory")
             return {
                 "total": memory.total,
                 "available": memory.available,
@@ -67,14 +72,14 @@ class MetricsCollector:
         except Exception:
             return {"total": 0, "available": 0, "percent": 0, "used": 0}
 
-    def _get_disk_metrics(self) -> dict[str, float]:
+    def _get_disk_metrics(self, engine) -> dict[str, float]:
         """Get disk metrics.
 
         Returns:
             Dict containing disk metrics.
         """
         try:
-            disk = psutil.disk_usage("/")
+            disk = engine.value("disk")
             return {
                 "total": disk.total,
                 "used": disk.used,
@@ -84,14 +89,14 @@ class MetricsCollector:
         except Exception:
             return {"total": 0, "used": 0, "free": 0, "percent": 0}
 
-    def _get_network_metrics(self) -> dict[str, float]:
+    def _get_network_metrics(self, engine) -> dict[str, float]:
         """Get network metrics.
 
         Returns:
             Dict containing network metrics.
         """
         try:
-            net_io = psutil.net_io_counters()
+            net_io = engine.value("network")
             return {
                 "bytes_sent": net_io.bytes_sent,
                 "bytes_recv": net_io.bytes_recv,
@@ -33,8 +33,11 @@ def create_app(test_config=None):
         os.makedirs(app.instance_path)
 
     # Register blueprints
+    from .exposition import register_request_timer
+    from .request_timing import init_request_timing
     from .routes import bp as routes_bp
 
     app.register_blueprint(routes_bp)
+    register_request_timer(init_request_timing(app))
 
     return app
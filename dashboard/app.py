@@ -6,8 +6,13 @@ import os
 from flask import Flask
 from flask_cors import CORS
 
+from .auth.credentials import init_credentials
+from .auth.tokens import configure_token_verifier
+from .exposition import register_request_timer
 from .extensions import db, migrate
+from .request_timing import init_request_timing
 from .routes import bp as routes_bp
+from .storage import init_storage
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +35,9 @@ def create_app(config=None):
     if config:
         app.config.update(config)
 
+    # Tokens are verified outside the app context too, e.g. by the WebSocket server
+    configure_token_verifier(app.config["SECRET_KEY"])
+
     # Enable CORS
     CORS(app)
 
@@ -39,9 +47,12 @@ def create_app(config=None):
 
     # Register blueprints
     app.register_blueprint(routes_bp)
+    register_request_timer(init_request_timing(app))
 
     # Initialize extensions
-    db.init_app(app)
+    reader = init_storage(app, db)
     migrate.init_app(app, db)
+    with app.app_context():
+        init_credentials(app, db.engine, reader)
 
     return app
@@ -0,0 +1,427 @@
+"""Password hashing, credential stores and login rate limiting.
+
+Passwords are hashed with scrypt (PBKDF2-SHA256 is also understood) and
+stored as ``scrypt$n$r$p$salt$hash`` strings. Hashing is deliberately
+slow, so :class:`CredentialManager` runs it in a small worker pool with a
+bounded number of waiting jobs, and charges every attempt to a per-user
+token bucket before hashing anything: once a user's bucket is empty,
+further attempts are refused at once instead of queueing behind the pool.
+"""
+import asyncio
+import base64
+import functools
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SCRYPT_N = 2**14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+DEFAULT_HASH_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+DEFAULT_LOGIN_ATTEMPTS = 5
+DEFAULT_REFILL_SECONDS = 60.0
+
+_EXTENSION_KEY = "credentials"
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def hash_password(password: str, algorithm: str = "scrypt") -> str:
+    """Hash ``password`` with a new random salt.
+
+    Raises
+    ------
+        ValueError: If ``algorithm`` is not "scrypt" or "pbkdf2_sha256".
+    """
+    salt = os.urandom(SALT_BYTES)
+    if algorithm == "scrypt":
+        key = hashlib.scrypt(
+            password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=KEY_BYTES,
+        )
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(key)}"
+    if algorithm == "pbkdf2_sha256":
+        key = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PBKDF2_ITERATIONS, KEY_BYTES)
+        return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64encode(salt)}${_b64encode(key)}"
+    msg = f"Unknown password hash algorithm: {algorithm}"
+    raise ValueError(msg)
+
+
+def _legacy_hash(password: str) -> str:
+    # Salted SHA-256 once written by get_secure_hash
+    salt = os.environ.get("AUTH_SALT", "default_salt")
+    return hashlib.sha256(f"{password}{salt}".encode()).hexdigest()
+
+
+def check_password(password: str, encoded: str) -> bool:
+    """Check ``password`` against a stored hash in any supported format."""
+    try:
+        scheme, *fields = encoded.split("$")
+        if scheme == "scrypt":
+            n, r, p, salt, expected = fields
+            actual = hashlib.scrypt(
+                password.encode(),
+                salt=base64.b64decode(salt),
+                n=int(n),
+                r=int(r),
+                p=int(p),
+                dklen=len(base64.b64decode(expected)),
+            )
+        elif scheme == "pbkdf2_sha256":
+            iterations, salt, expected = fields
+            actual = hashlib.pbkdf2_hmac(
+                "sha256", password.encode(), base64.b64decode(salt), int(iterations),
+                len(base64.b64decode(expected)),
+            )
+        elif not fields and len(encoded) == 64:
+            return hmac.compare_digest(_legacy_hash(password), encoded)
+        else:
+            return False
+    except (ValueError, TypeError):
+        logger.warning("Unreadable password hash")
+        return False
+    return hmac.compare_digest(actual, base64.b64decode(expected))
+
+
+def needs_rehash(encoded: str) -> bool:
+    """Whether ``encoded`` is weaker than what :func:`hash_password` writes now."""
+    fields = encoded.split("$")
+    return fields[0] != "scrypt" or fields[1:4] != [str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+
+
+@functools.lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    # Checked for unknown users so they take as long as known ones
+    return hash_password(_b64encode(os.urandom(12)))
+
+
+class CredentialStore:
+    """Where password hashes are kept; subclass to plug in another backend."""
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get the stored hash of ``username``, or ``None`` for unknown users."""
+        raise NotImplementedError
+
+    def set_password_hash(self, username: str, password_hash: str) -> None:
+        """Store the hash of ``username``, creating the user if needed."""
+        raise NotImplementedError
+
+
+class SQLCredentialStore(CredentialStore):
+    """Credentials in the ``users`` table of the dashboard database."""
+
+    def __init__(
+        self, engine: Engine, table: str = "users", reader: Optional[Engine] = None,
+    ) -> None:
+        """Initialize the store writing to ``engine`` and reading from ``reader``, if given."""
+        self.engine = engine
+        self.reader = reader or engine
+        self.table = table
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get the stored hash of ``username``, or ``None`` for unknown users."""
+        query = text(f"SELECT password_hash FROM {self.table} WHERE username = :username")
+        try:
+            with self.reader.connect() as connection:
+                row = connection.execute(query, {"username": username}).first()
+        except SQLAlchemyError as e:
+            logger.error(f"Error reading credentials of {username}: {e}")
+            return None
+        return None if row is None else row[0]
+
+    def set_password_hash(self, username: str, password_hash: str) -> None:
+        """Store the hash of ``username``, creating the user if needed."""
+        parameters = {"username": username, "password_hash": password_hash}
+        with self.engine.begin() as connection:
+            updated = connection.execute(
+                text(
+                    f"UPDATE {self.table} SET password_hash = :password_hash"
+                    " WHERE username = :username",
+                ),
+                parameters,
+            )
+            if updated.rowcount == 0:
+                connection.execute(
+                    text(
+                        f"INSERT INTO {self.table} (username, password_hash, created_at)"
+                        " VALUES (:username, :password_hash, :created_at)",
+                    ),
+                    {
+                        **parameters,
+                        "created_at": datetime.utcnow().isoformat(sep=" ", timespec="microseconds"),
+                    },
+                )
+
+
+class EnvironmentCredentialStore(CredentialStore):
+    """The single admin account of ``ADMIN_USER`` and ``ADMIN_PASS``."""
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get the admin hash if ``username`` is the admin."""
+        admin_user = os.environ.get("ADMIN_USER")
+        if not admin_user or username != admin_user:
+            return None
+        return os.environ.get("ADMIN_PASS")
+
+    def set_password_hash(self, username: str, password_hash: str) -> None:
+        """Replace the admin account."""
+        os.environ["ADMIN_USER"] = username
+        os.environ["ADMIN_PASS"] = password_hash
+
+
+class ChainCredentialStore(CredentialStore):
+    """Look users up in several stores in turn; new hashes go to the first.
+
+    Chaining the users table before the environment lets the legacy admin
+    account log in and moves its hash into the table on first login.
+    """
+
+    def __init__(self, *stores: CredentialStore) -> None:
+        """Initialize the chain, most preferred store first."""
+        self.stores = stores
+
+    def get_password_hash(self, username: str) -> Optional[str]:
+        """Get the hash from the first store that knows ``username``."""
+        for store in self.stores:
+            password_hash = store.get_password_hash(username)
+            if password_hash is not None:
+                return password_hash
+        return None
+
+    def set_password_hash(self, username: str, password_hash: str) -> None:
+        """Store the hash in the first store."""
+        self.stores[0].set_password_hash(username, password_hash)
+
+
+class LoginRateLimiter:
+    """Token bucket of login attempts per user.
+
+    Each user may make ``capacity`` attempts in a burst and gets one more
+    every ``refill_seconds``. Buckets that have refilled completely hold no
+    information, so they are dropped when more than ``max_tracked`` users
+    are tracked, and the oldest buckets after them if that is not enough.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_LOGIN_ATTEMPTS,
+        refill_seconds: float = DEFAULT_REFILL_SECONDS,
+        max_tracked: int = 10000,
+    ) -> None:
+        """Initialize the limiter."""
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self.max_tracked = max_tracked
+        # Username to [tokens, time.monotonic() of the last update]
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str, now: float) -> List[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_tracked:
+                self._prune(now)
+                if len(self._buckets) >= self.max_tracked:
+                    del self._buckets[next(iter(self._buckets))]
+            bucket = self._buckets[key] = [float(self.capacity), now]
+        else:
+            bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) / self.refill_seconds)
+            bucket[1] = now
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        full = [
+            key for key, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) / self.refill_seconds >= self.capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+
+    def acquire(self, key: str) -> bool:
+        """Take one attempt from the bucket of ``key``; False if it is empty."""
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            if bucket[0] < 1:
+                return False
+            bucket[0] -= 1
+            return True
+
+    def refund(self, key: str) -> None:
+        """Give back the attempt of a successful login."""
+        with self._lock:
+            bucket = self._bucket(key, time.monotonic())
+            bucket[0] = min(self.capacity, bucket[0] + 1)
+
+
+class CredentialManager:
+    """Check and set passwords off the request thread.
+
+    At most ``workers`` hashes run at once and at most ``max_pending`` wait;
+    an attempt beyond that, or one from a user whose token bucket is empty,
+    fails without hashing, so a brute-force run cannot queue work in front
+    of other users' logins.
+    """
+
+    def __init__(
+        self,
+        store: CredentialStore,
+        workers: int = DEFAULT_HASH_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        limiter: Optional[LoginRateLimiter] = None,
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+        ----
+            store: Where password hashes are kept.
+            workers: Threads hashing passwords.
+            max_pending: Most hashing jobs running or waiting at once.
+            limiter: Per-user attempt limiter; a default one if omitted.
+        """
+        self.store = store
+        self.limiter = limiter or LoginRateLimiter()
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _submit(self, function: Any, *args: Any) -> Optional[Future]:
+        if not self._slots.acquire(blocking=False):
+            return None
+        future = self._executor.submit(function, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _check(self, username: str, password: str) -> bool:
+        encoded = self.store.get_password_hash(username)
+        if not check_password(password, encoded or _dummy_hash()) or encoded is None:
+            return False
+        if needs_rehash(encoded):
+            try:
+                self.store.set_password_hash(username, hash_password(password))
+            except SQLAlchemyError as e:
+                logger.error(f"Error upgrading password hash of {username}: {e}")
+        return True
+
+    def submit_check(self, username: str, password: str) -> Optional["Future[bool]"]:
+        """Start checking a login attempt.
+
+        Returns
+        -------
+            A future of the result, or ``None`` if the attempt was refused
+            by the rate limiter or because the pool is full.
+        """
+        if not self.limiter.acquire(username):
+            self.rejected += 1
+            return None
+        future = self._submit(self._check, username, password)
+        if future is None:
+            self.limiter.refund(username)
+            self.rejected += 1
+            logger.warning("Password hashing pool is full; refusing login attempt")
+            return None
+        future.add_done_callback(lambda done: self._settle(username, done))
+        return future
+
+    def _settle(self, username: str, future: "Future[bool]") -> None:
+        # Only failed attempts count against the user
+        if future.exception() is None and future.result():
+            self.limiter.refund(username)
+
+    def authenticate(self, username: str, password: str, timeout: Optional[float] = None) -> bool:
+        """Check a login attempt, waiting up to ``timeout`` seconds for the result."""
+        future = self.submit_check(username, password)
+        return future is not None and future.result(timeout)
+
+    async def authenticate_async(self, username: str, password: str) -> bool:
+        """Check a login attempt without blocking the event loop."""
+        future = self.submit_check(username, password)
+        return future is not None and await asyncio.wrap_future(future)
+
+    def set_password(self, username: str, password: str) -> None:
+        """Hash and store a new password for ``username``, creating the user if needed."""
+        self._executor.submit(
+            lambda: self.store.set_password_hash(username, hash_password(password)),
+        ).result()
+
+    def shutdown(self) -> None:
+        """Stop the hashing threads."""
+        self._executor.shutdown(wait=True)
+
+
+_manager: Optional[CredentialManager] = None
+_manager_lock = threading.Lock()
+
+
+def configure_credentials(store: CredentialStore, **options: Any) -> CredentialManager:
+    """Replace the shared credential manager with one for ``store``.
+
+    Args:
+    ----
+        store: Where password hashes are kept.
+        **options: Passed to :class:`CredentialManager`.
+
+    Returns:
+    -------
+        CredentialManager: The new shared manager.
+    """
+    global _manager
+    with _manager_lock:
+        previous, _manager = _manager, CredentialManager(store, **options)
+    if previous is not None:
+        previous.shutdown()
+    return _manager
+
+
+def init_credentials(
+    app: Flask, engine: Engine, reader: Optional[Engine] = None,
+) -> CredentialManager:
+    """Keep credentials in the ``users`` table of ``engine``, configured from ``app``.
+
+    Lookups go through ``reader`` when given, so logins do not queue behind
+    writes. The ``ADMIN_USER`` account stays usable until it is moved into
+    the table.
+    """
+    manager = configure_credentials(
+        ChainCredentialStore(
+            SQLCredentialStore(engine, reader=reader), EnvironmentCredentialStore(),
+        ),
+        workers=app.config.get("AUTH_HASH_WORKERS", DEFAULT_HASH_WORKERS),
+        max_pending=app.config.get("AUTH_MAX_PENDING", DEFAULT_MAX_PENDING),
+        limiter=LoginRateLimiter(
+            app.config.get("AUTH_LOGIN_ATTEMPTS", DEFAULT_LOGIN_ATTEMPTS),
+            app.config.get("AUTH_LOGIN_REFILL_SECONDS", DEFAULT_REFILL_SECONDS),
+        ),
+    )
+    app.extensions[_EXTENSION_KEY] = manager
+    return manager
+
+
+def get_credential_manager() -> CredentialManager:
+    """Get the shared manager, falling back to the ``ADMIN_USER`` account."""
+    global _manager
+    manager = _manager
+    if manager is not None:
+        return manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = CredentialManager(EnvironmentCredentialStore())
+        return _manager
@@ -2,41 +2,42 @@
 import functools
 import hashlib
 import os
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Any, Callable, Optional, TypeVar, Union, cast
 
-import jwt
-from flask import Response, current_app, redirect, request, session, url_for
+from flask import Response, redirect, request, session, url_for
+
+from .credentials import get_credential_manager, hash_password
+from .tokens import configure_token_verifier, get_token_verifier
 
 F = TypeVar("F", bound=Callable[..., Any])
 
 
 def create_token(payload: dict[str, Any]) -> str:
     """Create a JWT token with the given payload."""
-    secret_key = current_app.config.get(
-        "SECRET_KEY", os.environ.get("SECRET_KEY", "default-secret-key"),
-    )
-    if not payload.get("exp"):
-        payload["exp"] = datetime.utcnow() + timedelta(hours=24)
-    encoded = jwt.encode(payload, secret_key, algorithm="HS256")
-    return encoded if isinstance(encoded, str) else str(encoded)
+    return get_token_verifier().issue(payload, timedelta(hours=24))
 
 
 def verify_token(token: str) -> Optional[dict[str, Any]]:
-    """Verify and decode a JWT token."""
-    try:
-        secret_key = current_app.config.get(
-            "SECRET_KEY", os.environ.get("SECRET_KEY", "default-secret-key"),
-        )
-        return cast(dict[str, Any], jwt.decode(token, secret_key, algorithms=["HS256"]))
-    except jwt.ExpiredSignatureError:
-        return None
-    except jwt.InvalidTokenError:
-        return None
+    """Verify and decode a JWT token.
+
+    Works outside a Flask app context; tokens already verified are served
+    from the shared verifier's cache until they expire.
+    """
+    return get_token_verifier().verify(token)
+
+
+def revoke_token(token: str) -> bool:
+    """Reject a token from now on, e.g. after logout; ``False`` if it was not valid."""
+    return get_token_verifier().revoke(token)
 
 
 def get_secure_hash(password: str) -> str:
-    """Create a secure hash of the password."""
+    """Create the legacy salted SHA-256 of the password.
+
+    Only kept to produce hashes for old ``ADMIN_PASS`` values; new
+    passwords are hashed with :func:`~dashboard.auth.credentials.hash_password`.
+    """
     salt = os.environ.get("AUTH_SALT", "default_salt")
     return hashlib.sha256(f"{password}{salt}".encode()).hexdigest()
 
@@ -44,11 +45,12 @@ def get_secure_hash(password: str) -> str:
 def init_auth(app: Any) -> None:
     """Initialize authentication for the application."""
     app.secret_key = os.environ.get("SECRET_KEY", os.urandom(24))
+    configure_token_verifier(app.secret_key)
     # Set default admin credentials if not in environment
     if "ADMIN_USER" not in os.environ:
         os.environ["ADMIN_USER"] = "admin"
     if "ADMIN_PASS" not in os.environ:
-        os.environ["ADMIN_PASS"] = get_secure_hash("admin")
+        os.environ["ADMIN_PASS"] = hash_password("admin")
 
 
 def login_required(f: F) -> F:
@@ -64,13 +66,12 @@ def login_required(f: F) -> F:
 
 
 def authenticate(username: str, password: str) -> bool:
-    """Authenticate a user with username and password."""
-    admin_user = os.environ.get("ADMIN_USER")
-    admin_pass = os.environ.get("ADMIN_PASS")
-    if not admin_user or not admin_pass:
-        return False
-    hashed_password = get_secure_hash(password)
-    return username == admin_user and hashed_password == admin_pass
+    """Authenticate a user with username and password.
+
+    The password is checked in the credential manager's hashing pool; too
+    many failed attempts for a user are refused without hashing.
+    """
+    return get_credential_manager().authenticate(username, password)
 
 
 def auth_required(f: F) -> F:
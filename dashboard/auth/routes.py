@@ -4,7 +4,7 @@ from typing import Union
 from flask import Blueprint, redirect, render_template, request, session, url_for
 from werkzeug.wrappers import Response as WerkzeugResponse
 
-from dashboard.auth.middleware import authenticate, create_token
+from dashboard.auth.middleware import authenticate, create_token, revoke_token
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -32,6 +32,9 @@ def login() -> Union[str, WerkzeugResponse]:
 def logout() -> WerkzeugResponse:
     """Handle logout requests."""
     session.clear()
+    token = request.cookies.get("auth_token")
+    if token:
+        revoke_token(token)
     response = redirect(url_for("auth.login"))
     response.delete_cookie("auth_token")
     return response
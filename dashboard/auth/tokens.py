@@ -0,0 +1,269 @@
+"""JWT verification with a cache of verified tokens.
+
+:class:`TokenVerifier` holds the signing key itself, so tokens can be
+verified outside a Flask app context such as in the WebSocket server.
+Verified tokens are remembered in a bounded LRU keyed by the SHA-256 of
+the token until their ``exp``, so a client reconnecting with the same
+token costs one hash and a dictionary lookup instead of a full decode and
+HMAC. Revoked tokens and token IDs are checked against sets on every call;
+only tokens with a valid signature can be revoked, and each revocation is
+forgotten once the token would have expired anyway.
+"""
+import hashlib
+import heapq
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+import jwt
+from flask import current_app, has_app_context
+
+DEFAULT_ALGORITHM = "HS256"
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_MAX_REVOKED = 100000
+DEFAULT_TOKEN_LIFETIME = timedelta(hours=24)
+DEFAULT_SECRET_KEY = "default-secret-key"
+
+# Cached payload and the time.time() it expires at
+_Entry = Tuple[Dict[str, Any], float]
+
+
+def token_digest(token: Union[str, bytes]) -> bytes:
+    """Get the cache and revocation key of ``token``."""
+    if isinstance(token, str):
+        token = token.encode()
+    return hashlib.sha256(token).digest()
+
+
+class _RevocationSet:
+    """Bounded set of keys, each forgotten after its own expiry time.
+
+    Expiry times are kept in a heap, so pruning only looks at the entries
+    that are due. Past ``maxsize`` the entry expiring first is dropped,
+    which forgets the revocation that matters for the shortest time.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._forget_at: Dict[Hashable, float] = {}
+        self._heap: List[Tuple[float, Hashable]] = []
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._forget_at
+
+    def __len__(self) -> int:
+        return len(self._forget_at)
+
+    def add(self, key: Hashable, forget_at: float, now: float) -> None:
+        self._prune(now)
+        if forget_at < self._forget_at.get(key, -math.inf):
+            return
+        self._forget_at[key] = forget_at
+        heapq.heappush(self._heap, (forget_at, key))
+        while len(self._forget_at) > self.maxsize:
+            self._pop()
+
+    def _prune(self, now: float) -> None:
+        while self._heap and self._heap[0][0] < now:
+            self._pop()
+
+    def _pop(self) -> None:
+        forget_at, key = heapq.heappop(self._heap)
+        # Entries replaced by a later expiry leave stale heap items behind
+        if self._forget_at.get(key) == forget_at:
+            del self._forget_at[key]
+
+
+class TokenVerifier:
+    """Issue and verify JWTs with a bounded cache of verified tokens."""
+
+    def __init__(
+        self,
+        secret_key: Union[str, bytes],
+        algorithms: Sequence[str] = (DEFAULT_ALGORITHM,),
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        leeway: float = 0.0,
+        max_revoked: int = DEFAULT_MAX_REVOKED,
+    ) -> None:
+        """Initialize the verifier.
+
+        Args:
+        ----
+            secret_key: HMAC key tokens are signed with.
+            algorithms: Accepted signing algorithms; the first signs new tokens.
+            maxsize: Most verified tokens kept in the cache.
+            leeway: Seconds a token is still accepted after its ``exp``.
+            max_revoked: Most revoked tokens and most revoked token IDs
+                remembered; past it the revocations expiring first go.
+        """
+        self.algorithms = list(algorithms)
+        self.maxsize = maxsize
+        self.leeway = leeway
+        self.hits = 0
+        self.misses = 0
+        self._secret_key = secret_key
+        self._cache: "OrderedDict[bytes, _Entry]" = OrderedDict()
+        # Revoked digests and token IDs until they can be forgotten
+        self._revoked = _RevocationSet(max_revoked)
+        self._revoked_ids = _RevocationSet(max_revoked)
+        self._lock = threading.Lock()
+
+    def set_key(self, secret_key: Union[str, bytes]) -> None:
+        """Switch to a new signing key, forgetting tokens verified with the old one."""
+        with self._lock:
+            self._secret_key = secret_key
+            self._cache.clear()
+
+    def issue(self, payload: Dict[str, Any], lifetime: timedelta = DEFAULT_TOKEN_LIFETIME) -> str:
+        """Sign ``payload``, adding an ``exp`` of ``lifetime`` from now if it has none."""
+        if not payload.get("exp"):
+            payload["exp"] = datetime.utcnow() + lifetime
+        encoded = jwt.encode(payload, self._secret_key, algorithm=self.algorithms[0])
+        return encoded if isinstance(encoded, str) else str(encoded)
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """Verify ``token`` and get its claims.
+
+        Returns
+        -------
+            A copy of the claims, or ``None`` if the token is invalid,
+            expired or revoked.
+        """
+        digest = token_digest(token)
+        now = time.time()
+        with self._lock:
+            if digest in self._revoked:
+                return None
+            entry = self._cache.get(digest)
+            if entry is not None:
+                payload, expires = entry
+                if now <= expires and payload.get("jti") not in self._revoked_ids:
+                    self._cache.move_to_end(digest)
+                    self.hits += 1
+                    return dict(payload)
+                if now > expires:
+                    del self._cache[digest]
+            self.misses += 1
+            secret_key = self._secret_key
+
+        try:
+            payload = jwt.decode(token, secret_key, algorithms=self.algorithms, leeway=self.leeway)
+        except jwt.InvalidTokenError:
+            return None
+        expires = _expiry(payload) + self.leeway
+
+        with self._lock:
+            if digest in self._revoked or payload.get("jti") in self._revoked_ids:
+                return None
+            # A key change while decoding leaves the result uncached
+            if secret_key == self._secret_key:
+                self._cache[digest] = (payload, expires)
+                self._cache.move_to_end(digest)
+                if len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+        return dict(payload)
+
+    def revoke(self, token: str) -> bool:
+        """Reject ``token`` from now on, even though its signature is valid.
+
+        Tokens that do not verify are rejected anyway and are not stored,
+        so revoking arbitrary strings costs no memory.
+
+        Returns
+        -------
+            Whether the token was valid and is now revoked.
+        """
+        with self._lock:
+            secret_key = self._secret_key
+        try:
+            claims = jwt.decode(token, secret_key, algorithms=self.algorithms, leeway=self.leeway)
+        except jwt.InvalidTokenError:
+            return False
+        digest = token_digest(token)
+        with self._lock:
+            self._revoked.add(digest, _expiry(claims) + self.leeway, time.time())
+            self._cache.pop(digest, None)
+        return True
+
+    def revoke_id(self, jti: str, expires: float = math.inf) -> None:
+        """Reject every token with ID ``jti``.
+
+        Args:
+        ----
+            jti: Token ID claim to reject.
+            expires: ``time.time()`` after which no such token is valid
+                anyway and the ID can be forgotten.
+        """
+        with self._lock:
+            self._revoked_ids.add(jti, expires + self.leeway, time.time())
+
+    def is_revoked(self, token: str) -> bool:
+        """Whether ``token`` itself has been revoked."""
+        return token_digest(token) in self._revoked
+
+    def stats(self) -> Dict[str, int]:
+        """Get cache hit, miss and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "revoked": len(self._revoked) + len(self._revoked_ids),
+        }
+
+    def clear(self) -> None:
+        """Drop all cached tokens and reset the counters."""
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def _expiry(claims: Dict[str, Any]) -> float:
+    exp = claims.get("exp")
+    return math.inf if exp is None else float(exp)
+
+
+_verifier: Optional[TokenVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def default_secret_key() -> Union[str, bytes]:
+    """Get the current app's ``SECRET_KEY``, falling back to the environment."""
+    fallback = os.environ.get("SECRET_KEY", DEFAULT_SECRET_KEY)
+    if has_app_context():
+        return current_app.config.get("SECRET_KEY") or fallback
+    return fallback
+
+
+def configure_token_verifier(secret_key: Union[str, bytes], **options: Any) -> TokenVerifier:
+    """Replace the shared verifier with one for ``secret_key``.
+
+    Args:
+    ----
+        secret_key: HMAC key tokens are signed with.
+        **options: Passed to :class:`TokenVerifier`.
+
+    Returns:
+    -------
+        TokenVerifier: The new shared verifier.
+    """
+    global _verifier
+    with _verifier_lock:
+        _verifier = TokenVerifier(secret_key, **options)
+        return _verifier
+
+
+def get_token_verifier() -> TokenVerifier:
+    """Get the shared verifier, creating it from :func:`default_secret_key` on first use."""
+    global _verifier
+    verifier = _verifier
+    if verifier is not None:
+        return verifier
+    with _verifier_lock:
+        if _verifier is None:
+            _verifier = TokenVerifier(default_secret_key())
+        return _verifier
@@ -0,0 +1,182 @@
+"""Asynchronous metrics collector engine with pluggable sources."""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Source:
+    """A blocking probe sampled on its own interval.
+
+    Attributes
+    ----------
+        name: Key the readings are published under.
+        probe: Blocking callable returning the current value.
+        interval: Seconds between samples.
+    """
+
+    name: str
+    probe: Callable[[], Any]
+    interval: float = 1.0
+
+
+@dataclass(frozen=True)
+class Reading:
+    """The latest value of a source and when it was taken."""
+
+    value: Any
+    timestamp: float
+
+
+class CollectorEngine:
+    """Sample independent sources concurrently without blocking the caller.
+
+    Threading model: the engine runs on one asyncio event loop, either the
+    caller's (``await engine.run()``) or a dedicated daemon thread started
+    with :meth:`start`. Every probe is blocking psutil code and runs in the
+    loop's default thread pool via :func:`asyncio.to_thread`, so a slow probe
+    never delays the others and each source keeps its own interval.
+
+    Readings are published by replacing the readings mapping wholesale, so
+    readers on any thread call :meth:`readings` without locking and always
+    see a consistent mapping that is never mutated afterwards.
+    """
+
+    def __init__(self, sources: Iterable[Source]) -> None:
+        self.sources = {source.name: source for source in sources}
+        self._readings: dict[str, Reading] = {}
+        self._version = 0
+        self._publish_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Counter bumped on every published reading."""
+        return self._version
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def readings(self) -> dict[str, Reading]:
+        """Get the latest reading of every source sampled so far."""
+        return self._readings
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """Get the latest value of source ``name``."""
+        reading = self._readings.get(name)
+        return default if reading is None else reading.value
+
+    async def sample(self, source: Source) -> Reading:
+        """Run one probe in the thread pool and publish its reading."""
+        value = await asyncio.to_thread(source.probe)
+        reading = Reading(value, time.time())
+        with self._publish_lock:
+            self._readings = {**self._readings, source.name: reading}
+            self._version += 1
+        return reading
+
+    async def collect(self, names: Optional[Iterable[str]] = None) -> dict[str, Reading]:
+        """Sample sources concurrently, once each.
+
+        Args:
+        ----
+            names: Sources to sample; defaults to all of them.
+
+        Returns:
+        -------
+            dict: Latest readings after the round completes. A failing probe
+            is logged and keeps its previous reading.
+        """
+        sources = [self.sources[name] for name in (names or self.sources)]
+        results = await asyncio.gather(
+            *(self.sample(source) for source in sources),
+            return_exceptions=True,
+        )
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error sampling {source.name}: {result}")
+        return self._readings
+
+    def collect_now(self) -> dict[str, Reading]:
+        """Sample every source once from synchronous code.
+
+        Raises
+        ------
+            RuntimeError: If called from a thread running an event loop, which
+                blocking would stall or, on the engine's own loop, deadlock;
+                ``await collect()`` there instead.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            msg = "collect_now() would block a running event loop; await collect() instead"
+            raise RuntimeError(msg)
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            return asyncio.run_coroutine_threadsafe(self.collect(), loop).result()
+        return asyncio.run(self.collect())
+
+    async def run(self) -> None:
+        """Sample every source on its own interval until cancelled."""
+        await asyncio.gather(*(self._poll(source) for source in self.sources.values()))
+
+    def start(self) -> None:
+        """Start the engine thread after publishing one full round."""
+        with self._lock:
+            if self.is_running:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=asyncio.run,
+                args=(self._main(ready),),
+                name="collector-engine",
+                daemon=True,
+            )
+            self._thread.start()
+            ready.wait()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the engine thread and wait for it to exit."""
+        with self._lock:
+            if self._loop is not None and self._stop is not None:
+                self._loop.call_soon_threadsafe(self._stop.set)
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+    async def _main(self, ready: threading.Event) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        try:
+            await self.collect()
+        finally:
+            ready.set()
+        runner = asyncio.create_task(self.run())
+        await self._stop.wait()
+        runner.cancel()
+        try:
+            await runner
+        except asyncio.CancelledError:
+            pass
+        self._loop = None
+        self._stop = None
+
+    async def _poll(self, source: Source) -> None:
+        while True:
+            await asyncio.sleep(source.interval)
+            try:
+                await self.sample(source)
+            except Exception as e:
+                logger.error(f"Error sampling {source.name}: {e}")
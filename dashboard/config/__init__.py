@@ -1,21 +1,24 @@
 """Configuration module for the dashboard."""
 import json
 import os
-from typing import Any, Optional
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Optional
 
 from .config import ConfigError as ConfigurationError
 from .config import ConfigManager
 from .schema import ValidationResult
+from .snapshot import ConfigSnapshot
 
 _config_manager: Optional[ConfigManager] = None
 
 
-def init_config(config_path: Optional[str] = None) -> None:
+def init_config(config_path: Optional[str] = None, watch: bool = True) -> None:
     """Initialize the configuration manager.
 
     Args:
     ----
         config_path: Optional path to config file. If not provided, uses CONFIG_PATH env var or default.
+        watch: Reload the configuration when the file changes.
     """
     global _config_manager
     if _config_manager is not None:
@@ -33,6 +36,8 @@ def init_config(config_path: Optional[str] = None) -> None:
             with open(config_path, "w") as f:
                 json.dump(DEFAULT_CONFIG, f, indent=4)
         _config_manager = ConfigManager(config_path)
+        if watch:
+            _config_manager.watch()
     except Exception as e:
         # Reset manager on failure
         _config_manager = None
@@ -40,12 +45,30 @@ def init_config(config_path: Optional[str] = None) -> None:
         raise ConfigurationError(msg)
 
 
-def get_config() -> dict[str, Any]:
-    """Get the current configuration."""
+def get_snapshot() -> ConfigSnapshot:
+    """Get the current configuration snapshot."""
     if _config_manager is None:
         msg = "Configuration manager not initialized"
         raise ConfigurationError(msg)
-    return _config_manager.get_config()
+    return _config_manager.snapshot()
+
+
+def subscribe(callback: Callable[[ConfigSnapshot], None]) -> Callable[[], None]:
+    """Call ``callback`` with every new configuration snapshot.
+
+    Returns
+    -------
+        Function that removes the subscription.
+    """
+    if _config_manager is None:
+        msg = "Configuration manager not initialized"
+        raise ConfigurationError(msg)
+    return _config_manager.subscribe(callback)
+
+
+def get_config() -> Mapping[str, Any]:
+    """Get the current configuration as a read-only mapping."""
+    return get_snapshot().data
 
 
 def update_config(updates: dict[str, Any]) -> ValidationResult:
@@ -56,71 +79,44 @@ def update_config(updates: dict[str, Any]) -> ValidationResult:
     return _config_manager.update_config(updates)
 
 
-def get_metric_thresholds() -> dict[str, float]:
+def get_metric_thresholds() -> Mapping[str, float]:
     """Get metric thresholds from config."""
-    config = get_config()
-    return config.get("metrics", {}).get("thresholds", {"cpu": 80.0, "memory": 90.0, "disk": 85.0})
+    return get_snapshot().metric_thresholds
 
 
-def get_websocket_config() -> dict[str, Any]:
+def get_websocket_config() -> Mapping[str, Any]:
     """Get websocket configuration."""
-    config = get_config()
-    return config.get("websocket", {"host": "localhost", "port": 8765, "ssl": False})
+    return get_snapshot().websocket
 
 
-def get_influxdb_config() -> dict[str, Any]:
+def get_influxdb_config() -> Mapping[str, Any]:
     """Get InfluxDB configuration."""
-    config = get_config()
-    return config.get(
-        "influxdb",
-        {"url": "http://localhost:8086", "token": "", "org": "", "bucket": ""},
-    )
+    return get_snapshot().influxdb
 
 
-def get_alert_rules() -> dict[str, Any]:
+def get_alert_rules() -> Sequence[Mapping[str, Any]]:
     """Get alert rules from config."""
-    config = get_config()
-    return config.get("alert_rules", [])
+    return get_snapshot().alert_rules
 
 
-def get_logging_config() -> dict[str, Any]:
+def get_logging_config() -> Mapping[str, Any]:
     """Get logging configuration."""
-    config = get_config()
-    return config.get(
-        "logging",
-        {
-            "level": "INFO",
-            "file": "dashboard.log",
-            "format": "%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)",
-        },
-    )
+    return get_snapshot().logging
 
 
 def is_production() -> bool:
     """Check if running in production environment."""
-    config = get_config()
-    return config.get("environment") == "production"
+    return get_snapshot().production
 
 
-def get_database_config() -> dict[str, Any]:
+def get_database_config() -> Mapping[str, Any]:
     """Get database configuration."""
-    config = get_config()
-    return config.get(
-        "database",
-        {
-            "host": "localhost",
-            "port": 5432,
-            "name": "dashboard",
-            "user": "postgres",
-            "password": "",
-        },
-    )
-
-
-def get_ui_config() -> dict[str, Any]:
+    return get_snapshot().database
+
+
+def get_ui_config() -> Mapping[str, Any]:
     """Get UI configuration."""
-    config = get_config()
-    return config.get("ui", {"theme": "light", "refresh_interval": 5000, "max_datapoints": 100})
+    return get_snapshot().ui
 
 
 def validate_config(config: dict[str, Any]) -> ValidationResult:
@@ -142,6 +138,9 @@ def update_alert_rules(rules: list) -> ValidationResult:
 __all__ = [
     "init_config",
     "get_config",
+    "get_snapshot",
+    "subscribe",
+    "ConfigSnapshot",
     "update_config",
     "ConfigurationError",
     "get_metric_thresholds",
@@ -1,7 +1,15 @@
 import json
-from typing import Any, Optional
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Optional
 
 from .schema import ValidationResult
+from .snapshot import ConfigSnapshot, ConfigWatcher, Signature, file_signature, thaw
+
+logger = logging.getLogger(__name__)
 
 
 class ConfigurationError(Exception):
@@ -12,6 +20,14 @@ ConfigError = ConfigurationError  # For backwards compatibility
 
 
 class ConfigManager:
+    """Own the configuration file and publish it as versioned snapshots.
+
+    Every change, whether from :meth:`update_config` or an edit picked up
+    by :meth:`watch`, is validated once, swapped in as a new immutable
+    :class:`ConfigSnapshot` and passed to the subscribers. Readers holding
+    an older snapshot keep a consistent view of it.
+    """
+
     def __init__(self, config_path: str) -> None:
         """Initialize the configuration manager.
 
@@ -20,27 +36,143 @@ class ConfigManager:
             config_path: Path to the configuration file.
         """
         self.config_path = config_path
-        self.config: Optional[dict[str, Any]] = None
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._signature: Signature = None
+        self._subscribers: list[Callable[[ConfigSnapshot], None]] = []
+        self._lock = threading.RLock()
+        self._watcher: Optional[ConfigWatcher] = None
         self._schema = self._init_schema()
         self.load_config()
 
     def load_config(self) -> None:
         """Load configuration from file."""
+        config = self._read_file()
+        self._notify(self._publish(config, file_signature(self.config_path)))
+
+    def _read_file(self) -> dict[str, Any]:
         try:
             with open(self.config_path) as f:
-                self.config = json.load(f)
-            # Set default values for metrics configuration
-            if "metrics" not in self.config:
-                self.config["metrics"] = {}
-            metrics = self.config["metrics"]
-            metrics.setdefault("collection_interval", 60)
-            metrics.setdefault("retention_days", 30)
+                config = json.load(f)
         except FileNotFoundError:
             msg = f"Configuration file not found: {self.config_path}"
             raise ConfigurationError(msg)
         except json.JSONDecodeError as e:
             msg = f"Invalid JSON in configuration file: {e!s}"
             raise ConfigurationError(msg)
+        # Set default values for metrics configuration
+        if "metrics" not in config:
+            config["metrics"] = {}
+        metrics = config["metrics"]
+        metrics.setdefault("collection_interval", 60)
+        metrics.setdefault("retention_days", 30)
+        return config
+
+    def _publish(self, config: dict[str, Any], signature: Signature) -> ConfigSnapshot:
+        with self._lock:
+            version = 0 if self._snapshot is None else self._snapshot.version + 1
+            snapshot = ConfigSnapshot.from_config(config, version)
+            self._snapshot = snapshot
+            self._signature = signature
+        return snapshot
+
+    def _notify(self, snapshot: ConfigSnapshot) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error(f"Config subscriber {callback!r} failed: {e}")
+
+    def _write_file(self, config: dict[str, Any]) -> Signature:
+        directory = os.path.dirname(os.path.abspath(self.config_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".config.", suffix=".json")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=2)
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return file_signature(self.config_path)
+
+    @property
+    def config(self) -> Optional[dict[str, Any]]:
+        """Get a mutable copy of the current configuration."""
+        if self._snapshot is None:
+            return None
+        return thaw(self._snapshot.data)
+
+    def snapshot(self) -> ConfigSnapshot:
+        """Get the current configuration snapshot."""
+        return self._snapshot
+
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None]) -> Callable[[], None]:
+        """Call ``callback`` with every new snapshot.
+
+        Args:
+        ----
+            callback: Called after each change is swapped in.
+
+        Returns:
+        -------
+            Function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def reload(self) -> bool:
+        """Reload the file if it changed since it was last loaded or written.
+
+        An edit that is not valid JSON or fails validation is logged and the
+        current snapshot stays in place.
+
+        Returns
+        -------
+            Whether a new snapshot was published.
+        """
+        with self._lock:
+            signature = file_signature(self.config_path)
+            if signature is None or signature == self._signature:
+                return False
+            try:
+                config = self._read_file()
+            except ConfigurationError as e:
+                logger.error(f"Keeping previous configuration: {e}")
+                return False
+            validation = self.validate_config(config)
+            if not validation.is_valid:
+                logger.error(f"Keeping previous configuration, invalid edit: {validation.errors}")
+                self._signature = signature
+                return False
+            snapshot = self._publish(config, signature)
+        logger.info(f"Configuration reloaded from {self.config_path}")
+        self._notify(snapshot)
+        return True
+
+    def watch(self, poll_interval: float = 1.0) -> None:
+        """Reload the configuration whenever its file changes."""
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = ConfigWatcher(self.config_path, self.reload, poll_interval)
+                self._watcher.start()
+        # Catch edits made between loading the file and starting the watcher
+        self.reload()
+
+    def stop_watching(self) -> None:
+        """Stop watching the configuration file."""
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
 
     def _init_schema(self) -> Any:
         """Initialize the configuration schema."""
@@ -64,18 +196,18 @@ class ConfigManager:
         if not validation.is_valid:
             return validation
         try:
-            self.config = config
-            with open(self.config_path, "w") as f:
-                json.dump(self.config, f, indent=2)
+            with self._lock:
+                snapshot = self._publish(config, self._write_file(config))
+            self._notify(snapshot)
             return ValidationResult(True)
         except Exception as e:
             return ValidationResult(False, [f"Failed to save configuration: {e!s}"])
 
-    def get_config(self) -> dict[str, Any]:
-        """Get the current configuration."""
-        if self.config is None:
+    def get_config(self) -> Mapping[str, Any]:
+        """Get the current configuration as a read-only mapping."""
+        if self._snapshot is None:
             self.load_config()
-        return self.config
+        return self._snapshot.data
 
     def validate_config(self, config: dict[str, Any]) -> ValidationResult:
         """Validate configuration against schema."""
@@ -96,8 +228,7 @@ class ConfigManager:
             ValidationResult indicating success/failure.
         """
         try:
-            # Create a deep copy of current config
-            updated_config = self.config.copy()
+            updated_config = self.config
 
             # Deep update the configuration
             def deep_update(d: dict[str, Any], u: dict[str, Any]) -> dict[str, Any]:
@@ -120,9 +251,9 @@ class ConfigManager:
         except Exception as e:
             return ValidationResult(False, [str(e)])
 
-    def get_alert_rules(self) -> list[dict[str, Any]]:
+    def get_alert_rules(self) -> Sequence[Mapping[str, Any]]:
         """Get alert rules from configuration."""
-        return self.get_config().get("alert_rules", [])
+        return self.get_config().get("alert_rules", ())
 
     def update_alert_rules(self, rules: list[dict[str, Any]]) -> ValidationResult:
         """Update alert rules in configuration.
@@ -137,23 +268,25 @@ class ConfigManager:
         """
         try:
             # Validate rules
+            current = self.config
             validation = self._schema.validate_config(
                 {
                     "alert_rules": rules,
-                    "metrics": self.config.get("metrics", {}),
-                    "websocket": self.config.get("websocket", {}),
-                    "database": self.config.get("database", {}),
-                    "logging": self.config.get("logging", {}),
-                    "ui": self.config.get("ui", {}),
+                    "metrics": current.get("metrics", {}),
+                    "websocket": current.get("websocket", {}),
+                    "database": current.get("database", {}),
+                    "logging": current.get("logging", {}),
+                    "ui": current.get("ui", {}),
                 },
             )
             if not validation.is_valid:
                 return validation
 
             # Update and save config
-            self.config["alert_rules"] = rules
-            with open(self.config_path, "w") as f:
-                json.dump(self.config, f, indent=2)
+            with self._lock:
+                config = {**current, "alert_rules": thaw(rules)}
+                snapshot = self._publish(config, self._write_file(config))
+            self._notify(snapshot)
             return ValidationResult(True)
         except Exception as e:
             return ValidationResult(False, [str(e)])
@@ -174,7 +307,7 @@ def init_config(config_path: str) -> None:
     _config_manager = ConfigManager(config_path)
 
 
-def get_config() -> dict[str, Any]:
+def get_config() -> Mapping[str, Any]:
     """Get configuration from global manager."""
     if _config_manager is None:
         msg = "Configuration manager not initialized"
@@ -190,7 +323,7 @@ def update_config(new_config: dict[str, Any]) -> ValidationResult:
     return _config_manager.update_config(new_config)
 
 
-def get_alert_rules() -> list[dict[str, Any]]:
+def get_alert_rules() -> Sequence[Mapping[str, Any]]:
     """Get alert rules from global manager."""
     if _config_manager is None:
         msg = "Configuration manager not initialized"
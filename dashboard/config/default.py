@@ -9,5 +9,21 @@ DEBUG = True
 SQLALCHEMY_DATABASE_URI = "sqlite:///instance/dashboard.db"
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# SQLite storage profile, see dashboard/storage.py
+SQLITE_PRAGMAS = {}  # overrides of dashboard.storage.DEFAULT_PRAGMAS
+SQLITE_PRAGMAS_STRICT = True  # refuse to start when a pragma does not take effect
+SQLITE_READER_POOL_SIZE = 4
+
+# Request timing, see dashboard/request_timing.py
+REQUEST_TIMING_BUCKETS = None  # seconds; None uses DEFAULT_LATENCY_BUCKETS
+REQUEST_TIMING_MAX_ENDPOINTS = 100
+
+# Login, see dashboard/auth/credentials.py
+AUTH_HASH_WORKERS = 2  # threads hashing passwords
+AUTH_MAX_PENDING = 32  # hashing jobs running or queued before logins are refused
+AUTH_LOGIN_ATTEMPTS = 5  # failed attempts a user may make in a burst
+AUTH_LOGIN_REFILL_SECONDS = 60.0  # seconds until one more attempt is allowed
+
 # Application
 MONITOR_REFRESH_INTERVAL = 5  # seconds
+METRICS_SAMPLE_INTERVAL = 1.0  # seconds
@@ -15,6 +15,7 @@ DEFAULT_CONFIG = {
         "host": "localhost",
         "port": 5432,
         "name": "dashboard",
+        "path": "instance/dashboard.db",
         "user": "dashboard",
         "password": "",
     },
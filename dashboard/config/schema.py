@@ -204,6 +204,28 @@ class ConfigManager:
         self._validate_database_section(self.config["database"])
         self._validate_logging_section(self.config["logging"])
 
+    def _validate_config_structure(self, config: dict[str, Any]) -> None:
+        """Validate the sections of ``config``.
+
+        Raises
+        ------
+            SchemaValidationError: If validation fails.
+        """
+        try:
+            if not isinstance(config, dict):
+                msg = "Configuration must be a dictionary"
+                raise ValidationError(msg)
+            missing = {"metrics", "websocket", "database", "logging"} - set(config)
+            if missing:
+                msg = f"Missing required configuration sections: {missing}"
+                raise ValidationError(msg)
+            self._validate_metrics_section(config["metrics"])
+            self._validate_websocket_section(config["websocket"])
+            self._validate_database_section(config["database"])
+            self._validate_logging_section(config["logging"])
+        except ValidationError as e:
+            raise SchemaValidationError(str(e)) from e
+
     def get_config(self) -> dict[str, Any]:
         """Get validated configuration."""
         self.validate_config()
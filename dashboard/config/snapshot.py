@@ -0,0 +1,204 @@
+"""Versioned configuration snapshots and config file watching."""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import threading
+from collections.abc import Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLDS = {"cpu": 80.0, "memory": 90.0, "disk": 85.0}
+DEFAULT_WEBSOCKET = {"host": "localhost", "port": 8765, "ssl": False}
+DEFAULT_INFLUXDB = {"url": "http://localhost:8086", "token": "", "org": "", "bucket": ""}
+DEFAULT_LOGGING = {
+    "level": "INFO",
+    "file": "dashboard.log",
+    "format": "%(asctime)s [%(levelname)8s] %(message)s (%(filename)s:%(lineno)s)",
+}
+DEFAULT_DATABASE = {
+    "host": "localhost",
+    "port": 5432,
+    "name": "dashboard",
+    "user": "postgres",
+    "password": "",
+}
+DEFAULT_UI = {"theme": "light", "refresh_interval": 5000, "max_datapoints": 100}
+DEFAULT_COLLECTION_INTERVAL = 60
+
+# File identity used to tell whether the config file changed
+Signature = Optional[tuple[int, int, int]]
+
+
+def freeze(value: Any) -> Any:
+    """Get a read-only copy of parsed JSON: mappings become mapping proxies, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Get a plain, mutable copy of a value made by :func:`freeze`."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """One immutable version of the configuration with precomputed views.
+
+    The views are resolved once, with their defaults, when the snapshot is
+    built, so accessors in hot loops read an attribute instead of walking
+    nested dictionaries. A snapshot is never modified; a change publishes
+    a new snapshot with the next ``version``. ``data`` and the views are
+    read-only mappings, with lists as tuples; :func:`thaw` gives a mutable
+    copy.
+    """
+
+    version: int
+    data: Mapping[str, Any]
+    metric_thresholds: Mapping[str, float]
+    collection_interval: float
+    alert_rules: tuple[Mapping[str, Any], ...]
+    websocket: Mapping[str, Any]
+    influxdb: Mapping[str, Any]
+    logging: Mapping[str, Any]
+    database: Mapping[str, Any]
+    ui: Mapping[str, Any]
+    production: bool
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], version: int = 0) -> "ConfigSnapshot":
+        """Build a snapshot from a read-only copy of ``config``."""
+        data = freeze(config)
+        metrics = data.get("metrics", {})
+        interval = metrics.get("collection_interval", DEFAULT_COLLECTION_INTERVAL)
+        return cls(
+            version=version,
+            data=data,
+            metric_thresholds=metrics.get("thresholds", freeze(DEFAULT_THRESHOLDS)),
+            collection_interval=float(interval),
+            alert_rules=data.get("alert_rules", ()),
+            websocket=data.get("websocket", freeze(DEFAULT_WEBSOCKET)),
+            influxdb=data.get("influxdb", freeze(DEFAULT_INFLUXDB)),
+            logging=data.get("logging", freeze(DEFAULT_LOGGING)),
+            database=data.get("database", freeze(DEFAULT_DATABASE)),
+            ui=data.get("ui", freeze(DEFAULT_UI)),
+            production=data.get("environment") == "production",
+        )
+
+
+def file_signature(path: str) -> Signature:
+    """Get ``(mtime_ns, size, inode)`` of ``path``, or ``None`` if it is missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class _Inotify:
+    """Directory watch through the Linux inotify API."""
+
+    # IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    MASK = 0x002 | 0x004 | 0x008 | 0x080 | 0x100 | 0x200
+
+    def __init__(self, directory: str) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for events and discard them."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if readable:
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        os.close(self.fd)
+
+
+class ConfigWatcher:
+    """Call ``on_change`` whenever the config file changes.
+
+    The file's directory is watched with inotify where the platform has it,
+    so edits are seen at once; elsewhere the file is polled every
+    ``poll_interval`` seconds. Either way a change is confirmed by the
+    file's modification time, size and inode, which also covers editors
+    that replace the file instead of writing it in place.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[], None],
+        poll_interval: float = 1.0,
+    ) -> None:
+        """Initialize the watcher for ``path``."""
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.uses_inotify = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+        self._last: Signature = None
+
+    def start(self) -> None:
+        """Start watching in a daemon thread."""
+        if self._thread is not None:
+            return
+        try:
+            self._inotify = _Inotify(os.path.dirname(self.path))
+            self.uses_inotify = True
+        except (OSError, AttributeError, TypeError) as e:
+            logger.debug(f"inotify unavailable, polling {self.path}: {e}")
+        self._stop.clear()
+        self._last = file_signature(self.path)
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        self.uses_inotify = False
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if self._inotify is not None:
+                self._inotify.wait(self.poll_interval)
+            elif self._stop.wait(self.poll_interval):
+                break
+            signature = file_signature(self.path)
+            if signature != self._last:
+                self._last = signature
+                try:
+                    self.on_change()
+                except Exception as e:
+                    logger.error(f"Error handling change of {self.path}: {e}")
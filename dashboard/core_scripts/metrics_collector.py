@@ -8,18 +8,44 @@ from prometheus_client import (
     CollectorRegistry,
     Counter,
     Gauge,
-    Histogram,
-    start_http_server,
 )
 
 from ..config import get_config
+from ..exposition import SnapshotCollector, get_shared_request_timer, start_exposition_server
 
 
 class MetricsCollector:
     """Collector for system and project metrics."""
-    
-    def __init__(self, port: int = 8000, retention_days: int = None) -> None:
-        """Initialize the metrics collector."""
+
+    def __init__(
+        self,
+        port: int = 8000,
+        retention_days: int = None,
+        engine=None,
+        retention=None,
+        request_timer=None,
+    ) -> None:
+        """Initialize the metrics collector.
+
+        System metrics are exported by a
+        :class:`~dashboard.exposition.SnapshotCollector` reading ``engine``,
+        next to this collector's project metrics, and served through
+        :func:`~dashboard.exposition.start_exposition_server`.
+
+        Args:
+        ----
+            port: Port of the Prometheus HTTP server.
+            retention_days: Days of metrics to keep; defaults to the config.
+            engine: Shared :class:`~dashboard.collector_engine.CollectorEngine`
+                to read system metrics from instead of sampling psutil; the
+                dashboard's shared engine by default.
+            retention: ``RetentionEngine`` from ``src/monitor/retention.py``
+                that deletes expired data during cleanup.
+            request_timer: :class:`~dashboard.request_timing.RequestTimer`
+                exported as the response time histogram; by default the
+                shared one the Flask app and the WebSocket server record
+                into.
+        """
         # Set up logging
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
@@ -29,13 +55,18 @@ class MetricsCollector:
         retention_config = metrics_config.get("retention", {})
         self.retention_days = retention_days or retention_config.get("days", 30)
         self.last_cleanup = datetime.now()
+        self.engine = engine
+        self.retention = retention
+        self.request_timer = request_timer or get_shared_request_timer()
+        self.server = None
+        self.server_thread = None
         # Create a custom registry for this instance
         self.registry = CollectorRegistry()
         # Initialize metrics
         self._init_metrics()
         # Start Prometheus HTTP server
         try:
-            start_http_server(port, registry=self.registry)
+            self.server, self.server_thread = start_exposition_server(port, registry=self.registry)
             self.logger.info(f"Metrics server started on port {port}")
         except Exception as e:
             self.logger.error(f"Failed to start metrics server: {e}")
@@ -64,42 +95,24 @@ class MetricsCollector:
             "Sprint progress percentage",
             registry=self.registry,
         )
-        # System metrics
-        self.cpu_usage = Gauge(
-            "cpu_usage_percent",
-            "CPU usage percentage",
-            registry=self.registry,
-        )
-        self.memory_usage = Gauge(
-            "memory_usage_percent",
-            "Memory usage percentage",
-            registry=self.registry,
-        )
-        self.disk_usage = Gauge(
-            "disk_usage_percent",
-            "Disk usage percentage",
-            registry=self.registry,
-        )
+        # System metrics, read from the shared snapshot at scrape time
+        self.registry.register(SnapshotCollector(self.engine))
         # Performance metrics
-        self.response_time = Histogram(
-            "response_time_seconds",
-            "Response time in seconds",
-            buckets=(0.1, 0.5, 1.0, 2.0, 5.0),
-            registry=self.registry,
-        )
+        self.registry.register(self.request_timer)
+        self.response_time = self.request_timer
 
     def collect_system_metrics(self) -> dict[str, Any]:
         """Collect system metrics."""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.cpu_usage.set(cpu_percent)
-            # Memory usage
-            memory = psutil.virtual_memory()
-            self.memory_usage.set(memory.percent)
-            # Disk usage
-            disk = psutil.disk_usage("/")
-            self.disk_usage.set(disk.percent)
+            if self.engine is not None:
+                cpu_percent = self.engine.value("cpu")
+                memory = self.engine.value("memory")
+                disk = self.engine.value("disk")
+            else:
+                # Compare against the previous call instead of blocking
+                cpu_percent = psutil.cpu_percent(interval=None)
+                memory = psutil.virtual_memory()
+                disk = psutil.disk_usage("/")
             return {
                 "cpu_usage": cpu_percent,
                 "memory_usage": memory.percent,
@@ -137,11 +150,19 @@ class MetricsCollector:
     def cleanup_old_metrics(self) -> None:
         """Clean up old metrics based on retention policy."""
         try:
-            if (datetime.now() - self.last_cleanup).days >= 1:
+            due = (datetime.now() - self.last_cleanup).days >= 1
+            if self.retention is not None and (due or self.retention.in_progress):
+                # Bounded slice; an unfinished pass resumes on the next call
+                report = self.retention.run(time_budget=1.0)
+                if report.complete:
+                    self.last_cleanup = datetime.now()
+                self.logger.info(
+                    f"Reclaimed {report.bytes_reclaimed} bytes and {report.rows_deleted} rows",
+                )
+            elif due:
                 cutoff_date = datetime.now() - timedelta(days=self.retention_days)
-                # Here you would implement cleanup logic for your storage backend
                 self.last_cleanup = datetime.now()
-                self.logger.info(f"Cleaned up metrics older than {cutoff_date}")
+                self.logger.info(f"No retention engine; nothing removed before {cutoff_date}")
         except Exception as e:
             self.logger.error(f"Error cleaning up old metrics: {e}")
 
@@ -151,3 +172,12 @@ class MetricsCollector:
             self.response_time.observe(duration)
         except Exception as e:
             self.logger.error(f"Error recording response time: {e}")
+
+    def stop(self) -> None:
+        """Stop the Prometheus HTTP server, if it is running."""
+        if self.server is None:
+            return
+        server, self.server = self.server, None
+        server.shutdown()
+        server.server_close()
+        self.server_thread = None
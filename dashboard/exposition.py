@@ -0,0 +1,371 @@
+"""Prometheus exposition served from the shared collector engine."""
+import functools
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.exposition import CONTENT_TYPE_LATEST, ThreadingWSGIServer, generate_latest
+from prometheus_client.openmetrics import exposition as openmetrics
+
+from .metrics import get_engine, top_processes
+from .request_timing import RequestTimer
+
+CONTENT_TYPE_PROTOBUF = "application/openmetrics-protobuf; version=1.0.0"
+DEFAULT_MAX_PROCESSES = 50
+
+_METRIC_TYPES = {
+    "gauge": "GAUGE",
+    "counter": "COUNTER",
+    "histogram": "HISTOGRAM",
+    "gaugehistogram": "GAUGE_HISTOGRAM",
+    "summary": "SUMMARY",
+    "info": "INFO",
+    "stateset": "STATE_SET",
+}
+
+
+class SnapshotCollector:
+    """Custom Prometheus collector reading the shared :class:`CollectorEngine`.
+
+    A scrape turns the engine's latest readings into metric families and
+    never calls psutil itself, so scrapes cost the same however often they
+    arrive. Disks are labelled by mount point and device; processes by PID
+    and name, limited to the ``max_processes`` heaviest by CPU to bound
+    series cardinality.
+    """
+
+    def __init__(self, engine: Any = None, max_processes: int = DEFAULT_MAX_PROCESSES) -> None:
+        """Initialize the collector; ``engine`` defaults to the shared engine."""
+        self.engine = engine
+        self.max_processes = max_processes
+
+    def describe(self) -> List[Metric]:
+        """Skip the registration-time collect, which would start the engine."""
+        return []
+
+    def collect(self) -> Iterator[Metric]:
+        """Yield metric families for the latest readings."""
+        engine = self.engine if self.engine is not None else get_engine()
+        value = engine.value
+
+        cpu = value("cpu")
+        if cpu is not None:
+            yield GaugeMetricFamily("system_cpu_usage_percent", "CPU usage percentage", value=cpu)
+
+        memory = value("memory")
+        if memory is not None:
+            yield GaugeMetricFamily(
+                "system_memory_usage_percent", "Memory usage percentage", value=memory.percent,
+            )
+            yield GaugeMetricFamily("system_memory_used_bytes", "Memory in use", value=memory.used)
+            yield GaugeMetricFamily(
+                "system_memory_available_bytes", "Memory available", value=memory.available,
+            )
+
+        disks = value("disks")
+        if disks:
+            labels = ["mountpoint", "device"]
+            percent = GaugeMetricFamily(
+                "system_disk_usage_percent", "Disk usage percentage", labels=labels,
+            )
+            used = GaugeMetricFamily("system_disk_used_bytes", "Disk space in use", labels=labels)
+            total = GaugeMetricFamily("system_disk_total_bytes", "Disk size", labels=labels)
+            for mountpoint, (device, usage) in sorted(disks.items()):
+                percent.add_metric([mountpoint, device], usage.percent)
+                used.add_metric([mountpoint, device], usage.used)
+                total.add_metric([mountpoint, device], usage.total)
+            yield from (percent, used, total)
+
+        network = value("network")
+        if network is not None:
+            yield CounterMetricFamily(
+                "system_network_sent_bytes", "Bytes sent", value=network.bytes_sent,
+            )
+            yield CounterMetricFamily(
+                "system_network_received_bytes", "Bytes received", value=network.bytes_recv,
+            )
+
+        processes = value("processes")
+        if processes:
+            labels = ["pid", "name"]
+            cpu_family = GaugeMetricFamily(
+                "process_cpu_usage_percent", "Process CPU usage percentage", labels=labels,
+            )
+            memory_family = GaugeMetricFamily(
+                "process_memory_usage_percent", "Process memory usage percentage", labels=labels,
+            )
+            for process in top_processes(processes, self.max_processes, "cpu"):
+                process_labels = [str(process["pid"]), process["name"]]
+                cpu_family.add_metric(process_labels, process["cpu_percent"])
+                memory_family.add_metric(process_labels, process["memory_percent"])
+            yield from (cpu_family, memory_family)
+
+
+@functools.lru_cache(maxsize=None)
+def openmetrics_schema() -> Any:
+    """Get the OpenMetrics protobuf module, imported on the first protobuf scrape.
+
+    The generated schema ships with streamlit, whose import is too slow to
+    pay for on every dashboard start. ``models.openmetrics_data_model_pb2`` is
+    a copy of the same module registering the same descriptor, but it is
+    only importable with ``src`` on the path and only after
+    ``google.protobuf.timestamp_pb2``, so the dashboard uses streamlit's.
+    """
+    from streamlit.proto import openmetrics_data_model_pb2
+
+    return openmetrics_data_model_pb2
+
+
+def _timestamp(seconds: float) -> Any:
+    from google.protobuf import timestamp_pb2
+
+    stamp = timestamp_pb2.Timestamp()
+    stamp.FromNanoseconds(int(seconds * 1e9))
+    return stamp
+
+
+def _set_labels(metric: Any, labels: Dict[str, str]) -> None:
+    for name, label_value in labels.items():
+        metric.labels.add(name=name, value=label_value)
+
+
+def _family_to_proto(family: Metric, message: Any) -> None:
+    message.name = family.name
+    message.help = family.documentation
+    message.unit = family.unit
+    om = openmetrics_schema()
+    metric_type = getattr(om, _METRIC_TYPES.get(family.type, "UNKNOWN"))
+    message.type = metric_type
+
+    if metric_type in (om.GAUGE, om.UNKNOWN):
+        for sample in family.samples:
+            metric = message.metrics.add()
+            _set_labels(metric, sample.labels)
+            point = metric.metric_points.add()
+            target = point.gauge_value if metric_type == om.GAUGE else point.unknown_value
+            target.double_value = sample.value
+            if sample.timestamp is not None:
+                point.timestamp.CopyFrom(_timestamp(sample.timestamp))
+        return
+
+    # Other types spread one point over several samples; group them by the
+    # labels of the series, leaving out the per-sample le/quantile labels
+    series: Dict[Tuple[Tuple[str, str], ...], List[Any]] = {}
+    for sample in family.samples:
+        key = tuple(sorted((k, v) for k, v in sample.labels.items() if k not in ("le", "quantile")))
+        series.setdefault(key, []).append(sample)
+
+    for key, samples in series.items():
+        metric = message.metrics.add()
+        _set_labels(metric, dict(key))
+        point = metric.metric_points.add()
+        if metric_type == om.COUNTER:
+            _counter_point(point.counter_value, family.name, samples)
+        elif metric_type in (om.HISTOGRAM, om.GAUGE_HISTOGRAM):
+            _histogram_point(point.histogram_value, family.name, samples)
+        elif metric_type == om.SUMMARY:
+            _summary_point(point.summary_value, family.name, samples)
+        elif metric_type == om.INFO:
+            for sample in samples:
+                for name, label_value in sample.labels.items():
+                    if (name, label_value) not in key:
+                        point.info_value.info.add(name=name, value=label_value)
+        elif metric_type == om.STATE_SET:
+            for sample in samples:
+                point.state_set_value.states.add(
+                    name=sample.labels[family.name], enabled=bool(sample.value),
+                )
+
+
+def _counter_point(value: Any, name: str, samples: Iterable[Any]) -> None:
+    for sample in samples:
+        if sample.name == f"{name}_created":
+            value.created.CopyFrom(_timestamp(sample.value))
+        else:
+            value.double_value = sample.value
+
+
+def _histogram_point(value: Any, name: str, samples: Iterable[Any]) -> None:
+    for sample in samples:
+        if sample.name.endswith("_bucket"):
+            bound = sample.labels["le"]
+            value.buckets.add(count=int(sample.value), upper_bound=float(bound))
+        elif sample.name.endswith("_count"):
+            value.count = int(sample.value)
+        elif sample.name.endswith("_sum"):
+            value.double_value = sample.value
+        elif sample.name == f"{name}_created":
+            value.created.CopyFrom(_timestamp(sample.value))
+
+
+def _summary_point(value: Any, name: str, samples: Iterable[Any]) -> None:
+    for sample in samples:
+        if "quantile" in sample.labels:
+            value.quantile.add(quantile=float(sample.labels["quantile"]), value=sample.value)
+        elif sample.name == f"{name}_count":
+            value.count = int(sample.value)
+        elif sample.name == f"{name}_sum":
+            value.double_value = sample.value
+        elif sample.name == f"{name}_created":
+            value.created.CopyFrom(_timestamp(sample.value))
+
+
+def generate_protobuf(registry: CollectorRegistry = REGISTRY) -> bytes:
+    """Encode every metric of ``registry`` as an OpenMetrics ``MetricSet``."""
+    metric_set = openmetrics_schema().MetricSet()
+    for family in registry.collect():
+        _family_to_proto(family, metric_set.metric_families.add())
+    return metric_set.SerializeToString()
+
+
+FORMATS: Dict[str, Tuple[str, Callable[[CollectorRegistry], bytes]]] = {
+    "text": (CONTENT_TYPE_LATEST, generate_latest),
+    "openmetrics": (openmetrics.CONTENT_TYPE_LATEST, openmetrics.generate_latest),
+    "protobuf": (CONTENT_TYPE_PROTOBUF, generate_protobuf),
+}
+
+
+def choose_format(accept: Optional[str]) -> str:
+    """Pick the exposition format for an HTTP ``Accept`` header."""
+    accept = accept or ""
+    if "application/openmetrics-protobuf" in accept:
+        return "protobuf"
+    if "application/openmetrics-text" in accept:
+        return "openmetrics"
+    return "text"
+
+
+class ExpositionCache:
+    """Encoded exposition of a registry, reused for ``ttl`` seconds per format.
+
+    Encoding holds the cache lock, so scrapers arriving together wait for
+    one encode and all get its result instead of each walking the registry.
+    """
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY, ttl: float = 1.0) -> None:
+        """Initialize the cache for ``registry``."""
+        self.registry = registry
+        self.ttl = ttl
+        self.encodes = 0
+        self._entries: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, fmt: str = "text") -> Tuple[bytes, str]:
+        """Get the body and content type of the exposition in ``fmt``.
+
+        Raises
+        ------
+            KeyError: If ``fmt`` is not one of :data:`FORMATS`.
+        """
+        content_type, encode = FORMATS[fmt]
+        with self._lock:
+            now = time.monotonic()
+            entry = self._entries.get(fmt)
+            if entry is None or now - entry[0] >= self.ttl:
+                entry = (now, encode(self.registry))
+                self._entries[fmt] = entry
+                self.encodes += 1
+        return entry[1], content_type
+
+
+def make_wsgi_app(cache: ExpositionCache) -> Callable[..., List[bytes]]:
+    """Create a WSGI app serving ``cache`` with content negotiation."""
+
+    def app(environ: Dict[str, Any], start_response: Callable[..., Any]) -> List[bytes]:
+        body, content_type = cache.get(choose_format(environ.get("HTTP_ACCEPT")))
+        headers = [("Content-Type", content_type), ("Content-Length", str(len(body)))]
+        start_response("200 OK", headers)
+        return [body]
+
+    return app
+
+
+_registry: Optional[CollectorRegistry] = None
+_request_timer: Optional[RequestTimer] = None
+_registry_lock = threading.Lock()
+
+
+def get_exposition_registry() -> CollectorRegistry:
+    """Get the shared registry: the snapshot collector and the shared request timer."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CollectorRegistry()
+            _registry.register(SnapshotCollector())
+        return _registry
+
+
+def register_request_timer(timer: RequestTimer) -> RequestTimer:
+    """Export ``timer`` from the shared registry in place of the one before.
+
+    The Flask app registers its timer here, so the WebSocket server and
+    :class:`~dashboard.core_scripts.metrics_collector.MetricsCollector`
+    record into and export the same ``response_time_seconds`` histogram.
+
+    Returns
+    -------
+        RequestTimer: ``timer``.
+    """
+    global _request_timer
+    registry = get_exposition_registry()
+    with _registry_lock:
+        if timer is not _request_timer:
+            if _request_timer is not None:
+                registry.unregister(_request_timer)
+            registry.register(timer)
+            _request_timer = timer
+    return timer
+
+
+def get_shared_request_timer() -> RequestTimer:
+    """Get the timer of the shared registry, registering a default one on first use."""
+    timer = _request_timer
+    if timer is not None:
+        return timer
+    return register_request_timer(RequestTimer())
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def start_exposition_server(
+    port: int,
+    addr: str = "0.0.0.0",
+    registry: Optional[CollectorRegistry] = None,
+    engine: Any = None,
+    ttl: float = 1.0,
+) -> Tuple[Any, threading.Thread]:
+    """Serve the shared snapshot to Prometheus from a daemon thread.
+
+    Args:
+    ----
+        port: Port to listen on.
+        addr: Address to bind.
+        registry: Registry to expose; by default the shared registry of
+            :func:`get_exposition_registry`, or with ``engine`` a new one
+            holding a :class:`SnapshotCollector` and the shared request
+            timer.
+        engine: Engine for the default collector.
+        ttl: Seconds an encoded exposition is reused, normally the scrape
+            or sampling interval.
+
+    Returns:
+    -------
+        Tuple of the WSGI server and its thread.
+    """
+    if registry is None and engine is None:
+        registry = get_exposition_registry()
+    elif registry is None:
+        registry = CollectorRegistry()
+        registry.register(SnapshotCollector(engine))
+        registry.register(get_shared_request_timer())
+    app = make_wsgi_app(ExpositionCache(registry, ttl))
+    server = make_server(addr, port, app, ThreadingWSGIServer, _QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-exposition", daemon=True)
+    thread.start()
+    return server, thread
@@ -2,5 +2,7 @@
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
-db = SQLAlchemy()
+from .storage import ReadRoutingSession
+
+db = SQLAlchemy(session_options={"class_": ReadRoutingSession})
 migrate = Migrate()
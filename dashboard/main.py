@@ -2,16 +2,24 @@
 import logging
 import os
 import time
+from datetime import datetime
 from typing import Any, Optional, Tuple
 
 import plotly.graph_objects as go  # type: ignore
 import streamlit as st
 from plotly.subplots import make_subplots  # type: ignore
 
-from .metrics import MetricsCollector
+from .metrics import get_latest_metrics
+from .timeseries import SeriesStore
 
 logger = logging.getLogger(__name__)
 
+# 24 hours of 1 second samples
+DEFAULT_HISTORY_CAPACITY = 24 * 60 * 60
+
+# Display name to system metric key
+METRIC_KEYS = {"CPU Usage": "cpu", "Memory Usage": "memory", "Disk Usage": "disk"}
+
 
 def load_config() -> Tuple[int, list[str]]:
     """Load dashboard configuration.
@@ -41,87 +49,104 @@ def setup_page() -> None:
     )
 
 
-def update_metrics(session_state: Any, metrics: Optional[dict[str, Any]] = None) -> dict[str, Any]:
-    """Update metrics in session state.
+def _timestamp_ms(metrics: dict[str, Any]) -> float:
+    """Get a snapshot's timestamp in epoch milliseconds, defaulting to now."""
+    timestamp = metrics.get("timestamp")
+    if timestamp:
+        try:
+            return datetime.fromisoformat(timestamp).timestamp() * 1000
+        except (TypeError, ValueError):
+            pass
+    return time.time() * 1000
+
+
+@st.cache_resource
+def get_history_store() -> SeriesStore:
+    """Get the metrics history store shared by all sessions."""
+    capacity = int(os.getenv("HISTORY_CAPACITY", str(DEFAULT_HISTORY_CAPACITY)))
+    return SeriesStore(METRIC_KEYS.values(), capacity)
+
+
+def update_metrics(
+    session_state: Any,
+    metrics: Optional[dict[str, Any]] = None,
+    store: Optional[SeriesStore] = None,
+) -> dict[str, Any]:
+    """Record the latest metrics in the shared history store.
 
     Args:
     ----
         session_state: Streamlit session state.
-        metrics: Optional metrics data to use instead of collecting new metrics.
+        metrics: Optional metrics data to use instead of the sampler snapshot.
+        store: History store to append to; defaults to the shared store.
 
     Returns:
     -------
         Dictionary containing processed metrics.
     """
     if metrics is None:
-        collector = MetricsCollector()
-        metrics = collector.get_metrics()
-
-    # Add to history, maintaining max size of 50
-    try:
-        metrics_history = getattr(session_state, "metrics_history", [])
-    except AttributeError:
-        metrics_history = session_state.get("metrics_history", [])
+        metrics = get_latest_metrics()
+    if store is None:
+        store = get_history_store()
 
-    metrics_history.append(metrics)
-    if len(metrics_history) > 50:
-        metrics_history.pop(0)
+    # Every session reruns on its own schedule; only append snapshots newer
+    # than the last one recorded so the shared history has no duplicates.
+    store.append_if_newer(_timestamp_ms(metrics), metrics.get("system", {}))
 
     if isinstance(session_state, dict):
-        session_state["metrics_history"] = metrics_history
         session_state["last_update"] = time.time()
     else:
-        session_state.metrics_history = metrics_history
         session_state.last_update = time.time()
 
     return metrics
 
 
-def display_metrics(session_state: Any, metrics_to_show: list[str]) -> None:
+def display_metrics(
+    session_state: Any,
+    metrics_to_show: list[str],
+    store: Optional[SeriesStore] = None,
+) -> None:
     """Display metrics visualization.
 
     Args:
     ----
         session_state: Streamlit session state.
         metrics_to_show: List of metrics to display.
+        store: History store to plot; defaults to the shared store.
     """
-    if not session_state.get("metrics_history"):
+    if store is None:
+        store = get_history_store()
+    if not len(store):
         st.warning("No metrics data available")
         return
 
     # Get latest metrics
-    latest_metrics = session_state["metrics_history"][-1]
+    latest_metrics = store.latest()
 
     # Create metrics display
     col1, col2 = st.columns(2)
 
     with col1:
         if "CPU Usage" in metrics_to_show:
-            st.metric("CPU Usage", f"{latest_metrics['system']['cpu']:.1f}%", delta=None)
+            st.metric("CPU Usage", f"{latest_metrics['cpu']:.1f}%", delta=None)
 
         if "Memory Usage" in metrics_to_show:
-            st.metric("Memory Usage", f"{latest_metrics['system']['memory']:.1f}%", delta=None)
+            st.metric("Memory Usage", f"{latest_metrics['memory']:.1f}%", delta=None)
 
     with col2:
         if "Disk Usage" in metrics_to_show:
-            st.metric("Disk Usage", f"{latest_metrics['system']['disk']:.1f}%", delta=None)
+            st.metric("Disk Usage", f"{latest_metrics['disk']:.1f}%", delta=None)
 
-    # Create time series plot
+    # Create time series plot straight from the store's window views
     fig = make_subplots(rows=1, cols=1)
-    metrics_history = session_state["metrics_history"]
-    timestamps = list(range(len(metrics_history)))
+    timestamps, columns = store.window()
 
     for metric in metrics_to_show:
-        if metric == "CPU Usage":
-            values = [m["system"]["cpu"] for m in metrics_history]
-            fig.add_trace(go.Scatter(x=timestamps, y=values, name="CPU Usage"), row=1, col=1)
-        elif metric == "Memory Usage":
-            values = [m["system"]["memory"] for m in metrics_history]
-            fig.add_trace(go.Scatter(x=timestamps, y=values, name="Memory Usage"), row=1, col=1)
-        elif metric == "Disk Usage":
-            values = [m["system"]["disk"] for m in metrics_history]
-            fig.add_trace(go.Scatter(x=timestamps, y=values, name="Disk Usage"), row=1, col=1)
+        key = METRIC_KEYS.get(metric)
+        if key is not None:
+            fig.add_trace(go.Scatter(x=timestamps, y=columns[key], name=metric), row=1, col=1)
 
+    fig.update_xaxes(type="date")
     fig.update_layout(title="System Metrics Over Time", height=400)
     st.plotly_chart(fig)
 
@@ -131,10 +156,6 @@ def main() -> None:
     setup_page()
     update_interval, metrics_to_show = load_config()
 
-    # Initialize session state
-    if "metrics_history" not in st.session_state:
-        st.session_state["metrics_history"] = []
-
     # Update and display metrics
     update_metrics(st.session_state)
     display_metrics(st.session_state, metrics_to_show)
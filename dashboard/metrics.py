@@ -1,13 +1,94 @@
 """System metrics collection module."""
+import heapq
 import json
 import logging
 import os
+import threading
 from datetime import datetime
+from typing import Any, NamedTuple, Optional
 
 import psutil
 
+from .collector_engine import CollectorEngine, Source
+
 logger = logging.getLogger(__name__)
 
+# Sort keys accepted by top_processes
+PROCESS_SORT_KEYS = {
+    "cpu": lambda p: (p.cpu_percent, p.memory_percent),
+    "memory": lambda p: (p.memory_percent, p.cpu_percent),
+}
+DEFAULT_TOP_PROCESSES = 10
+
+
+class ProcessSample(NamedTuple):
+    """Resource usage of one process at the latest tick."""
+
+    pid: int
+    name: str
+    cpu_percent: float
+    memory_percent: float
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the sample to its JSON form."""
+        return self._asdict()
+
+
+def top_processes(
+    samples: "tuple[ProcessSample, ...]",
+    count: int = DEFAULT_TOP_PROCESSES,
+    sort: str = "cpu",
+) -> list[dict[str, Any]]:
+    """Get the ``count`` heaviest processes by ``sort`` ("cpu" or "memory").
+
+    Raises
+    ------
+        ValueError: If ``sort`` is not a known sort key.
+    """
+    if sort not in PROCESS_SORT_KEYS:
+        msg = f"Unknown sort key: {sort}"
+        raise ValueError(msg)
+    return [p.to_dict() for p in heapq.nlargest(count, samples, key=PROCESS_SORT_KEYS[sort])]
+
+
+class ProcessTracker:
+    """Keep ``psutil.Process`` objects alive between ticks.
+
+    ``Process.cpu_percent(interval=None)`` reports usage since the previous
+    call on the same object, so reusing objects across ticks is what makes
+    the CPU figures meaningful. A PID whose create time changed belongs to a
+    new process and gets a fresh object; exited PIDs are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._processes: dict[int, psutil.Process] = {}
+
+    def sample(self) -> "tuple[ProcessSample, ...]":
+        """Sample every running process."""
+        samples = []
+        processes = {}
+        for proc in psutil.process_iter(["pid", "name", "create_time"]):
+            try:
+                pinfo = proc.info
+                pid = pinfo["pid"]
+                tracked = self._processes.get(pid)
+                if tracked is None or tracked.create_time() != pinfo["create_time"]:
+                    tracked = proc
+                with tracked.oneshot():
+                    samples.append(
+                        ProcessSample(
+                            pid,
+                            pinfo["name"] or "",
+                            tracked.cpu_percent(interval=None) or 0.0,
+                            tracked.memory_percent() or 0.0,
+                        ),
+                    )
+                processes[pid] = tracked
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        self._processes = processes
+        return tuple(samples)
+
 
 class MetricsCollector:
     """Collect and manage system metrics."""
@@ -19,11 +100,19 @@ class MetricsCollector:
             "processes": [],
             "timestamp": "",
         }
+        self.process_tracker = ProcessTracker()
+        self.process_samples: tuple[ProcessSample, ...] = ()
+
+    def collect_system_metrics(self, interval: Optional[float] = 1):
+        """Collect system-wide metrics.
 
-    def collect_system_metrics(self):
-        """Collect system-wide metrics."""
+        Args:
+        ----
+            interval: CPU sampling interval passed to ``psutil.cpu_percent``.
+                ``None`` compares against the previous call instead of blocking.
+        """
         try:
-            self.metrics["system"]["cpu"] = psutil.cpu_percent(interval=1)
+            self.metrics["system"]["cpu"] = psutil.cpu_percent(interval=interval)
             self.metrics["system"]["memory"] = psutil.virtual_memory().percent
             self.metrics["system"]["disk"] = psutil.disk_usage("/").percent
             self.metrics["timestamp"] = datetime.now().isoformat()
@@ -33,27 +122,9 @@ class MetricsCollector:
     def collect_process_metrics(self):
         """Collect process-specific metrics."""
         try:
-            processes = []
-            for proc in psutil.process_iter(["pid", "name", "cpu_percent", "memory_percent"]):
-                try:
-                    pinfo = proc.info
-                    processes.append(
-                        {
-                            "pid": pinfo["pid"],
-                            "name": pinfo["name"],
-                            "cpu_percent": pinfo["cpu_percent"] or 0.0,
-                            "memory_percent": pinfo["memory_percent"] or 0.0,
-                        },
-                    )
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            self.metrics["processes"] = sorted(
-                processes,
-                key=lambda x: (x["cpu_percent"], x["memory_percent"]),
-                reverse=True,
-            )[
-                :10
-            ]  # Keep only top 10 processes
+            self.process_samples = self.process_tracker.sample()
+            # Keep only top 10 processes
+            self.metrics["processes"] = top_processes(self.process_samples)
         except Exception as e:
             logger.error(f"Error collecting process metrics: {e}")
 
@@ -98,3 +169,219 @@ def collect_metrics(config=None):
     """
     collector = MetricsCollector(config)
     return collector.get_metrics()
+
+
+def disk_usage_by_mount() -> dict[str, tuple[str, Any]]:
+    """Get ``(device, usage)`` of every mounted physical partition by mount point."""
+    usage = {}
+    for partition in psutil.disk_partitions(all=False):
+        try:
+            mountpoint = partition.mountpoint
+            usage[mountpoint] = (partition.device, psutil.disk_usage(mountpoint))
+        except OSError:
+            continue
+    return usage
+
+
+def default_sources(interval: float = 1.0, disk_path: str = "/") -> list[Source]:
+    """Build the standard dashboard sources.
+
+    Fast-changing readings follow ``interval``; disk usage and CPU topology
+    change slowly and are sampled less often.
+
+    Args:
+    ----
+        interval: Sampling interval in seconds for fast-changing sources.
+        disk_path: Mount point whose usage is reported.
+
+    Returns:
+    -------
+        list: Sources for a :class:`CollectorEngine`.
+    """
+    tracker = ProcessTracker()
+    return [
+        Source("cpu", lambda: psutil.cpu_percent(interval=None), interval),
+        Source("memory", lambda: psutil.virtual_memory(), interval),
+        Source("network", lambda: psutil.net_io_counters(), interval),
+        Source("processes", tracker.sample, max(interval, 2.0)),
+        Source("disk", lambda: psutil.disk_usage(disk_path), max(interval, 30.0)),
+        Source("disks", disk_usage_by_mount, max(interval, 30.0)),
+        Source("cpu_info", lambda: (psutil.cpu_count(), psutil.cpu_freq()), max(interval, 300.0)),
+    ]
+
+
+def empty_snapshot() -> dict[str, Any]:
+    """Get a snapshot in the dashboard format with nothing sampled yet."""
+    return {
+        "system": {"cpu": 0.0, "memory": 0.0, "disk": 0.0},
+        "processes": [],
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+class MetricsSampler:
+    """Shared view of the collector engine in the dashboard snapshot format.
+
+    The sampler owns a :class:`CollectorEngine` running the
+    :func:`default_sources`, which samples every source on its own interval in
+    a background thread. CPU usage is measured against the previous tick
+    (``cpu_percent(interval=None)``), so neither the engine nor its readers
+    ever sleep inside psutil. Readers get a snapshot rebuilt only when the
+    engine published new readings; snapshots are never mutated afterwards.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        engine: Optional[CollectorEngine] = None,
+    ) -> None:
+        self.interval = interval
+        self.engine = engine or CollectorEngine(default_sources(interval))
+        self._snapshot: Optional[dict[str, Any]] = None
+        self._snapshot_version = -1
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the engine thread is alive."""
+        return self.engine.is_running
+
+    def start(self) -> None:
+        """Start the engine thread once it has published a first round."""
+        self.engine.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the engine thread and wait for it to exit."""
+        self.engine.stop(timeout)
+
+    def sample(self) -> dict[str, Any]:
+        """Sample every source once and return the resulting snapshot."""
+        self.engine.collect_now()
+        return self.get_snapshot()
+
+    def get_snapshot(self) -> dict[str, Any]:
+        """Return the latest snapshot without touching psutil.
+
+        Before the engine published its first round, which :meth:`start`
+        waits for, the snapshot is empty: zero usage and no processes.
+        """
+        version = self.engine.version
+        if version == 0:
+            return empty_snapshot()
+        snapshot = self._snapshot
+        if snapshot is not None and version == self._snapshot_version:
+            return snapshot
+
+        readings = self.engine.readings()
+        timestamps = [reading.timestamp for reading in readings.values()]
+        engine_value = self.engine.value
+        memory = engine_value("memory")
+        disk = engine_value("disk")
+        snapshot = {
+            "system": {
+                "cpu": engine_value("cpu", 0.0),
+                "memory": memory.percent if memory is not None else 0.0,
+                "disk": disk.percent if disk is not None else 0.0,
+            },
+            "processes": top_processes(engine_value("processes", ())),
+            "timestamp": (
+                datetime.fromtimestamp(max(timestamps)) if timestamps else datetime.now()
+            ).isoformat(),
+        }
+        self._snapshot = snapshot
+        self._snapshot_version = version
+        return snapshot
+
+    def top_processes(
+        self,
+        count: int = DEFAULT_TOP_PROCESSES,
+        sort: str = "cpu",
+    ) -> list[dict[str, Any]]:
+        """Rank processes from the latest tick without re-sampling them."""
+        return top_processes(self.engine.value("processes", ()), count, sort)
+
+
+_sampler: Optional[MetricsSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler(interval: float = 1.0) -> MetricsSampler:
+    """Get the shared metrics sampler, starting it on first use.
+
+    Args:
+    ----
+        interval: Sampling interval in seconds, used only when the sampler
+            is created.
+
+    Returns:
+    -------
+        MetricsSampler: The process-wide sampler instance.
+    """
+    global _sampler
+    if _sampler is None or not _sampler.is_running:
+        with _sampler_lock:
+            if _sampler is None:
+                _sampler = MetricsSampler(interval)
+            if not _sampler.is_running:
+                _sampler.start()
+    return _sampler
+
+
+def stop_sampler() -> None:
+    """Stop and discard the shared metrics sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is not None:
+            _sampler.stop()
+            _sampler = None
+
+
+def get_engine(interval: float = 1.0) -> CollectorEngine:
+    """Get the shared collector engine, starting it on first use.
+
+    Args:
+    ----
+        interval: Sampling interval in seconds, used only when the engine
+            is created.
+
+    Returns:
+    -------
+        CollectorEngine: The process-wide engine behind every metrics reader.
+    """
+    return get_sampler(interval).engine
+
+
+def get_latest_metrics(interval: float = 1.0) -> dict[str, Any]:
+    """Get the most recent metrics snapshot without sampling.
+
+    Only the call that starts the shared sampler waits, for the engine's
+    first round; async callers should make that call in a thread.
+
+    Args:
+    ----
+        interval: Sampling interval in seconds for the shared sampler.
+
+    Returns:
+    -------
+        dict: Latest system and process metrics.
+    """
+    return get_sampler(interval).get_snapshot()
+
+
+def get_top_processes(
+    count: int = DEFAULT_TOP_PROCESSES,
+    sort: str = "cpu",
+    interval: float = 1.0,
+) -> list[dict[str, Any]]:
+    """Get the heaviest processes from the latest tick without blocking.
+
+    Args:
+    ----
+        count: Number of processes to return.
+        sort: Sort key, "cpu" or "memory".
+        interval: Sampling interval in seconds for the shared sampler.
+
+    Returns:
+    -------
+        list: Process metrics, heaviest first.
+    """
+    return get_sampler(interval).top_processes(count, sort)
@@ -0,0 +1,246 @@
+"""Request latency instrumentation for Flask routes and WebSocket handlers.
+
+Observations go into the calling thread's own shard of counters, so the
+hot path takes no lock; a scrape merges the shards of all threads into one
+``response_time_seconds`` histogram labelled by endpoint. Endpoint labels
+are admitted up to ``max_endpoints``; later ones are counted under
+``other`` so a flood of distinct paths or message types cannot blow up
+series cardinality.
+"""
+import bisect
+import contextvars
+import functools
+import threading
+from time import perf_counter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from flask import Flask, current_app, request
+from prometheus_client.core import HistogramMetricFamily
+from prometheus_client.utils import floatToGoString
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+DEFAULT_MAX_ENDPOINTS = 100
+OTHER_ENDPOINT = "other"
+UNMATCHED_ENDPOINT = "unmatched"
+
+_EXTENSION_KEY = "request_timer"
+# Set by the before_request hook; a context variable is far cheaper than
+# going through the ``request`` proxy and follows Flask's own contexts
+_request_started: contextvars.ContextVar[float] = contextvars.ContextVar("request_started")
+
+# Per-endpoint counters: one count per bucket, the +Inf count, then the sum
+Cell = List[float]
+T = TypeVar("T")
+
+
+class RequestTimer:
+    """Latency histogram with lock-free per-thread accumulation.
+
+    Register the timer in a ``CollectorRegistry`` to export it. Each thread
+    only ever writes its own shard; :meth:`collect` copies the shards under
+    the GIL and adds them up, so a scrape may miss observations still in
+    flight but never corrupts them. Shards of finished threads are folded
+    into a retired total on the next scrape.
+    """
+
+    def __init__(
+        self,
+        name: str = "response_time_seconds",
+        documentation: str = "Response time in seconds",
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+        max_endpoints: int = DEFAULT_MAX_ENDPOINTS,
+    ) -> None:
+        """Initialize the timer.
+
+        Raises
+        ------
+            ValueError: If ``buckets`` is empty or not strictly increasing.
+        """
+        bounds = tuple(float(bound) for bound in buckets if bound != float("inf"))
+        if not bounds or any(a >= b for a, b in zip(bounds, bounds[1:])):
+            msg = "Buckets must be a non-empty, strictly increasing sequence"
+            raise ValueError(msg)
+        self.name = name
+        self.documentation = documentation
+        self.bounds = bounds
+        self.max_endpoints = max_endpoints
+        self._endpoints: Dict[str, None] = {OTHER_ENDPOINT: None}
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[str, Cell]]] = []
+        self._retired: Dict[str, Cell] = {}
+        self._lock = threading.Lock()
+
+    def label(self, endpoint: str) -> str:
+        """Get the label ``endpoint`` is counted under, admitting it if there is room."""
+        if endpoint in self._endpoints:
+            return endpoint
+        with self._lock:
+            if endpoint in self._endpoints:
+                return endpoint
+            # OTHER_ENDPOINT is always present and does not use up a slot
+            if len(self._endpoints) <= self.max_endpoints:
+                self._endpoints[endpoint] = None
+                return endpoint
+        return OTHER_ENDPOINT
+
+    def observe(self, duration: float, endpoint: str = OTHER_ENDPOINT) -> None:
+        """Record one request of ``duration`` seconds."""
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        cell = shard.get(endpoint)
+        if cell is None:
+            cell = self._cell(shard, endpoint)
+        cell[bisect.bisect_left(self.bounds, duration)] += 1
+        cell[-1] += duration
+
+    def _new_shard(self) -> Dict[str, Cell]:
+        shard: Dict[str, Cell] = {}
+        self._local.shard = shard
+        with self._lock:
+            self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _cell(self, shard: Dict[str, Cell], endpoint: str) -> Cell:
+        label = self.label(endpoint)
+        cell = shard.get(label)
+        if cell is None:
+            # Keyed by label only, so overflowing endpoints keep the shard bounded
+            cell = shard[label] = [0] * (len(self.bounds) + 1) + [0.0]
+        return cell
+
+    def totals(self) -> Dict[str, Cell]:
+        """Merge the counters of every thread by endpoint."""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    _add(self._retired, shard)
+            self._shards = live
+            totals = {label: list(cell) for label, cell in self._retired.items()}
+        for _, shard in live:
+            _add(totals, shard)
+        return totals
+
+    def describe(self) -> List[HistogramMetricFamily]:
+        """Describe the exported family so registries detect name clashes."""
+        return [HistogramMetricFamily(self.name, self.documentation, labels=["endpoint"])]
+
+    def collect(self) -> Iterator[HistogramMetricFamily]:
+        """Yield the merged histogram."""
+        family = HistogramMetricFamily(self.name, self.documentation, labels=["endpoint"])
+        bounds = [floatToGoString(bound) for bound in self.bounds] + ["+Inf"]
+        for label, cell in sorted(self.totals().items()):
+            cumulative = 0.0
+            buckets = []
+            for bound, count in zip(bounds, cell):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            family.add_metric([label], buckets, cell[-1])
+        yield family
+
+
+def _add(totals: Dict[str, Cell], shard: Dict[str, Cell]) -> None:
+    # list() copies a dict or list in one step under the GIL, so this is
+    # safe while the owning thread keeps observing
+    for label, cell in list(shard.items()):
+        values = list(cell)
+        total = totals.get(label)
+        if total is None:
+            totals[label] = values
+        else:
+            for index, value in enumerate(values):
+                total[index] += value
+
+
+def timed(
+    timer: RequestTimer, endpoint: Union[str, Callable[..., str]],
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Decorate a coroutine function so every call is observed by ``timer``.
+
+    Args:
+    ----
+        timer: Timer to record into.
+        endpoint: Endpoint label, or a callable building it from the
+            handler's arguments.
+
+    Returns:
+    -------
+        Decorator for coroutine functions.
+    """
+
+    def decorator(handler: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(handler)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            started = perf_counter()
+            try:
+                return await handler(*args, **kwargs)
+            finally:
+                label = endpoint if isinstance(endpoint, str) else endpoint(*args, **kwargs)
+                timer.observe(perf_counter() - started, label)
+
+        return wrapper
+
+    return decorator
+
+
+def init_request_timing(app: Flask, timer: Optional[RequestTimer] = None) -> RequestTimer:
+    """Time every request of ``app``.
+
+    Requests are labelled with their Flask endpoint name, which is bounded
+    by the routes, or ``unmatched`` when no route matched. Without a
+    ``timer`` one is created from ``REQUEST_TIMING_BUCKETS`` and
+    ``REQUEST_TIMING_MAX_ENDPOINTS``.
+
+    Args:
+    ----
+        app: Flask application.
+        timer: Timer to record into.
+
+    Returns:
+    -------
+        RequestTimer: The timer, also available from :func:`get_request_timer`.
+    """
+    if timer is None:
+        timer = RequestTimer(
+            buckets=app.config.get("REQUEST_TIMING_BUCKETS") or DEFAULT_LATENCY_BUCKETS,
+            max_endpoints=app.config.get("REQUEST_TIMING_MAX_ENDPOINTS", DEFAULT_MAX_ENDPOINTS),
+        )
+    observe = timer.observe
+    started_at = _request_started
+
+    @app.before_request
+    def start_request_timer() -> None:
+        started_at.set(perf_counter())
+
+    @app.after_request
+    def observe_request_time(response: Any) -> Any:
+        started = started_at.get(None)
+        if started is not None:
+            observe(perf_counter() - started, request.endpoint or UNMATCHED_ENDPOINT)
+        return response
+
+    app.extensions[_EXTENSION_KEY] = timer
+    return timer
+
+
+def get_request_timer() -> Optional[RequestTimer]:
+    """Get the request timer of the current app, if it has one."""
+    return current_app.extensions.get(_EXTENSION_KEY)
@@ -1,13 +1,25 @@
 """Dashboard routes module."""
 import logging
 
-from flask import Blueprint, jsonify, render_template, request
+from flask import Blueprint, current_app, jsonify, render_template, request
 
-from .metrics import MetricsCollector
+from .metrics import (
+    DEFAULT_TOP_PROCESSES,
+    PROCESS_SORT_KEYS,
+    get_latest_metrics,
+    get_top_processes,
+)
 
 logger = logging.getLogger(__name__)
 bp = Blueprint("dashboard", __name__)
 
+MAX_TOP_PROCESSES = 100
+
+
+def _sample_interval() -> float:
+    """Get the background sampling interval from the app config."""
+    return float(current_app.config.get("METRICS_SAMPLE_INTERVAL", 1.0))
+
 
 @bp.route("/health")
 def health_check():
@@ -18,9 +30,28 @@ def health_check():
 @bp.route("/metrics")
 def get_metrics():
     """Get system metrics endpoint."""
+    top = request.args.get("top")
+    sort = request.args.get("sort")
+    try:
+        count = int(top) if top is not None else None
+    except ValueError:
+        count = -1
+    if count is not None and not 0 <= count <= MAX_TOP_PROCESSES:
+        message = f"top must be an integer between 0 and {MAX_TOP_PROCESSES}"
+        return jsonify({"status": "error", "message": message}), 400
+    if sort is not None and sort not in PROCESS_SORT_KEYS:
+        message = f"sort must be one of: {', '.join(PROCESS_SORT_KEYS)}"
+        return jsonify({"status": "error", "message": message}), 400
+
     try:
-        collector = MetricsCollector()
-        metrics = collector.get_metrics()
+        metrics = get_latest_metrics(_sample_interval())
+        if count is not None or sort is not None:
+            processes = get_top_processes(
+                count if count is not None else DEFAULT_TOP_PROCESSES,
+                sort or "cpu",
+                _sample_interval(),
+            )
+            metrics = {**metrics, "processes": processes}
         return jsonify({"status": "success", "data": metrics})
     except Exception as e:
         logger.error(f"Error getting metrics: {e}")
@@ -35,8 +66,7 @@ def monitor():
         if error:
             return render_template("monitor.html", error=True)
 
-        collector = MetricsCollector()
-        metrics = collector.get_metrics()
+        metrics = get_latest_metrics(_sample_interval())
         return render_template("monitor.html", metrics=metrics)
     except Exception as e:
         logger.error(f"Error in monitor view: {e}")
@@ -1,15 +1,29 @@
+// Binary metrics frames; see dashboard/websocket/encoding.py for the layout
+const FRAME_HEADER_SIZE = 14;
+const FRAME_VERSION = 1;
+const DELTA_FLAG = 0x01;
+
 class MetricsWebSocket {
     constructor(url) {
         this.url = url;
         this.ws = null;
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
+        this.metrics = {};
+        // Metric names indexed by ID, from the server's schema frames
+        this.schema = [];
+        this.textDecoder = new TextDecoder();
     }
 
     connect() {
         this.ws = new WebSocket(this.url);
+        this.ws.binaryType = 'arraybuffer';
         this.ws.onopen = () => console.log('Connected to metrics server');
-        this.ws.onmessage = (event) => this.updateDashboard(JSON.parse(event.data));
+        this.ws.onmessage = (event) => this.handleMessage(
+            event.data instanceof ArrayBuffer
+                ? this.decodeFrame(event.data)
+                : JSON.parse(event.data),
+        );
         this.ws.onclose = () => this.reconnect();
         this.ws.onerror = (error) => console.error('WebSocket error:', error);
     }
@@ -21,6 +35,58 @@ class MetricsWebSocket {
         }
     }
 
+    decodeFrame(buffer) {
+        const view = new DataView(buffer);
+        if (view.getUint8(0) !== 0x44 || view.getUint8(1) !== 0x4d || view.getUint8(2) !== FRAME_VERSION) {
+            throw new Error('Not a metrics frame');
+        }
+        const flags = view.getUint8(3);
+        const timestamp = view.getFloat64(4, true);
+        const count = view.getUint16(12, true);
+        const valuesOffset = FRAME_HEADER_SIZE + 2 * count;
+        const trailerOffset = valuesOffset + 4 * count;
+        const data = trailerOffset < buffer.byteLength
+            ? JSON.parse(this.textDecoder.decode(new Uint8Array(buffer, trailerOffset)))
+            : {};
+        for (let i = 0; i < count; i++) {
+            const name = this.schema[view.getUint16(FRAME_HEADER_SIZE + 2 * i, true)];
+            const value = view.getFloat32(valuesOffset + 4 * i, true);
+            if (Array.isArray(name)) {
+                // Table cell: [field, row, column]
+                data[name[0]][name[1]][name[2]] = value;
+            } else {
+                data[name] = value;
+            }
+        }
+        return {
+            type: 'metrics',
+            timestamp: Number.isNaN(timestamp) ? null : new Date(timestamp * 1000).toISOString(),
+            delta: (flags & DELTA_FLAG) !== 0,
+            data,
+        };
+    }
+
+    handleMessage(message) {
+        if (message.type === 'schema') {
+            this.schema = message.metrics;
+            return;
+        }
+        if (message.type !== 'metrics' || !message.data) {
+            this.updateDashboard(message);
+            return;
+        }
+        // Delta frames carry only the fields that changed since the last frame
+        this.metrics = message.delta
+            ? Object.assign(this.metrics, message.data)
+            : Object.assign({}, message.data);
+        this.updateDashboard(this.metrics);
+    }
+
+    subscribe(metrics, encoding = 'json') {
+        // 'binary' asks for compact float32 frames instead of JSON text
+        this.ws.send(JSON.stringify({ type: 'subscribe', metrics, encoding }));
+    }
+
     updateDashboard(metrics) {
         Object.entries(metrics).forEach(([key, value]) => {
             const element = document.getElementById(key);
@@ -0,0 +1,214 @@
+"""SQLite storage profile for the dashboard database.
+
+File databases run in WAL mode, where readers see the last committed
+snapshot and never wait for the writer. The SQLAlchemy engine of
+``db`` is kept to a single connection that serializes every write, and
+reads go through a separate pool of read-only connections from
+:func:`get_reader_engine`: ``db.session`` is a :class:`ReadRoutingSession`
+that sends its queries there, so reads never queue behind a batch of
+samples.
+"""
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+
+from flask import Flask, current_app, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, make_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "wal",
+    # Only a power loss can drop the last commits; WAL stays consistent
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    # Negative sizes are in KiB: 64 MiB per connection
+    "cache_size": -64 * 1024,
+    "busy_timeout": 5000,
+}
+DEFAULT_READER_POOL_SIZE = 4
+
+# PRAGMA synchronous reads back as a number
+_SYNCHRONOUS_LEVELS = {"off": 0, "normal": 1, "full": 2, "extra": 3}
+
+_EXTENSION_KEY = "sqlite_readers"
+
+
+class StorageError(Exception):
+    """The database cannot run with the storage profile."""
+
+
+def is_sqlite_file(uri: Optional[str]) -> bool:
+    """Whether ``uri`` names an on-disk SQLite database."""
+    if not uri:
+        return False
+    url = make_url(uri)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+def apply_pragmas(dbapi_connection: Any, pragmas: Dict[str, Any]) -> None:
+    """Set ``pragmas`` on a new DB-API connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def check_pragmas(dbapi_connection: Any, pragmas: Dict[str, Any]) -> Dict[str, Tuple[Any, Any]]:
+    """Read ``pragmas`` back from a connection.
+
+    Args:
+    ----
+        dbapi_connection: Open DB-API connection.
+        pragmas: Pragma name to expected value.
+
+    Returns:
+    -------
+        Mapping of each pragma that differs to ``(expected, actual)``.
+    """
+    mismatches = {}
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, expected in pragmas.items():
+            row = cursor.execute(f"PRAGMA {name}").fetchone()
+            actual = row[0] if row else None
+            wanted = expected
+            if name == "synchronous" and isinstance(expected, str):
+                wanted = _SYNCHRONOUS_LEVELS.get(expected.lower(), expected)
+            if str(actual).lower() != str(wanted).lower():
+                mismatches[name] = (expected, actual)
+    finally:
+        cursor.close()
+    return mismatches
+
+
+def init_storage(app: Flask, db: Any) -> Optional[Engine]:
+    """Initialize ``db`` on ``app`` with the storage profile.
+
+    For SQLite files, the ``db`` engine is limited to one connection, a
+    read-only reader pool of ``SQLITE_READER_POOL_SIZE`` connections is
+    created, ``SQLITE_PRAGMAS`` overrides are merged into
+    :data:`DEFAULT_PRAGMAS` and applied to every connection, and both
+    engines are checked once so a pragma SQLite refused stops startup
+    rather than being discovered under load; with ``SQLITE_PRAGMAS_STRICT``
+    off it is only logged. Other databases are initialized unchanged.
+
+    Args:
+    ----
+        app: Flask application.
+        db: Flask-SQLAlchemy extension.
+
+    Returns:
+    -------
+        Engine: The reader engine, or ``None`` if the profile does not apply.
+
+    Raises:
+    ------
+        StorageError: If a pragma did not take effect and
+            ``SQLITE_PRAGMAS_STRICT`` is on.
+    """
+    if not is_sqlite_file(app.config.get("SQLALCHEMY_DATABASE_URI")):
+        db.init_app(app)
+        return None
+
+    options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+    options.setdefault("pool_size", 1)
+    options.setdefault("max_overflow", 0)
+    db.init_app(app)
+
+    pragmas = {**DEFAULT_PRAGMAS, **app.config.get("SQLITE_PRAGMAS", {})}
+    with app.app_context():
+        writer = db.engine
+    event.listen(
+        writer, "connect", lambda dbapi_connection, _: apply_pragmas(dbapi_connection, pragmas),
+    )
+
+    reader_pragmas = {**pragmas, "query_only": 1}
+    reader = create_engine(
+        writer.url,
+        pool_size=app.config.get("SQLITE_READER_POOL_SIZE", DEFAULT_READER_POOL_SIZE),
+        max_overflow=0,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(
+        reader,
+        "connect",
+        lambda dbapi_connection, _: apply_pragmas(dbapi_connection, reader_pragmas),
+    )
+    app.extensions[_EXTENSION_KEY] = reader
+
+    problems = []
+    for name, engine, expected in (("writer", writer, pragmas), ("reader", reader, reader_pragmas)):
+        with engine.connect() as connection:
+            mismatches = check_pragmas(connection.connection.dbapi_connection, expected)
+        problems.extend(
+            f"SQLite {name} pragma {pragma} is {actual!r}, expected {wanted!r}"
+            for pragma, (wanted, actual) in mismatches.items()
+        )
+    if problems and app.config.get("SQLITE_PRAGMAS_STRICT", True):
+        reader.dispose()
+        writer.dispose()
+        raise StorageError("; ".join(problems))
+    for problem in problems:
+        logger.warning(problem)
+    return reader
+
+
+def get_reader_engine() -> Optional[Engine]:
+    """Get the read-only engine of the current app, if it has one."""
+    return current_app.extensions.get(_EXTENSION_KEY)
+
+
+class ReadRoutingSession(Session):
+    """``db.session`` that runs plain queries on the reader engine.
+
+    ``SELECT`` statements go to :func:`get_reader_engine` when the app has
+    one. Flushes and every other statement go to the single writer
+    connection, and so does everything after the first write of a
+    transaction, so a transaction always reads its own writes.
+    """
+
+    def __init__(self, db: Any, **kwargs: Any) -> None:
+        """Initialize the session for the Flask-SQLAlchemy extension ``db``."""
+        super().__init__(db, **kwargs)
+        self._wrote = False
+
+    def get_bind(
+        self,
+        mapper: Any = None,
+        clause: Any = None,
+        bind: Optional[Any] = None,
+        **kwargs: Any,
+    ) -> Union[Engine, Connection]:
+        """Get the reader engine for queries and the writer otherwise."""
+        if bind is None and not self._wrote:
+            if not self._flushing and getattr(clause, "is_select", False) and has_app_context():
+                reader = current_app.extensions.get(_EXTENSION_KEY)
+                if reader is not None:
+                    return reader
+            self._wrote = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def commit(self) -> None:
+        """Commit, routing the next transaction's queries to the readers again."""
+        try:
+            super().commit()
+        finally:
+            self._wrote = False
+
+    def rollback(self) -> None:
+        """Roll back, routing the next transaction's queries to the readers again."""
+        try:
+            super().rollback()
+        finally:
+            self._wrote = False
+
+    def close(self) -> None:
+        """Close, routing the next transaction's queries to the readers again."""
+        try:
+            super().close()
+        finally:
+            self._wrote = False
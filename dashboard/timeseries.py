@@ -0,0 +1,110 @@
+"""In-memory ring-buffer time-series store."""
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+
+
+class SeriesStore:
+    """Fixed-capacity ring buffer holding one float column per metric.
+
+    Every column, plus the timestamp column, is preallocated at twice the
+    capacity and each sample is written to both halves. Any window of up to
+    ``capacity`` most recent samples is therefore a contiguous slice, so
+    :meth:`window` returns NumPy views instead of copies, and :meth:`append`
+    is O(1) regardless of how full the buffer is.
+
+    Timestamps are stored as epoch milliseconds, which Plotly plots directly
+    on a date axis.
+    """
+
+    def __init__(self, metrics: Iterable[str], capacity: int) -> None:
+        if capacity <= 0:
+            msg = "capacity must be positive"
+            raise ValueError(msg)
+        self.metrics = tuple(metrics)
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self._columns = {name: np.zeros(2 * capacity, dtype=np.float64) for name in self.metrics}
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Timestamp of the newest sample, in epoch milliseconds."""
+        with self._lock:
+            return self._last_timestamp()
+
+    def append(self, timestamp_ms: float, values: dict[str, float]) -> None:
+        """Append one sample; missing metrics are recorded as NaN."""
+        with self._lock:
+            self._append(timestamp_ms, values)
+
+    def append_if_newer(self, timestamp_ms: float, values: dict[str, float]) -> bool:
+        """Append one sample unless it is not newer than the newest stored.
+
+        The check and the append happen under one lock, so concurrent
+        writers of the same snapshot record it only once.
+
+        Returns
+        -------
+            Whether the sample was appended.
+        """
+        with self._lock:
+            last_timestamp = self._last_timestamp()
+            if last_timestamp is not None and timestamp_ms <= last_timestamp:
+                return False
+            self._append(timestamp_ms, values)
+            return True
+
+    def _last_timestamp(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self._timestamps[self._head - 1 + self.capacity])
+
+    def _append(self, timestamp_ms: float, values: dict[str, float]) -> None:
+        head = self._head
+        mirror = head + self.capacity
+        self._timestamps[head] = self._timestamps[mirror] = timestamp_ms
+        for name, column in self._columns.items():
+            value = values.get(name)
+            column[head] = column[mirror] = np.nan if value is None else value
+        self._head = (head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def window(self, count: Optional[int] = None) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """Return views of the ``count`` most recent samples, oldest first.
+
+        Args:
+        ----
+            count: Number of samples; defaults to everything stored.
+
+        Returns:
+        -------
+            Tuple of the timestamp view and a mapping of metric name to view.
+            Views share memory with the store, so copy them before holding
+            on to them across appends.
+        """
+        with self._lock:
+            size = self._size if count is None else min(count, self._size)
+            end = self._head + self.capacity
+            start = end - size
+            return (
+                self._timestamps[start:end],
+                {name: column[start:end] for name, column in self._columns.items()},
+            )
+
+    def latest(self) -> dict[str, float]:
+        """Return the newest value of every metric."""
+        _, columns = self.window(1)
+        return {name: float(view[0]) for name, view in columns.items() if len(view)}
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        with self._lock:
+            self._head = 0
+            self._size = 0
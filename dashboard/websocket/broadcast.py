@@ -0,0 +1,318 @@
+"""Subscription-aware, delta-encoded broadcast engine for WebSocket clients."""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+import websockets
+
+from .encoding import BINARY, ENCODINGS, JSON, MetricSchema, encode_binary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 8
+# Overflow policies: drop the queued frames for the newest state, or drop the client
+LATEST_WINS = "latest"
+DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (LATEST_WINS, DISCONNECT)
+LATENCY_SAMPLES = 1024
+
+Frame = Union[str, bytes]
+# A queued frame and the future of its delivery, if anyone waits for it
+_Item = tuple[Frame, Optional["asyncio.Future[bool]"]]
+
+
+@dataclass(eq=False)
+class ClientState:
+    """Per-connection broadcast state."""
+
+    websocket: Any
+    subscription: Optional[frozenset[str]] = None
+    version: Optional[int] = None
+    encoding: str = JSON
+    # Metric names of the schema the client has been sent
+    schema_size: int = 0
+    last_error: Optional[str] = field(default=None, repr=False)
+    queue: Optional["asyncio.Queue[_Item]"] = field(default=None, repr=False)
+    writer: Optional["asyncio.Task[None]"] = field(default=None, repr=False)
+    sent: int = 0
+    dropped: int = 0
+
+
+class BroadcastEngine:
+    """Fan out metrics frames to WebSocket clients.
+
+    Clients are grouped by their subscription set. For every group the engine
+    filters the payload once, computes the fields that changed since the
+    group's previous frame and serializes at most two frames per tick and
+    encoding: a delta for clients that received the previous frame and a
+    full frame for clients that just joined or changed their subscription.
+    Binary clients get a ``schema`` text frame ahead of any frame that uses
+    metric IDs they have not been told about.
+
+    Every client has its own writer task draining a queue of at most
+    ``queue_size`` frames, so broadcasting only enqueues and a stalled peer
+    never holds up the others. A writer runs only while its queue has
+    frames, so idle connections cost no task. When a client's queue is full, the
+    ``latest`` policy discards its queued frames and sends it the current
+    full frame instead, while ``disconnect`` drops the client. A send that
+    takes longer than ``send_timeout`` also drops the client.
+
+    Messages without a ``data`` mapping are not delta-encoded; they are
+    serialized once and sent as-is to every client.
+    """
+
+    def __init__(
+        self,
+        send_timeout: float = 5.0,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow: str = LATEST_WINS,
+    ) -> None:
+        """Initialize the engine.
+
+        Raises
+        ------
+            ValueError: If ``overflow`` is not a known policy.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            msg = f"Unknown overflow policy: {overflow}"
+            raise ValueError(msg)
+        self.send_timeout = send_timeout
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.clients: dict[Any, ClientState] = {}
+        self.dropped_frames = 0
+        self.schema = MetricSchema()
+        self._version = 0
+        self._group_data: dict[Optional[frozenset[str]], tuple[int, dict[str, Any]]] = {}
+        self._failed: set[Any] = set()
+        self._latencies: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def add(self, websocket: Any) -> ClientState:
+        """Start tracking a client."""
+        state = self.clients.get(websocket)
+        if state is None:
+            state = ClientState(websocket)
+            self.clients[websocket] = state
+        return state
+
+    def remove(self, websocket: Any) -> None:
+        """Stop tracking a client and its writer."""
+        state = self.clients.pop(websocket, None)
+        if state is None:
+            return
+        if state.writer is not None and state.writer is not asyncio.current_task():
+            state.writer.cancel()
+        if state.queue is not None:
+            self._discard(state)
+
+    def subscribe(self, websocket: Any, metrics: Optional[list[str]], encoding: str = JSON) -> None:
+        """Set a client's subscription and encoding; the next frame it receives is full.
+
+        Raises
+        ------
+            ValueError: If ``encoding`` is not a known encoding.
+        """
+        if encoding not in ENCODINGS:
+            msg = f"Unknown encoding: {encoding}"
+            raise ValueError(msg)
+        state = self.add(websocket)
+        state.subscription = frozenset(metrics) if metrics else None
+        state.encoding = encoding
+        state.version = None
+
+    def groups(self) -> dict[Optional[frozenset[str]], list[ClientState]]:
+        """Group tracked clients by subscription set."""
+        groups: dict[Optional[frozenset[str]], list[ClientState]] = {}
+        for state in self.clients.values():
+            groups.setdefault(state.subscription, []).append(state)
+        return groups
+
+    async def broadcast(self, message: dict[str, Any], wait: bool = True) -> set[Any]:
+        """Queue ``message`` for all clients.
+
+        Args:
+        ----
+            message: Message to send.
+            wait: Wait until the message is sent to, or failed for, every
+                client. Otherwise return as soon as it is queued.
+
+        Returns:
+        -------
+            Set of websockets that failed, timed out or overflowed since the
+            previous call; they are no longer tracked.
+        """
+        if not self.clients:
+            return self._take_failed()
+
+        data = message.get("data")
+        if not isinstance(data, dict):
+            frame = json.dumps(message)
+            deliveries = []
+            for state in list(self.clients.values()):
+                if self._make_room(state):
+                    deliveries.append((state, frame))
+            return await self._send_all(deliveries, wait)
+
+        self._version += 1
+        version = self._version
+        envelope = {key: value for key, value in message.items() if key != "data"}
+        deliveries = []
+        group_data = {}
+
+        for subscription, states in self.groups().items():
+            if subscription is None:
+                payload = data
+            else:
+                payload = {key: value for key, value in data.items() if key in subscription}
+            group_data[subscription] = (version, payload)
+
+            previous_version, previous = self._group_data.get(subscription, (None, {}))
+            frames: dict[tuple[str, bool], Frame] = {}
+            changed = None
+            for state in states:
+                if not self._make_room(state):
+                    continue
+                delta = state.version is not None and state.version == previous_version
+                if delta:
+                    if changed is None:
+                        changed = {
+                            key: value
+                            for key, value in payload.items()
+                            if key not in previous or previous[key] != value
+                        }
+                    if not changed:
+                        state.version = version
+                        continue
+                frame = frames.get((state.encoding, delta))
+                if frame is None:
+                    frame_data = changed if delta else payload
+                    frame = self._encode(envelope, frame_data, delta, state.encoding)
+                    frames[state.encoding, delta] = frame
+                state.version = version
+                if state.encoding == BINARY and state.schema_size < len(self.schema):
+                    deliveries.append((state, self.schema.message()))
+                    state.schema_size = len(self.schema)
+                deliveries.append((state, frame))
+
+        self._group_data = group_data
+        return await self._send_all(deliveries, wait)
+
+    def _encode(
+        self,
+        envelope: dict[str, Any],
+        data: dict[str, Any],
+        delta: bool,
+        encoding: str,
+    ) -> Frame:
+        if encoding == BINARY:
+            return encode_binary(self.schema, data, envelope.get("timestamp"), delta)
+        return json.dumps({**envelope, "delta": delta, "data": data})
+
+    def _make_room(self, state: ClientState) -> bool:
+        """Apply the overflow policy to a full queue; False if the client was dropped."""
+        if state.queue is None or state.queue.qsize() < self.queue_size:
+            return True
+        if self.overflow == DISCONNECT:
+            state.last_error = "send queue overflow"
+            logger.warning("Dropping WebSocket client whose send queue is full")
+            self._fail(state)
+            return False
+        self._discard(state)
+        # The discarded frames may include deltas or a schema, so start over
+        state.version = None
+        state.schema_size = 0
+        return True
+
+    def _discard(self, state: ClientState) -> None:
+        while not state.queue.empty():
+            _, future = state.queue.get_nowait()
+            state.dropped += 1
+            self.dropped_frames += 1
+            if future is not None and not future.done():
+                future.set_result(False)
+
+    def _fail(self, state: ClientState) -> None:
+        self._failed.add(state.websocket)
+        self.remove(state.websocket)
+
+    def _take_failed(self) -> set[Any]:
+        failed, self._failed = self._failed, set()
+        return failed
+
+    async def _send_all(self, deliveries: list[tuple[ClientState, Frame]], wait: bool) -> set[Any]:
+        loop = asyncio.get_running_loop()
+        futures = []
+        for state, frame in deliveries:
+            if state.queue is None:
+                # Bounded by _make_room; a schema frame may go one over
+                state.queue = asyncio.Queue()
+            future = loop.create_future() if wait else None
+            state.queue.put_nowait((frame, future))
+            if state.writer is None:
+                state.writer = asyncio.create_task(self._write(state))
+            if future is not None:
+                futures.append(future)
+        if futures:
+            await asyncio.wait(futures)
+        return self._take_failed()
+
+    async def _write(self, state: ClientState) -> None:
+        """Send the queued frames of one client, then exit until more are queued."""
+        try:
+            while not state.queue.empty():
+                frame, future = state.queue.get_nowait()
+                ok = False
+                try:
+                    ok = await self._send(state, frame)
+                finally:
+                    # Also settled when the client is removed mid-send
+                    if future is not None and not future.done():
+                        future.set_result(ok)
+                if not ok:
+                    self._fail(state)
+                    return
+        finally:
+            state.writer = None
+
+    async def _send(self, state: ClientState, frame: Frame) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(state.websocket.send(frame), self.send_timeout)
+            self._latencies.append(time.perf_counter() - started)
+            state.sent += 1
+            return True
+        except asyncio.TimeoutError:
+            state.last_error = "send timeout"
+            logger.warning("Dropping slow WebSocket client after send timeout")
+        except websockets.ConnectionClosed:
+            state.last_error = "connection closed"
+        except Exception as e:
+            state.last_error = str(e)
+            logger.error(f"Error broadcasting to client: {e}")
+        return False
+
+    def stats(self) -> dict[str, Any]:
+        """Get queue depth, dropped frame and send latency statistics.
+
+        Returns
+        -------
+            ``clients``, ``queue_depth`` (``total`` and ``max``),
+            ``dropped_frames`` and ``send_latency`` percentiles in seconds
+            (``p50``, ``p95``, ``p99``) over the last sends.
+        """
+        depths = [state.queue.qsize() for state in self.clients.values() if state.queue is not None]
+        latencies = sorted(self._latencies)
+        percentiles: dict[str, Optional[float]] = {}
+        for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            index = min(int(fraction * len(latencies)), len(latencies) - 1)
+            percentiles[name] = latencies[index] if latencies else None
+        return {
+            "clients": len(self.clients),
+            "queue_depth": {"total": sum(depths), "max": max(depths, default=0)},
+            "dropped_frames": self.dropped_frames,
+            "send_latency": percentiles,
+        }
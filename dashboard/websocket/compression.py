@@ -0,0 +1,185 @@
+"""permessage-deflate that compresses each broadcast frame once.
+
+websockets' own permessage-deflate keeps a compression context per
+connection, so the same broadcast frame is deflated again for every
+client. :class:`SharedDeflateFactory` negotiates
+``server_no_context_takeover`` instead. Every message is then deflated from
+a fresh context and the output depends only on the payload and the window
+size, so a :class:`DeflateCache` shared by all connections compresses each
+distinct frame once and hands the same bytes to every client that sends
+it.
+
+Frames shorter than the cache's threshold go out raw, with RSV1 clear, as
+RFC 7692 allows. The threshold adapts: it rises past frames that deflate
+saved too little on, and falls back while frames near it still compress
+well.
+"""
+import dataclasses
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+from websockets.frames import CTRL_OPCODES, OP_CONT, Frame
+
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_THRESHOLD = 128
+MAX_THRESHOLD = 4096
+# Smallest fraction of a frame deflate must save to be worth it
+MIN_SAVING = 0.1
+
+_EMPTY_UNCOMPRESSED_BLOCK = b"\x00\x00\xff\xff"
+
+
+class DeflateCache:
+    """Deflated payloads shared by all connections, with an adaptive size threshold."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        threshold: int = DEFAULT_THRESHOLD,
+        max_threshold: int = MAX_THRESHOLD,
+        min_saving: float = MIN_SAVING,
+        compress_settings: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+        ----
+            maxsize: Most distinct payloads kept.
+            threshold: Initial and lowest size in bytes worth compressing.
+            max_threshold: Highest the threshold adapts to.
+            min_saving: Fraction of a frame deflate must save for frames
+                of its size to keep being compressed.
+            compress_settings: Passed to :func:`zlib.compressobj`.
+        """
+        self.maxsize = maxsize
+        self.min_threshold = threshold
+        self.threshold = threshold
+        self.max_threshold = max_threshold
+        self.min_saving = min_saving
+        self.compress_settings = compress_settings or {}
+        self.hits = 0
+        self.misses = 0
+        self.raw = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._cache: "OrderedDict[tuple[int, bytes], bytes]" = OrderedDict()
+
+    def compress(self, data: bytes, window_bits: int) -> Optional[bytes]:
+        """Get the permessage-deflate payload of ``data``.
+
+        Args:
+        ----
+            data: Uncompressed message payload.
+            window_bits: Negotiated ``server_max_window_bits``.
+
+        Returns:
+        -------
+            The compressed payload, or ``None`` to send ``data`` raw.
+        """
+        if len(data) < self.threshold:
+            self.raw += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(data)
+            return None
+        key = (window_bits, data)
+        compressed = self._cache.get(key)
+        if compressed is None:
+            self.misses += 1
+            encoder = zlib.compressobj(wbits=-window_bits, **self.compress_settings)
+            compressed = encoder.compress(data) + encoder.flush(zlib.Z_SYNC_FLUSH)
+            if compressed.endswith(_EMPTY_UNCOMPRESSED_BLOCK):
+                compressed = compressed[:-4]
+            self._cache[key] = compressed
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            self._adapt(len(data), len(compressed))
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        self.bytes_in += len(data)
+        self.bytes_out += len(compressed)
+        return compressed
+
+    def _adapt(self, size: int, compressed: int) -> None:
+        if compressed > size * (1 - self.min_saving):
+            # Not worth it: frames this small go out raw from now on
+            self.threshold = min(self.max_threshold, max(self.threshold, size + 1))
+        elif size < 2 * self.threshold:
+            # Paid off near the threshold: give somewhat smaller frames another try
+            self.threshold = max(self.min_threshold, int(self.threshold * 0.9))
+
+    def stats(self) -> dict[str, Any]:
+        """Get hit, miss, raw frame, byte and threshold counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "raw": self.raw,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "threshold": self.threshold,
+        }
+
+
+class SharedPerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate whose outgoing messages come from a shared :class:`DeflateCache`."""
+
+    def __init__(self, cache: DeflateCache, *args: Any, **kwargs: Any) -> None:
+        """Initialize the extension; the other arguments are those of ``PerMessageDeflate``."""
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    def encode(self, frame: Frame) -> Frame:
+        """Compress a whole outgoing message through the cache."""
+        # The output is only the same for every connection without context
+        # takeover; fragmented messages are left to the per-connection encoder
+        if (
+            not self.local_no_context_takeover
+            or frame.opcode in CTRL_OPCODES
+            or frame.opcode is OP_CONT
+            or not frame.fin
+        ):
+            return super().encode(frame)
+        compressed = self.cache.compress(bytes(frame.data), self.local_max_window_bits)
+        if compressed is None:
+            return frame
+        return dataclasses.replace(frame, rsv1=True, data=compressed)
+
+
+class SharedDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negotiate permessage-deflate without server context takeover, backed by one cache."""
+
+    def __init__(self, cache: Optional[DeflateCache] = None, **kwargs: Any) -> None:
+        """Initialize the factory.
+
+        Args:
+        ----
+            cache: Cache shared by the connections; a new one by default.
+            **kwargs: Passed to ``ServerPerMessageDeflateFactory``, with
+                ``server_no_context_takeover`` always set.
+        """
+        kwargs.setdefault("server_max_window_bits", 12)
+        kwargs.setdefault("client_max_window_bits", 12)
+        kwargs["server_no_context_takeover"] = True
+        self.cache = cache or DeflateCache(compress_settings=kwargs.get("compress_settings"))
+        super().__init__(**kwargs)
+
+    def process_request_params(
+        self,
+        params: Any,
+        accepted_extensions: Any,
+    ) -> tuple[Any, PerMessageDeflate]:
+        """Accept an offer like websockets does, with the shared-cache extension."""
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        return response_params, SharedPerMessageDeflate(
+            self.cache,
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings,
+        )
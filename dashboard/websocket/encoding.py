@@ -0,0 +1,201 @@
+"""Binary encoding of metrics frames for the WebSocket feed.
+
+Clients pick an encoding in their ``subscribe`` message. ``json`` frames
+are text, as before. ``binary`` frames pack the numeric metrics into
+float32 arrays keyed by small metric IDs:
+
+=======  ===============  ==============================================
+Offset   Type             Field
+=======  ===============  ==============================================
+0        2 bytes          Magic ``DM``
+2        uint8            Format version, currently 1
+3        uint8            Flags; bit 0 marks a delta frame
+4        float64          Timestamp in seconds since the epoch, NaN if none
+12       uint16           Number of numeric metrics ``n``
+14       uint16[n]        Metric IDs
+14+2n    float32[n]       Metric values
+14+6n    UTF-8 JSON       Remaining non-numeric fields of ``data``, if any
+=======  ===============  ==============================================
+
+All numbers are little-endian. Values are float32, so they keep about
+seven significant digits. Metric IDs index the names of a
+:class:`MetricSchema`, which the server sends as a ``schema`` text frame
+before the first binary frame that uses a new ID.
+
+Fields holding a list of mappings, such as ``processes``, are tables: the
+numbers of row ``i`` get IDs named ``[field, i, column]`` and the trailer
+keeps only each row's other columns, so ``[{"pid": 1, "name": "init"}]``
+becomes one float32 and ``{"processes": [{"name": "init"}]}``.
+"""
+import json
+import math
+import struct
+from datetime import datetime
+from typing import Any, Optional, Union
+
+JSON = "json"
+BINARY = "binary"
+ENCODINGS = (JSON, BINARY)
+
+FRAME_MAGIC = b"DM"
+FRAME_VERSION = 1
+DELTA_FLAG = 0x01
+MAX_METRIC_IDS = 2**16
+# Magic, version, flags, timestamp and metric count
+_HEADER = struct.Struct("<2sBBdH")
+
+# A metric name, or a table field, row and column
+MetricName = Union[str, tuple[str, int, str]]
+
+
+def _is_number(value: Any) -> bool:
+    # bool is an int, but is kept in the trailer to stay a bool
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class MetricSchema:
+    """Append-only table of metric IDs shared by all binary clients.
+
+    IDs are never reused or renumbered, so a client holding the first ``n``
+    names can decode every frame that only uses IDs below ``n``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty schema."""
+        self.names: list[MetricName] = []
+        self.ids: dict[MetricName, int] = {}
+        self._message: Optional[str] = None
+
+    def __len__(self) -> int:
+        """Get the number of known metric names."""
+        return len(self.names)
+
+    def id_of(self, name: MetricName) -> Optional[int]:
+        """Get the ID of ``name``, assigning the next one if it is new.
+
+        Returns
+        -------
+            The metric ID, or ``None`` once every ID is taken.
+        """
+        metric_id = self.ids.get(name)
+        if metric_id is None and len(self.names) < MAX_METRIC_IDS:
+            metric_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self._message = None
+        return metric_id
+
+    def message(self) -> str:
+        """Get the ``schema`` text frame announcing all known names; table names become arrays."""
+        if self._message is None:
+            self._message = json.dumps({"type": "schema", "metrics": self.names})
+        return self._message
+
+
+def _timestamp(value: Any) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return math.nan
+
+
+def encode_binary(
+    schema: MetricSchema,
+    data: dict[str, Any],
+    timestamp: Any = None,
+    delta: bool = False,
+) -> bytes:
+    """Pack a metrics frame into the binary format.
+
+    Args:
+    ----
+        schema: Schema assigning the metric IDs; new names are added to it.
+        data: Metric names and values. Numbers, also those in table rows,
+            go into the float32 array and anything else into the JSON trailer.
+        timestamp: ISO timestamp or epoch seconds of the frame.
+        delta: Whether ``data`` holds only the changed metrics.
+
+    Returns:
+    -------
+        The encoded frame.
+    """
+    ids = []
+    values = []
+    rest = {}
+    for name, value in data.items():
+        if isinstance(value, list) and value and all(isinstance(row, dict) for row in value):
+            rows = []
+            for index, row in enumerate(value):
+                other = {}
+                for column, cell in row.items():
+                    metric_id = schema.id_of((name, index, column)) if _is_number(cell) else None
+                    if metric_id is None:
+                        other[column] = cell
+                    else:
+                        ids.append(metric_id)
+                        values.append(cell)
+                rows.append(other)
+            rest[name] = rows
+            continue
+        metric_id = schema.id_of(name) if _is_number(value) else None
+        if metric_id is None:
+            rest[name] = value
+        else:
+            ids.append(metric_id)
+            values.append(value)
+
+    count = len(ids)
+    flags = DELTA_FLAG if delta else 0
+    header = _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, flags, _timestamp(timestamp), count)
+    body = struct.pack(f"<{count}H{count}f", *ids, *values)
+    trailer = json.dumps(rest, separators=(",", ":")).encode() if rest else b""
+    return header + body + trailer
+
+
+def decode_binary(frame: bytes, names: list[Any]) -> dict[str, Any]:
+    """Unpack a binary frame into a metrics message.
+
+    Args:
+    ----
+        frame: Frame produced by :func:`encode_binary`.
+        names: Metric names from the latest ``schema`` frame.
+
+    Returns:
+    -------
+        Message with ``type``, ``timestamp`` (epoch seconds or ``None``),
+        ``delta`` and ``data``.
+
+    Raises:
+    ------
+        ValueError: If ``frame`` is not a binary metrics frame or uses an
+            unknown metric ID.
+    """
+    if len(frame) < _HEADER.size:
+        msg = "Truncated metrics frame"
+        raise ValueError(msg)
+    magic, version, flags, timestamp, count = _HEADER.unpack_from(frame)
+    if magic != FRAME_MAGIC or version != FRAME_VERSION:
+        msg = "Not a metrics frame"
+        raise ValueError(msg)
+    unpacked = struct.unpack_from(f"<{count}H{count}f", frame, _HEADER.size)
+    trailer = frame[_HEADER.size + 6 * count:]
+    data: dict[str, Any] = json.loads(trailer) if trailer else {}
+    for metric_id, value in zip(unpacked[:count], unpacked[count:]):
+        if metric_id >= len(names):
+            msg = "Metrics frame uses an unknown metric ID"
+            raise ValueError(msg)
+        name = names[metric_id]
+        if isinstance(name, str):
+            data[name] = value
+        else:
+            field, index, column = name
+            data[field][index][column] = value
+    return {
+        "type": "metrics",
+        "timestamp": None if math.isnan(timestamp) else timestamp,
+        "delta": bool(flags & DELTA_FLAG),
+        "data": data,
+    }
@@ -1,147 +1,315 @@
+"""WebSocket server streaming dashboard metrics."""
 import asyncio
 import json
-from typing import Any, Dict, Set
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Optional
 
 import jwt
 import websockets
 
 from ..auth.middleware import verify_token
-from ..config import get_config
-from ..metrics import collect_system_metrics, process_metrics
+from ..config import ConfigSnapshot, get_config, subscribe
+from ..metrics import get_latest_metrics
+from ..exposition import get_shared_request_timer
+from ..request_timing import RequestTimer, timed
+from .broadcast import DEFAULT_QUEUE_SIZE, LATEST_WINS, BroadcastEngine
+from .compression import DEFAULT_THRESHOLD, DeflateCache, SharedDeflateFactory
+from .encoding import ENCODINGS, JSON
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER_CONFIG = "config/websocket.json"
+
+
+@dataclass(frozen=True)
+class ServerSettings:
+    """Connection limits from the WebSocket server config file.
+
+    Attributes
+    ----------
+        max_connections: Clients served at once; more are turned away.
+        timeout: Seconds a client may leave a heartbeat unanswered.
+        heartbeat_interval: Seconds between heartbeat pings.
+        queue_size: Frames queued per client.
+        overflow_policy: What a full queue does, "latest" or "disconnect".
+        compression: Offer permessage-deflate with shared compression.
+        compression_threshold: Initial size in bytes below which frames
+            go out uncompressed.
+    """
+
+    max_connections: int = 1000
+    timeout: float = 60.0
+    heartbeat_interval: float = 30.0
+    queue_size: int = DEFAULT_QUEUE_SIZE
+    overflow_policy: str = LATEST_WINS
+    compression: bool = True
+    compression_threshold: int = DEFAULT_THRESHOLD
+
+    @classmethod
+    def load(cls, path: str) -> "ServerSettings":
+        """Read the ``security`` and ``broadcast`` sections of ``path``.
+
+        Defaults are used for a missing file or setting.
+        """
+        try:
+            with open(path) as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        security = config.get("security", {})
+        broadcast = config.get("broadcast", {})
+        defaults = cls()
+        return cls(
+            max_connections=int(security.get("max_connections", defaults.max_connections)),
+            timeout=float(security.get("timeout", defaults.timeout)),
+            heartbeat_interval=float(
+                security.get("heartbeat_interval", defaults.heartbeat_interval),
+            ),
+            queue_size=int(broadcast.get("queue_size", defaults.queue_size)),
+            overflow_policy=broadcast.get("overflow_policy", defaults.overflow_policy),
+            compression=bool(broadcast.get("compression", defaults.compression)),
+            compression_threshold=int(
+                broadcast.get("compression_threshold", defaults.compression_threshold),
+            ),
+        )
+
+
+def build_metrics_message(snapshot: dict[str, Any]) -> dict[str, Any]:
+    """Flatten a metrics snapshot into a broadcast message.
+
+    Args:
+    ----
+        snapshot: Snapshot from the shared metrics sampler.
+
+    Returns:
+    -------
+        Message whose ``data`` maps metric names to values.
+    """
+    data = dict(snapshot.get("system", {}))
+    data["processes"] = snapshot.get("processes", [])
+    return {"type": "metrics", "timestamp": snapshot.get("timestamp"), "data": data}
+
+
+def message_endpoint(websocket: Any, message: dict[str, Any]) -> str:
+    """Get the request timing label of a client message."""
+    return f"ws.{message.get('type')}"
 
 
 class MetricsWebSocket:
-"""\1"""
-def __init__(self, config_path: str = None):
-"""\1"""
-self.clients: set[websockets.WebSocketServerProtocol] = set()
-self.config = get_config()
-self.running = False
-self.server = None
-self.collection_task = None
-async def start_server(self):
-"""\1"""
-config = self.config["websocket"]
-ssl_context = None
-if config.get("ssl"):
-# SSL configuration would go here if needed
-self.server = await websockets.serve(
-self.handle_client, config["host"], config["port"], ssl=ssl_context,
-    )
-self.running = True
-self.collection_task = asyncio.create_task(self.collect_metrics_loop())
-return self.server
-async def stop_server(self):
-"""\1"""
-if self.collection_task:
-self.collection_task.cancel()
-try:
-await self.collection_task
-except asyncio.CancelledError:
-if self.server:
-self.server.close()
-await self.server.wait_closed()
-self.running = False
-# Close all client connections
-for client in self.clients:
-await client.close()
-self.clients.clear()
-async def handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
-"""\1"""
-try:
-# Get token from query parameters
-query = websocket.path.split("?")[-1]
-params = dict(param.split("=") for param in query.split("&") if "=" in param)
-token = params.get("token")
-if not token:
-await websocket.close(1008, "Missing authentication token")
-return
-try:
-# Verify JWT token
-payload = verify_token(token)
-if not payload:
-await websocket.close(1008, "Invalid authentication token")
-return
-except jwt.InvalidTokenError:
-await websocket.close(1008, "Invalid authentication token")
-return
-except Exception as e:
-await websocket.close(1011, f"Authentication error: {str(e)}")
-return
-await self.register_client(websocket)
-await self.send_initial_data(websocket)
-try:
-async for message in websocket:
-try:
-# Parse and validate incoming messages
-data = json.loads(message)
-if "type" in data:
-await self.handle_message(websocket, data)
-except json.JSONDecodeError:
-await websocket.send(json.dumps({"error": "Invalid JSON format"}))
-except Exception as e:
-await websocket.send(
-json.dumps({"error": f"Message handling error: {str(e)}"}),
-    )
-except websockets.ConnectionClosed:
-finally:
-await self.unregister_client(websocket)
-except Exception as e:
-print(f"Error handling client: {e}")
-if websocket in self.clients:
-await self.unregister_client(websocket)
-async def handle_message(self, websocket: websockets.WebSocketServerProtocol, message: dict):
-"""\1"""
-message_type = message.get("type")
-if message_type == "ping":
-await websocket.send(json.dumps({"type": "pong"}))
-elif message_type == "subscribe":
-# Handle metric subscription
-metrics = message.get("metrics", [])
-if not isinstance(metrics, list):
-await websocket.send(json.dumps({"error": "Invalid metrics format"}))
-return
-# Store client's metric preferences
-websocket.subscribed_metrics = set(metrics)
-async def register_client(self, websocket: websockets.WebSocketServerProtocol):
-"""\1"""
-self.clients.add(websocket)
-async def unregister_client(self, websocket: websockets.WebSocketServerProtocol):
-"""\1"""
-if websocket in self.clients:
-self.clients.remove(websocket)
-async def broadcast_message(self, message: dict[str, Any]):
-"""\1"""
-if not self.clients:
-return
-message_str = json.dumps(message)
-disconnected_clients = set()
-for client in self.clients:
-try:
-await client.send(message_str)
-except websockets.ConnectionClosed:
-disconnected_clients.add(client)
-except Exception as e:
-print(f"Error broadcasting to client: {e}")
-disconnected_clients.add(client)
-# Remove disconnected clients
-for client in disconnected_clients:
-await self.unregister_client(client)
-async def collect_metrics_loop(self):
-"""\1"""
-while self.running:
-try:
-metrics = collect_system_metrics()
-processed = process_metrics(metrics)
-await self.broadcast_message(processed)
-except Exception as e:
-print(f"Error collecting metrics: {e}")
-await asyncio.sleep(self.config["metrics"]["collection_interval"])
-async def send_initial_data(self, websocket: websockets.WebSocketServerProtocol):
-"""\1"""
-try:
-metrics = collect_system_metrics()
-processed = process_metrics(metrics)
-await websocket.send(json.dumps(processed))
-except Exception as e:
-print(f"Error sending initial data: {e}")
+    """WebSocket server that pushes metrics to subscribed dashboards."""
+
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        request_timer: Optional[RequestTimer] = None,
+    ):
+        """Initialize the server from the dashboard configuration.
+
+        Args:
+        ----
+            config_path: Server config file with connection limits; defaults
+                to ``WEBSOCKET_CONFIG`` or ``config/websocket.json``.
+            request_timer: Timer recording client message handling times;
+                the one exported from the shared exposition registry, which
+                the Flask app also records into, by default.
+        """
+        self.clients: set[websockets.WebSocketServerProtocol] = set()
+        self.config = get_config()
+        self.settings = ServerSettings.load(
+            config_path or os.getenv("WEBSOCKET_CONFIG", DEFAULT_SERVER_CONFIG),
+        )
+        ws_config = self.config.get("websocket", {})
+        self.broadcaster = BroadcastEngine(
+            send_timeout=ws_config.get("send_timeout", 5.0),
+            queue_size=self.settings.queue_size,
+            overflow=self.settings.overflow_policy,
+        )
+        # Shared by all connections, so each broadcast frame is deflated once
+        self.deflate = (
+            DeflateCache(threshold=self.settings.compression_threshold)
+            if self.settings.compression
+            else None
+        )
+        self.running = False
+        self.server = None
+        self.collection_task = None
+        self._unsubscribe = None
+        self.request_timer = request_timer or get_shared_request_timer()
+        self.handle_message = timed(self.request_timer, message_endpoint)(self.handle_message)
+
+    def apply_config(self, snapshot: ConfigSnapshot) -> None:
+        """Pick up a reloaded configuration."""
+        self.config = snapshot.data
+        self.broadcaster.send_timeout = snapshot.websocket.get("send_timeout", 5.0)
+
+    async def start_server(self):
+        """Start serving clients and the metrics broadcast loop."""
+        config = self.config["websocket"]
+        ssl_context = None
+        if config.get("ssl"):
+            # SSL configuration would go here if needed
+            pass
+        self.server = await websockets.serve(
+            self.handle_client,
+            config["host"],
+            config["port"],
+            ssl=ssl_context,
+            write_limit=config.get("write_limit", 2**16),
+            # Clients that stop answering heartbeats are closed and evicted
+            ping_interval=self.settings.heartbeat_interval,
+            ping_timeout=self.settings.timeout,
+            # Replaces websockets' per-connection compression
+            compression=None,
+            extensions=[SharedDeflateFactory(self.deflate)] if self.deflate else None,
+        )
+        self.running = True
+        self._unsubscribe = subscribe(self.apply_config)
+        # Start the shared collector engine without blocking the event loop
+        await asyncio.to_thread(get_latest_metrics)
+        self.collection_task = asyncio.create_task(self.collect_metrics_loop())
+        return self.server
+
+    async def stop_server(self):
+        """Stop the broadcast loop and close all connections."""
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self.collection_task:
+            self.collection_task.cancel()
+            try:
+                await self.collection_task
+            except asyncio.CancelledError:
+                pass
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        self.running = False
+        # Close all client connections
+        for client in self.clients:
+            await client.close()
+        self.clients.clear()
+
+    async def handle_client(self, websocket: websockets.WebSocketServerProtocol, path: str):
+        """Authenticate a client and serve it until it disconnects."""
+        if len(self.clients) >= self.settings.max_connections:
+            await websocket.close(1013, "Server at capacity")
+            return
+        try:
+            # Get token from query parameters
+            query = websocket.path.split("?")[-1]
+            params = dict(param.split("=") for param in query.split("&") if "=" in param)
+            token = params.get("token")
+            if not token:
+                await websocket.close(1008, "Missing authentication token")
+                return
+
+            try:
+                # Verify JWT token
+                payload = verify_token(token)
+                if not payload:
+                    await websocket.close(1008, "Invalid authentication token")
+                    return
+            except jwt.InvalidTokenError:
+                await websocket.close(1008, "Invalid authentication token")
+                return
+            except Exception as e:
+                await websocket.close(1011, f"Authentication error: {str(e)}")
+                return
+
+            await self.register_client(websocket)
+            await self.send_initial_data(websocket)
+
+            try:
+                async for message in websocket:
+                    try:
+                        # Parse and validate incoming messages
+                        data = json.loads(message)
+                        if "type" in data:
+                            await self.handle_message(websocket, data)
+                    except json.JSONDecodeError:
+                        await websocket.send(json.dumps({"error": "Invalid JSON format"}))
+                    except Exception as e:
+                        await websocket.send(
+                            json.dumps({"error": f"Message handling error: {str(e)}"}),
+                        )
+            except websockets.ConnectionClosed:
+                pass
+            finally:
+                await self.unregister_client(websocket)
+
+        except Exception as e:
+            logger.error(f"Error handling client: {e}")
+            if websocket in self.clients:
+                await self.unregister_client(websocket)
+
+    async def handle_message(self, websocket: websockets.WebSocketServerProtocol, message: dict):
+        """Handle a control message from a client."""
+        message_type = message.get("type")
+
+        if message_type == "ping":
+            await websocket.send(json.dumps({"type": "pong"}))
+        elif message_type == "subscribe":
+            # Handle metric subscription
+            metrics = message.get("metrics", [])
+            if not isinstance(metrics, list):
+                await websocket.send(json.dumps({"error": "Invalid metrics format"}))
+                return
+
+            encoding = message.get("encoding", JSON)
+            if encoding not in ENCODINGS:
+                await websocket.send(json.dumps({"error": f"Unsupported encoding: {encoding}"}))
+                return
+
+            # Store client's metric preferences
+            websocket.subscribed_metrics = set(metrics)
+            self.broadcaster.subscribe(websocket, metrics, encoding)
+
+    async def register_client(self, websocket: websockets.WebSocketServerProtocol):
+        """Start broadcasting to a client."""
+        self.clients.add(websocket)
+        self.broadcaster.add(websocket)
+
+    async def unregister_client(self, websocket: websockets.WebSocketServerProtocol):
+        """Stop broadcasting to a client."""
+        if websocket in self.clients:
+            self.clients.remove(websocket)
+        self.broadcaster.remove(websocket)
+
+    async def broadcast_message(self, message: dict[str, Any]):
+        """Broadcast a message to all clients, honouring their subscriptions."""
+        if not self.clients:
+            return
+
+        # Only queue the frames; each client's writer sends them
+        disconnected_clients = await self.broadcaster.broadcast(message, wait=False)
+
+        # Remove clients that failed since the previous broadcast
+        for client in disconnected_clients:
+            await self.unregister_client(client)
+
+    def stats(self) -> dict[str, Any]:
+        """Get connection, send queue and compression statistics."""
+        return {
+            **self.broadcaster.stats(),
+            "max_connections": self.settings.max_connections,
+            "compression": self.deflate.stats() if self.deflate else None,
+        }
+
+    async def collect_metrics_loop(self):
+        """Broadcast the latest metrics snapshot on every collection interval."""
+        while self.running:
+            try:
+                await self.broadcast_message(build_metrics_message(get_latest_metrics()))
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {e}")
+            await asyncio.sleep(self.config["metrics"]["collection_interval"])
+
+    async def send_initial_data(self, websocket: websockets.WebSocketServerProtocol):
+        """Send a full metrics frame to a newly connected client."""
+        try:
+            message = build_metrics_message(get_latest_metrics())
+            await websocket.send(json.dumps({**message, "delta": False}))
+        except Exception as e:
+            logger.error(f"Error sending initial data: {e}")
@@ -0,0 +1,23 @@
+"""Add covering index for metric series queries
+Revision ID: 20261017_metrics_type_timestamp_index
+Revises: 20240108_initial_schema
+Create Date: 2026-10-17 00:00:00.000
+"""
+from alembic import op # type: ignore
+
+revision = "20261017_metrics_type_timestamp_index"
+down_revision = "20240108_initial_schema"
+
+
+def upgrade():
+    # Series queries filter on metric_type and a time range and read value;
+    # with value in the index they never touch the table.
+    op.create_index(
+        "ix_metrics_type_timestamp",
+        "metrics",
+        ["metric_type", "timestamp", "value"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_metrics_type_timestamp", table_name="metrics")
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Benchmark alert rule evaluation throughput.
+
+Feeds one sample per metric and series each simulated second to an
+evaluator holding ``--rules`` rules spread over ``--metrics`` metrics, and
+reports how long each 1 Hz tick takes. Example::
+
+    python scripts/benchmarks/alert_rules.py --rules 5000 --series 10
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+def percentile(samples, pct):
+    """Return the ``pct`` percentile of sorted ``samples``."""
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+def main():
+    """Run the benchmark and print per-tick timings."""
+    from monitor.alerts import AlertEvaluator, AlertRule
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=5000, help="Number of rules")
+    parser.add_argument("--metrics", type=int, default=500, help="Distinct metric names")
+    parser.add_argument("--series", type=int, default=10, help="Series per metric")
+    parser.add_argument("--ticks", type=int, default=600, help="Simulated seconds")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    metrics = [f"metric_{i}" for i in range(args.metrics)]
+    evaluator = AlertEvaluator(
+        AlertRule(rng.choice(metrics), rng.uniform(50, 95), duration=rng.choice((60, 300)))
+        for _ in range(args.rules)
+    )
+    series = [f"host-{i}" for i in range(args.series)]
+
+    timings = []
+    fired = 0
+    for tick in range(args.ticks):
+        samples = {name: rng.uniform(0, 100) for name in metrics}
+        started = time.perf_counter()
+        for label in series:
+            fired += len(evaluator.observe_many(float(tick), samples, label))
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    print(f"rules:      {args.rules} over {args.metrics} metrics x {args.series} series")
+    print(f"ticks:      {args.ticks} ({fired} alerts)")
+    for pct in (50, 90, 99):
+        print(f"p{pct} tick:   {percentile(timings, pct) * 1000:.2f} ms")
+    print(f"max tick:   {timings[-1] * 1000:.2f} ms (budget 1000 ms)")
+
+
+if __name__ == "__main__":
+    main()
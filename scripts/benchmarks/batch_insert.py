@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark batched metric inserts against row-at-a-time inserts.
+
+Writes ``--rows`` samples into a fresh copy of the dashboard ``metrics``
+table twice: once committing every row, as an autocommitting ORM session
+does, and once through :class:`BatchWriter`. Example::
+
+    python scripts/benchmarks/batch_insert.py --rows 20000
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+SCHEMA = (
+    "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+    " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)"
+)
+
+
+def sample_rows(count):
+    """Build ``count`` metric rows."""
+    kinds = ("cpu", "memory", "disk")
+    return [
+        {
+            "timestamp": f"2024-01-01 00:00:{i % 60:02d}.{i:06d}",
+            "metric_type": kinds[i % 3],
+            "value": i % 100,
+        }
+        for i in range(count)
+    ]
+
+
+def create_database(directory, name):
+    """Create an empty metrics database and return its path."""
+    path = Path(directory) / name
+    with sqlite3.connect(path) as connection:
+        connection.execute(SCHEMA)
+    return path
+
+
+def row_at_a_time(path, rows):
+    """Insert and commit one row at a time."""
+    connection = sqlite3.connect(path)
+    for row in rows:
+        connection.execute(
+            "INSERT INTO metrics (timestamp, metric_type, value) VALUES (?, ?, ?)",
+            (row["timestamp"], row["metric_type"], row["value"]),
+        )
+        connection.commit()
+    connection.close()
+
+
+def batched(path, rows, max_rows):
+    """Insert through the batching writer."""
+    from db.writer import BatchWriter
+
+    writer = BatchWriter(path, "metrics", ["timestamp", "metric_type", "value"], max_rows=max_rows)
+    writer.start()
+    for row in rows:
+        writer.write(row)
+    writer.stop()
+    return writer.batches_written
+
+
+def main():
+    """Run both strategies and print throughput."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000, help="Rows to insert")
+    parser.add_argument("--max-rows", type=int, default=500, help="Rows per batch")
+    args = parser.parse_args()
+
+    rows = sample_rows(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        row_at_a_time(create_database(directory, "single.db"), rows)
+        single = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batches = batched(create_database(directory, "batched.db"), rows, args.max_rows)
+        batch = time.perf_counter() - started
+
+    print(f"rows:           {args.rows}")
+    print(f"row-at-a-time:  {single:.3f}s ({args.rows / single:.0f} rows/s)")
+    print(f"batched:        {batch:.3f}s ({args.rows / batch:.0f} rows/s, {batches} batches)")
+    print(f"speedup:        {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Benchmark /metrics latency under concurrent clients.
+
+Starts the dashboard app on a local threaded server (or targets ``--url``)
+and fires requests from a pool of concurrent clients, then reports latency
+percentiles. Example::
+
+    python scripts/benchmarks/metrics_latency.py --clients 100 --requests 2000
+"""
+import argparse
+import logging
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def start_local_server():
+    """Start the dashboard app on an ephemeral port and return its base URL."""
+    from werkzeug.serving import make_server
+
+    from dashboard import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    app = create_app({"TESTING": True})
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    server.socket.listen(1024)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def timed_request(url):
+    """Fetch ``url`` and return the elapsed wall time in seconds."""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=30) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def percentile(samples, pct):
+    """Return the ``pct`` percentile of sorted ``samples``."""
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+
+def main():
+    """Run the benchmark and print latency percentiles."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running dashboard")
+    parser.add_argument("--path", default="/metrics", help="Endpoint to benchmark")
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=2000, help="Total requests")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        server, base_url = start_local_server()
+    url = base_url.rstrip("/") + args.path
+
+    # Warm up so the shared sampler has published its first snapshot
+    timed_request(url)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        latencies = sorted(pool.map(lambda _: timed_request(url), range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    if server is not None:
+        server.shutdown()
+
+    print(f"endpoint:   {url}")
+    print(f"clients:    {args.clients}")
+    print(f"requests:   {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"mean:       {statistics.mean(latencies) * 1000:.2f} ms")
+    for pct in (50, 90, 99):
+        print(f"p{pct}:        {percentile(latencies, pct) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
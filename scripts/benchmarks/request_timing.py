@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark the cost of request timing instrumentation.
+
+Times ``RequestTimer.observe`` on its own, a Prometheus ``Histogram``
+observation for comparison, and Flask's request pre- and post-processing
+inside one request context with and without the timing hooks; the
+difference of the last two is the per-request overhead, free of the noise
+of serving whole requests. Example::
+
+    python scripts/benchmarks/request_timing.py --requests 200000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from flask import Flask  # noqa: E402
+from prometheus_client import CollectorRegistry, Histogram  # noqa: E402
+
+from dashboard.request_timing import (  # noqa: E402
+    DEFAULT_LATENCY_BUCKETS,
+    RequestTimer,
+    init_request_timing,
+)
+
+
+def per_call(function, count):
+    """Run ``function`` ``count`` times and return microseconds per call."""
+    started = time.perf_counter()
+    for _ in range(count):
+        function()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def make_app(instrumented):
+    """Build an app with one trivial route."""
+    app = Flask(__name__)
+
+    @app.route("/health")
+    def health():
+        return "ok"
+
+    if instrumented:
+        init_request_timing(app)
+    return app
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--observations", type=int, default=1_000_000, help="Direct observations to time",
+    )
+    parser.add_argument(
+        "--requests", type=int, default=200_000, help="Requests processed per run",
+    )
+    args = parser.parse_args()
+
+    timer = RequestTimer()
+    histogram = Histogram(
+        "bench_seconds",
+        "Benchmark",
+        ["endpoint"],
+        buckets=DEFAULT_LATENCY_BUCKETS,
+        registry=CollectorRegistry(),
+    )
+    child = histogram.labels("health")
+    timer_cost = per_call(lambda: timer.observe(0.0003, "health"), args.observations)
+    histogram_cost = per_call(lambda: child.observe(0.0003), args.observations)
+    print(f"RequestTimer.observe:   {timer_cost:.3f}us")
+    print(f"Histogram.observe:      {histogram_cost:.3f}us")
+
+    results = {}
+    for instrumented in (False, True, False, True):
+        app = make_app(instrumented)
+        with app.test_request_context("/health"):
+            response = app.make_response("ok")
+
+            def request():
+                app.preprocess_request()
+                app.process_response(response)
+
+            cost = per_call(request, args.requests)
+        results[instrumented] = min(cost, results.get(instrumented, cost))
+    print(f"request without hooks:  {results[False]:.2f}us")
+    print(f"request with hooks:     {results[True]:.2f}us")
+    print(f"overhead per request:   {results[True] - results[False]:.2f}us")
+
+
+if __name__ == "__main__":
+    main()
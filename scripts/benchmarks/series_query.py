@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Benchmark multi-series time-range queries on the metrics table.
+
+Loads ``--rows`` samples into a fresh copy of the dashboard ``metrics``
+table and times a range query over several series, first with only the
+``ix_metrics_timestamp`` index and then with the covering
+``ix_metrics_type_timestamp`` index, plus the latency of a deep page with
+``OFFSET`` against the same page reached by keyset pagination. Example::
+
+    python scripts/benchmarks/series_query.py --rows 10000000
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+SCHEMA = (
+    "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+    " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)"
+)
+KINDS = ("cpu", "memory", "disk", "network", "load", "swap", "temperature", "processes")
+START = datetime(2024, 1, 1)
+
+
+def load(path, count):
+    """Insert ``count`` samples spread evenly over ``KINDS``, one per second each."""
+    connection = sqlite3.connect(path)
+    connection.execute(SCHEMA)
+    connection.execute("CREATE INDEX ix_metrics_timestamp ON metrics (timestamp)")
+
+    def rows():
+        for i in range(count):
+            timestamp = START + timedelta(seconds=i // len(KINDS))
+            stamp = timestamp.isoformat(sep=" ", timespec="microseconds")
+            yield stamp, KINDS[i % len(KINDS)], float(i % 100)
+
+    with connection:
+        connection.executemany(
+            "INSERT INTO metrics (timestamp, metric_type, value) VALUES (?, ?, ?)", rows(),
+        )
+    return connection
+
+
+def timed(function, repeat):
+    """Get the median runtime of ``function`` in milliseconds and its last result."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - started) * 1000)
+    times.sort()
+    return times[len(times) // 2], result
+
+
+def main():
+    """Run the queries with both index layouts and print latencies."""
+    from db.series import SeriesQuery
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Rows to load")
+    parser.add_argument("--series", type=int, default=3, help="Series per query")
+    parser.add_argument(
+        "--range", type=float, default=0.1, help="Fraction of the time span queried",
+    )
+    parser.add_argument("--page", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement")
+    args = parser.parse_args()
+
+    span = args.rows // len(KINDS)
+    end = START + timedelta(seconds=span)
+    start = end - timedelta(seconds=int(span * args.range))
+    kinds = list(KINDS[: args.series])
+    query = SeriesQuery()
+
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        connection = load(Path(directory) / "metrics.db", args.rows)
+        elapsed = time.perf_counter() - started
+        print(f"rows:                 {args.rows} (loaded in {elapsed:.1f}s)")
+
+        def full_range():
+            page = query.fetch(connection, kinds, start, end)
+            return sum(len(points) for points in page.series.values())
+
+        timestamp_only, rows = timed(full_range, args.repeat)
+
+        started = time.perf_counter()
+        connection.execute(
+            "CREATE INDEX ix_metrics_type_timestamp ON metrics (metric_type, timestamp, value)",
+        )
+        print(f"index build:          {time.perf_counter() - started:.1f}s")
+        covering, _ = timed(full_range, args.repeat)
+
+        print(f"range query:          {rows} rows over {len(kinds)} series")
+        print(f"  timestamp index:    {timestamp_only:.1f}ms")
+        print(f"  covering index:     {covering:.1f}ms ({timestamp_only / covering:.1f}x)")
+
+        # The same deep page both ways: the last page of the range
+        pages = max(rows // args.page - 1, 0)
+        cursor = None
+        for _ in range(pages):
+            cursor = query.fetch(connection, kinds, start, end, args.page, cursor).cursor
+        select = query.select(kinds, start, end, args.page).offset(pages * args.page)
+        offset_sql = select.build()
+
+        parameters = select.get_parameters()
+        offset, _ = timed(
+            lambda: connection.execute(offset_sql, parameters).fetchall(), args.repeat,
+        )
+        keyset, _ = timed(
+            lambda: query.fetch(connection, kinds, start, end, args.page, cursor), args.repeat,
+        )
+        print(f"page {pages + 1} of {args.page} rows:")
+        print(f"  OFFSET:             {offset:.2f}ms")
+        print(f"  keyset:             {keyset:.2f}ms ({offset / keyset:.0f}x)")
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark JSON against binary WebSocket metrics frames.
+
+Broadcasts synthetic metrics ticks to fake clients through the
+``BroadcastEngine`` and reports the bytes sent and the CPU spent per tick
+for each encoding, plus the cost of encoding one frame on its own; the
+engine encodes once per subscription group, so the rest of the CPU is
+fan-out. Every tick changes the system metrics and the process table, as
+on a busy host. Example::
+
+    python scripts/benchmarks/websocket_encoding.py --clients 5000 --ticks 50
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+for path in (PROJECT_ROOT, PROJECT_ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from dashboard.websocket.broadcast import BroadcastEngine  # noqa: E402
+from dashboard.websocket.encoding import BINARY, JSON, MetricSchema, encode_binary  # noqa: E402
+
+
+class CountingWebSocket:
+    """WebSocket double that only counts the bytes sent to it."""
+
+    def __init__(self) -> None:
+        self.bytes = 0
+
+    async def send(self, frame) -> None:
+        self.bytes += len(frame)
+
+
+def make_message(rng, processes):
+    """Build one tick of metrics like ``build_metrics_message`` does."""
+    data = {
+        "cpu": round(rng.uniform(0, 100), 1),
+        "memory": round(rng.uniform(0, 100), 1),
+        "disk": round(rng.uniform(0, 100), 1),
+        "processes": [
+            {
+                "pid": pid,
+                "name": name,
+                "cpu_percent": round(rng.uniform(0, 50), 1),
+                "memory_percent": rng.uniform(0, 10),
+            }
+            for pid, name in processes
+        ],
+    }
+    timestamp = time.strftime("%Y-%m-%dT%H:%M:%S.123456")
+    return {"type": "metrics", "timestamp": timestamp, "data": data}
+
+
+async def run(encoding, clients, ticks, seed):
+    """Broadcast ``ticks`` messages and return (bytes per tick, CPU ms per tick)."""
+    rng = random.Random(seed)
+    processes = [(rng.randint(1, 2**22), f"worker-{index}") for index in range(10)]
+    engine = BroadcastEngine(queue_size=ticks + 2)
+    sockets = [CountingWebSocket() for _ in range(clients)]
+    for websocket in sockets:
+        engine.subscribe(websocket, None, encoding)
+    messages = [make_message(rng, processes) for _ in range(ticks)]
+
+    started = time.process_time()
+    for message in messages:
+        await engine.broadcast(message)
+    cpu = time.process_time() - started
+    return sum(websocket.bytes for websocket in sockets) / ticks, cpu / ticks * 1e3
+
+
+def encode_cost(encoding, message, count=20000):
+    """Return microseconds to encode ``message`` as a full frame."""
+    schema = MetricSchema()
+    envelope = {"type": message["type"], "timestamp": message["timestamp"]}
+    started = time.perf_counter()
+    for _ in range(count):
+        if encoding == BINARY:
+            encode_binary(schema, message["data"], message["timestamp"])
+        else:
+            json.dumps({**envelope, "delta": False, "data": message["data"]})
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--clients", type=int, default=2000, help="Connected clients")
+    parser.add_argument("--ticks", type=int, default=20, help="Broadcasts to time")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the synthetic metrics")
+    args = parser.parse_args()
+
+    results = {}
+    for encoding in (JSON, BINARY):
+        results[encoding] = asyncio.run(run(encoding, args.clients, args.ticks, args.seed))
+        size, cpu = results[encoding]
+        sample = make_message(random.Random(args.seed), [(1234, "worker")] * 10)
+        encode = encode_cost(encoding, sample)
+        print(
+            f"{encoding:>6}: {size / args.clients:8.1f} bytes/client"
+            f"  {size / 1024:10.1f} KiB/tick"
+            f"  {cpu:8.2f} ms CPU/tick  {encode:6.1f} us/encode",
+        )
+    print(f" ratio: {results[JSON][0] / results[BINARY][0]:.1f}x fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Cache of generated SQL statements keyed on statement shape."""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+class StatementCache:
+    """Bounded LRU cache of SQL text.
+
+    Builders key statements on everything that affects the generated SQL
+    (statement type, dialect, schema, table, columns, where-clause
+    templates, ordering, limit and row count) but not on parameter values,
+    so repeated queries of the same shape reuse the SQL text and skip
+    string generation and identifier quoting entirely.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """Initialize the cache holding at most ``maxsize`` statements."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._statements: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._statements)
+
+    def get(self, key: Hashable, build: Callable[[], str]) -> str:
+        """Get the statement for ``key``, calling ``build`` on a miss."""
+        with self._lock:
+            sql = self._statements.get(key)
+            if sql is not None:
+                self._statements.move_to_end(key)
+                self.hits += 1
+                return sql
+            self.misses += 1
+        sql = build()
+        with self._lock:
+            self._statements[key] = sql
+            if len(self._statements) > self.maxsize:
+                self._statements.popitem(last=False)
+        return sql
+
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss and size counters."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._statements)}
+
+    def clear(self) -> None:
+        """Drop all statements and reset the counters."""
+        with self._lock:
+            self._statements.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by all builders
+statement_cache = StatementCache()
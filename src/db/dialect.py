@@ -1,4 +1,8 @@
 """Database dialect utilities."""
+from functools import lru_cache
+
+# Parameter placeholders of dialects not using the "format" paramstyle
+PLACEHOLDERS = {"sqlite": "?"}
 
 
 class Dialect:
@@ -19,6 +23,11 @@ class Dialect:
         """Set current schema."""
         self._schema = value
 
+    @property
+    def placeholder(self):
+        """Get the parameter placeholder of the dialect's DB-API driver."""
+        return PLACEHOLDERS.get(self.name, "%s")
+
     def format_table_name(self, table_name):
         """Format table name with schema if present."""
         if self._schema:
@@ -27,9 +36,14 @@ class Dialect:
 
     def quote_identifier(self, identifier):
         """Quote an identifier (table name, column name, etc)."""
-        return f'"{identifier}"'
+        return _quote_identifier(identifier)
 
     def get_type_name(self, type_):
         """Get database type name for given Python type."""
         type_map = {str: "VARCHAR", int: "INTEGER", float: "FLOAT", bool: "BOOLEAN"}
         return type_map.get(type_, "VARCHAR")
+
+
+@lru_cache(maxsize=4096)
+def _quote_identifier(identifier):
+    return f'"{identifier}"'
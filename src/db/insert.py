@@ -2,6 +2,7 @@
 
 from typing import Any, Dict, List, Optional
 
+from .cache import statement_cache
 from .dialect import Dialect
 
 
@@ -28,15 +29,23 @@ class Insert:
             msg = "No values to insert"
             raise ValueError(msg)
 
+        key = (
+            "insert",
+            type(self.dialect),
+            self.dialect.name,
+            self.table_name,
+            tuple(self.columns),
+            len(self.values),
+        )
+        return statement_cache.get(key, self._build)
+
+    def _build(self) -> str:
         table = self.dialect.quote_identifier(self.table_name)
         columns = ", ".join(self.dialect.quote_identifier(col) for col in self.columns)
 
-        # Build values part
-        value_placeholders = []
-        for _ in self.values:
-            placeholders = ", ".join("%s" for _ in self.columns)
-            value_placeholders.append(f"({placeholders})")
-        values_sql = ", ".join(value_placeholders)
+        # Every row has the same placeholders
+        row = "(" + ", ".join(self.dialect.placeholder for _ in self.columns) + ")"
+        values_sql = ", ".join([row] * len(self.values))
 
         return f"INSERT INTO {table} ({columns}) VALUES {values_sql}"
 
@@ -2,6 +2,7 @@
 
 from typing import Any, List, Optional
 
+from .cache import statement_cache
 from .dialect import Dialect
 
 
@@ -17,6 +18,7 @@ class Select:
         self.where_params: List[Any] = []
         self.order_by: Optional[str] = None
         self.limit_value: Optional[int] = None
+        self.offset_value: Optional[int] = None
 
     def columns_list(self, *cols: str) -> "Select":
         """Set columns to select."""
@@ -29,9 +31,10 @@ class Select:
         self.where_params.extend(params)
         return self
 
-    def order(self, column: str, desc: bool = False) -> "Select":
-        """Add order by clause."""
-        self.order_by = f"{column} {'DESC' if desc else 'ASC'}"
+    def order(self, *columns: str, desc: bool = False) -> "Select":
+        """Add order by clause on one or more columns."""
+        direction = "DESC" if desc else "ASC"
+        self.order_by = ", ".join(f"{column} {direction}" for column in columns)
         return self
 
     def limit(self, count: int) -> "Select":
@@ -39,8 +42,28 @@ class Select:
         self.limit_value = count
         return self
 
+    def offset(self, count: int) -> "Select":
+        """Add offset clause."""
+        self.offset_value = count
+        return self
+
     def build(self) -> str:
         """Build SQL select statement."""
+        key = (
+            "select",
+            type(self.dialect),
+            self.dialect.name,
+            self.dialect.schema,
+            self.table_name,
+            tuple(self.columns),
+            tuple(self.where_clauses),
+            self.order_by,
+            self.limit_value,
+            self.offset_value,
+        )
+        return statement_cache.get(key, self._build)
+
+    def _build(self) -> str:
         # Get formatted table name (with schema if present)
         table = self.dialect.format_table_name(self.table_name)
         if not self.dialect.schema:
@@ -64,6 +87,9 @@ class Select:
         if self.limit_value is not None:
             sql += f" LIMIT {self.limit_value}"
 
+        if self.offset_value is not None:
+            sql += f" OFFSET {self.offset_value}"
+
         return sql
 
     def get_parameters(self) -> List[Any]:
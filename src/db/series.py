@@ -0,0 +1,165 @@
+"""Time-range queries returning several metric series in one pass."""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .dialect import Dialect
+from .select import Select
+
+Timestamp = Union[datetime, str]
+Cursor = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class SeriesPage:
+    """One page of series data.
+
+    Attributes
+    ----------
+        series: Metric type to ``(timestamp, value)`` pairs in time order.
+        cursor: Position to pass as ``after`` for the next page, or ``None``
+            when the range is exhausted.
+    """
+
+    series: Dict[str, List[Tuple[str, float]]]
+    cursor: Optional[Cursor]
+
+
+def format_timestamp(value: Timestamp) -> str:
+    """Format a timestamp the way DATETIME columns are stored in SQLite."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="microseconds")
+    return value
+
+
+class SeriesQuery:
+    """Read several metric series over a time range with keyset pagination.
+
+    Rows are filtered with ``metric_type IN (...)`` and a timestamp range
+    and ordered by ``(metric_type, timestamp)``, which is exactly the order
+    of the ``ix_metrics_type_timestamp`` index. SQLite answers the query
+    with one index range scan per metric type and no sort, and, since the
+    index also holds ``value``, without reading the table. Pages continue
+    after the last ``(metric_type, timestamp)`` seen instead of using
+    ``OFFSET``, so every page costs the same however deep it is. The
+    cursor assumes one sample per metric type and timestamp, which is how
+    the collectors write.
+    """
+
+    def __init__(
+        self,
+        table: str = "metrics",
+        dialect: Optional[Dialect] = None,
+        type_column: str = "metric_type",
+        timestamp_column: str = "timestamp",
+        value_column: str = "value",
+    ) -> None:
+        """Initialize the query for ``table``."""
+        self.table = table
+        self.dialect = dialect or Dialect("sqlite")
+        self.type_column = type_column
+        self.timestamp_column = timestamp_column
+        self.value_column = value_column
+
+    def select(
+        self,
+        metric_types: Sequence[str],
+        start: Timestamp,
+        end: Timestamp,
+        limit: Optional[int] = None,
+        after: Optional[Timestamp] = None,
+    ) -> Select:
+        """Build the statement reading ``metric_types`` over a time range.
+
+        Args:
+        ----
+            metric_types: Metric types to read.
+            start: Inclusive range start.
+            end: Exclusive range end.
+            limit: Maximum rows returned; ``None`` reads the whole range.
+            after: Exclusive range start replacing ``start``, used to resume
+                a series after the last timestamp already read.
+
+        Returns:
+        -------
+            Select: Statement returning ``(metric_type, timestamp, value)``.
+        """
+        quote = self.dialect.quote_identifier
+        placeholder = self.dialect.placeholder
+        type_column = quote(self.type_column)
+        timestamp_column = quote(self.timestamp_column)
+
+        types = sorted(set(metric_types))
+        select = (
+            Select(self.table, self.dialect)
+            .columns_list(self.type_column, self.timestamp_column, self.value_column)
+            .where(f"{type_column} IN ({', '.join(placeholder for _ in types)})", *types)
+        )
+        if after is None:
+            select.where(f"{timestamp_column} >= {placeholder}", format_timestamp(start))
+        else:
+            select.where(f"{timestamp_column} > {placeholder}", format_timestamp(after))
+        select.where(f"{timestamp_column} < {placeholder}", format_timestamp(end))
+        select.order(type_column, timestamp_column)
+        if limit is not None:
+            select.limit(limit)
+        return select
+
+    def fetch(
+        self,
+        connection: Any,
+        metric_types: Sequence[str],
+        start: Timestamp,
+        end: Timestamp,
+        limit: Optional[int] = None,
+        after: Optional[Cursor] = None,
+    ) -> SeriesPage:
+        """Read one page on a DB-API ``connection``.
+
+        A page that resumes in the middle of a series first reads the rest
+        of that series and then the series after it, as two statements.
+        Folding both into one ``(metric_type, timestamp) > (?, ?)`` filter
+        would leave SQLite a single timestamp bound for every series, and it
+        may pick ``start`` and walk the whole prefix of the cursor series.
+
+        Args:
+        ----
+            connection: Open database connection.
+            metric_types: Metric types to read.
+            start: Inclusive range start.
+            end: Exclusive range end.
+            limit: Maximum rows in the page; ``None`` reads the whole range.
+            after: Cursor of the previous page.
+
+        Returns:
+        -------
+            SeriesPage: Rows grouped by metric type, plus the next cursor.
+        """
+        series: Dict[str, List[Tuple[str, float]]] = {
+            metric_type: [] for metric_type in metric_types
+        }
+        types = sorted(set(metric_types))
+        statements = []
+        if after is None:
+            statements.append(self.select(types, start, end))
+        else:
+            if after[0] in series:
+                statements.append(self.select([after[0]], start, end, after=after[1]))
+            types = [metric_type for metric_type in types if metric_type > after[0]]
+            if types:
+                statements.append(self.select(types, start, end))
+
+        rows: List[Tuple[str, str, float]] = []
+        for select in statements:
+            if limit is not None:
+                if len(rows) >= limit:
+                    break
+                select.limit(limit - len(rows))
+            rows.extend(connection.execute(select.build(), select.get_parameters()).fetchall())
+        for metric_type, timestamp, value in rows:
+            series[metric_type].append((timestamp, value))
+
+        cursor = None
+        if limit is not None and rows and len(rows) == limit:
+            cursor = (rows[-1][0], rows[-1][1])
+        return SeriesPage(series, cursor)
@@ -2,6 +2,7 @@
 
 from typing import Any, Dict, List, Optional
 
+from .cache import statement_cache
 from .dialect import Dialect
 
 
@@ -33,6 +34,18 @@ class Update:
             msg = "No values to update"
             raise ValueError(msg)
 
+        key = (
+            "update",
+            type(self.dialect),
+            self.dialect.name,
+            self.dialect.schema,
+            self.table_name,
+            tuple(self.set_values),
+            tuple(self.where_clauses),
+        )
+        return statement_cache.get(key, self._build)
+
+    def _build(self) -> str:
         table = self.dialect.format_table_name(self.table_name)
         if not self.dialect.schema:
             table = self.dialect.quote_identifier(table)
@@ -40,7 +53,7 @@ class Update:
         # Build SET clause
         set_items = []
         for col in self.set_values:
-            set_items.append(f"{self.dialect.quote_identifier(col)} = %s")
+            set_items.append(f"{self.dialect.quote_identifier(col)} = {self.dialect.placeholder}")
 
         sql = f"UPDATE {table} SET {', '.join(set_items)}"
 
@@ -74,6 +87,17 @@ class Delete:
 
     def build(self) -> str:
         """Build SQL delete statement."""
+        key = (
+            "delete",
+            type(self.dialect),
+            self.dialect.name,
+            self.dialect.schema,
+            self.table_name,
+            tuple(self.where_clauses),
+        )
+        return statement_cache.get(key, self._build)
+
+    def _build(self) -> str:
         table = self.dialect.format_table_name(self.table_name)
         if not self.dialect.schema:
             table = self.dialect.quote_identifier(table)
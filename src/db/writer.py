@@ -0,0 +1,159 @@
+"""Write-behind batching of inserts."""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .dialect import Dialect
+from .insert import Insert
+
+logger = logging.getLogger(__name__)
+
+# Default SQLITE_MAX_VARIABLE_NUMBER of SQLite builds before 3.32
+DEFAULT_MAX_VARIABLES = 999
+
+
+def max_variables(connection: sqlite3.Connection) -> int:
+    """Get the bound parameter limit of a SQLite connection."""
+    try:
+        return connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    except AttributeError:  # Python < 3.11
+        return DEFAULT_MAX_VARIABLES
+
+
+class BatchWriter:
+    """Queue rows and insert them in batches from a background thread.
+
+    A batch is written once ``max_rows`` rows are queued or the oldest
+    queued row is ``max_latency`` seconds old. Each batch is one
+    transaction of multi-row ``INSERT`` statements built with
+    :class:`Insert`, chunked so no statement binds more parameters than
+    SQLite allows. The queue holds at most ``queue_size`` rows; producers
+    block in :meth:`write` when it is full, so a slow disk slows collection
+    down instead of growing memory without bound. A batch that fails is
+    logged and dropped, and the thread keeps draining the queue.
+    """
+
+    def __init__(
+        self,
+        database: Union[str, Path],
+        table: str,
+        columns: Sequence[str],
+        max_rows: int = 500,
+        max_latency: float = 1.0,
+        queue_size: int = 10000,
+    ) -> None:
+        """Initialize the writer for ``columns`` of ``table`` in ``database``."""
+        self.database = str(database)
+        self.table = table
+        self.columns = list(columns)
+        self.max_rows = max_rows
+        self.max_latency = max_latency
+        self.dialect = Dialect("sqlite")
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rows_dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the writer thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the writer thread."""
+        with self._lock:
+            if self.is_running:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name=f"batch-writer-{self.table}",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Write every queued row and stop the writer thread."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def write(self, row: Dict[str, Any], timeout: Optional[float] = None) -> None:
+        """Queue one row.
+
+        Args:
+        ----
+            row: Column name to value; missing columns are written as NULL.
+            timeout: Seconds to wait for queue space; ``None`` waits forever.
+
+        Raises:
+        ------
+            queue.Full: If the queue stayed full for ``timeout`` seconds.
+        """
+        self._queue.put(row, timeout=timeout)
+
+    def flush(self) -> None:
+        """Wait until every queued row has been written."""
+        self._queue.join()
+
+    def write_batch(self, rows: List[Dict[str, Any]], connection: sqlite3.Connection) -> None:
+        """Insert ``rows`` in one transaction."""
+        chunk_size = max(1, max_variables(connection) // len(self.columns))
+        with connection:
+            for offset in range(0, len(rows), chunk_size):
+                insert = Insert(self.table, self.dialect)
+                insert.columns = self.columns
+                for row in rows[offset:offset + chunk_size]:
+                    insert.add_values(row)
+                connection.execute(insert.build(), insert.get_parameters())
+        self.rows_written += len(rows)
+        self.batches_written += 1
+
+    def _run(self) -> None:
+        connection: Optional[sqlite3.Connection] = None
+        try:
+            stopping = False
+            while not stopping:
+                row = self._queue.get()
+                if row is None:
+                    self._queue.task_done()
+                    break
+                rows = [row]
+                deadline = time.monotonic() + self.max_latency
+                while len(rows) < self.max_rows:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        row = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if row is None:
+                        stopping = True
+                        break
+                    rows.append(row)
+
+                try:
+                    if connection is None:
+                        connection = sqlite3.connect(self.database)
+                    self.write_batch(rows, connection)
+                except Exception:
+                    logger.exception(f"Error writing {len(rows)} rows to {self.table}")
+                    self.rows_dropped += len(rows)
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+                finally:
+                    for _ in range(len(rows) + stopping):
+                        self._queue.task_done()
+        finally:
+            if connection is not None:
+                connection.close()
@@ -2,7 +2,7 @@
 
 import time
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict
 
 import psutil
 
@@ -10,23 +10,39 @@ import psutil
 class MetricsCollector:
     """Collector for system and application metrics."""
 
-    def __init__(self) -> None:
-        """Initialize metrics collector."""
+    def __init__(self, engine: Any = None) -> None:
+        """Initialize metrics collector.
+
+        Args:
+        ----
+            engine: Collector engine to read system metrics from, such as the
+                dashboard's shared one; without one psutil is read directly,
+                without blocking.
+        """
+        self.engine = engine
         self.last_collection = None
         self.collection_interval = 60  # seconds
 
     def collect_system_metrics(self) -> Dict:
-        """Collect system-level metrics."""
+        """Collect system-level metrics from the collector engine, if there is one."""
+        engine = self.engine
+        if engine is None:
+            # Compare against the previous call instead of blocking
+            return {
+                "cpu_usage": psutil.cpu_percent(interval=None),
+                "memory_usage": psutil.virtual_memory().percent,
+                "disk_usage": psutil.disk_usage("/").percent,
+                "network": self._get_network_stats(psutil.net_io_counters()),
+            }
         return {
-            "cpu_usage": psutil.cpu_percent(interval=1),
-            "memory_usage": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage("/").percent,
-            "network": self._get_network_stats(),
+            "cpu_usage": engine.value("cpu"),
+            "memory_usage": engine.value("memory").percent,
+            "disk_usage": engine.value("disk").percent,
+            "network": self._get_network_stats(engine.value("network")),
         }
 
-    def _get_network_stats(self) -> Dict:
+    def _get_network_stats(self, net_io) -> Dict:
         """Get network statistics."""
-        net_io = psutil.net_io_counters()
         return {
             "bytes_sent": net_io.bytes_sent,
             "bytes_recv": net_io.bytes_recv,
@@ -1,23 +1,99 @@
 """Monitor system module."""
 
 import json
+import logging
 import os
-import re
+import threading
+import time
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 import psutil
 
+from db.writer import BatchWriter
+
+from .alerts import AlertEvaluator, AlertStore
+from .metrics_log import MetricsLog
+from .process_matcher import ProcessMatcher
+from .retention import FileRetention, RetentionEngine, SegmentRetention, SQLiteRetention
+from .rollup import (
+    DEFAULT_FUNCTIONS,
+    RollupAggregator,
+    RollupStore,
+    default_resolutions,
+    flatten_metrics,
+)
+from .snapshot import SnapshotReader
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CONFIG_DIR = "metrics"
+ROLLUP_CHECKPOINT = "open-windows.json"
+ALERT_STATE = "alert-state.json"
+DEFAULT_COLLECTION_INTERVAL = 60.0
+# Seconds between checkpoints and retention passes of a long-running monitor
+CHECKPOINT_INTERVAL = 300.0
+RETENTION_INTERVAL = 3600.0
+# Snapshot files kept by earlier implementation tracking, relative to the project
+TRACKING_HISTORY_DIR = os.path.join("tracking", "history")
+
 
 class MetricsMonitor:
     """System metrics monitoring class."""
 
-    def __init__(self, config_dir: str) -> None:
-        """Initialize monitor with config directory path."""
+    def __init__(
+        self,
+        config_dir: str = DEFAULT_CONFIG_DIR,
+        settings_path: Optional[str] = None,
+    ) -> None:
+        """Initialize monitor with config directory path.
+
+        Args:
+        ----
+            config_dir: Directory holding ``process_metrics.json`` and
+                ``system_metrics.json``; samples are kept in its ``data``
+                subdirectory.
+            settings_path: Project ``config.json`` whose ``metrics`` section
+                sets retention, alert rules and aggregation; defaults to the
+                ``config.json`` beside ``config_dir``.
+        """
         self.config_dir = config_dir
         self.process_config = self._load_config("process_metrics.json")
         self.system_config = self._load_config("system_metrics.json")
+        if settings_path is None:
+            project_dir = os.path.dirname(os.path.abspath(config_dir))
+            settings_path = os.path.join(project_dir, "config.json")
+        self.settings_path = settings_path
+        self.project_dir = os.path.dirname(os.path.abspath(settings_path))
+        self.settings = self._load_settings(settings_path)
+        self.database = self._database_path()
+        metrics_settings = self.settings.get("metrics", {})
+        self.collection_interval = float(
+            metrics_settings.get("collection_interval", DEFAULT_COLLECTION_INTERVAL),
+        )
         self.data_dir = os.path.join(self.config_dir, "data")
+        self.log = MetricsLog(self.data_dir)
+        aggregation = metrics_settings.get("aggregation", {})
+        self.rollups = RollupAggregator(
+            RollupStore(
+                os.path.join(self.data_dir, "rollups"),
+                default_resolutions(aggregation.get("interval", 300)),
+            ),
+            aggregation.get("functions", DEFAULT_FUNCTIONS),
+        )
+        self._rollups_resumed = False
+        self.alerts = AlertEvaluator.from_config(self.settings)
+        self.alerts.load(self.alert_state)
+        self.alert_store = AlertStore(self.database) if self.database else None
+        self.writer = (
+            BatchWriter(self.database, "metrics", ["timestamp", "metric_type", "value"])
+            if self.database
+            else None
+        )
+        self.retention = RetentionEngine.from_config(self.settings, self._retention_targets())
+        self.snapshots = SnapshotReader()
+        self._matcher: Optional[ProcessMatcher] = None
 
     def _load_config(self, filename: str) -> Dict[str, Any]:
         """Load configuration from JSON file."""
@@ -25,80 +101,260 @@ class MetricsMonitor:
         with open(config_path) as f:
             return json.load(f)
 
+    @staticmethod
+    def _load_settings(path: str) -> Dict[str, Any]:
+        """Load the project configuration, or nothing if there is none."""
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.info(f"No project configuration at {path}, using defaults")
+            return {}
+
+    def _database_path(self) -> Optional[str]:
+        """Get the dashboard's SQLite file from ``database.path`` of the project config."""
+        path = self.settings.get("database", {}).get("path")
+        if not path:
+            return None
+        path = os.path.join(self.project_dir, path)
+        if not os.path.exists(path):
+            logger.warning(f"Database {path} does not exist, not storing metrics in it")
+            return None
+        return path
+
+    def _retention_targets(self) -> List[Any]:
+        """Get everything ``metrics.retention`` applies to."""
+        targets: List[Any] = [
+            SegmentRetention(self.log),
+            *(SegmentRetention(log) for log in self.rollups.store.logs.values()),
+            FileRetention(os.path.join(self.project_dir, TRACKING_HISTORY_DIR), "metrics_*.json"),
+        ]
+        if self.database is not None:
+            targets.append(SQLiteRetention(self.database))
+        return targets
+
+    def on_config(self, snapshot: Any) -> None:
+        """Pick up a new snapshot of the project configuration.
+
+        Meant as a config subscriber: the alert rules and their metric index
+        are rebuilt from ``snapshot.data`` and :meth:`run` picks up the new
+        collection interval at once; the other settings apply from the next
+        start of the monitor.
+        """
+        metrics_settings = snapshot.data.get("metrics", {})
+        self.collection_interval = float(
+            metrics_settings.get("collection_interval", self.collection_interval),
+        )
+        self.alerts.reconfigure(snapshot.data)
+
+    @property
+    def alert_state(self) -> str:
+        """Path of the alert window state carried between runs."""
+        return os.path.join(self.data_dir, ALERT_STATE)
+
+    @property
+    def rollup_checkpoint(self) -> str:
+        """Path of the checkpoint of the open rollup windows."""
+        return os.path.join(self.data_dir, "rollups", ROLLUP_CHECKPOINT)
+
     def _collect_system_metrics(self) -> Dict[str, Any]:
-        """Collect system-wide metrics."""
+        """Collect system-wide metrics from a single psutil snapshot."""
+        snapshot = self.snapshots.read()
+        memory = snapshot.memory
+        disk = snapshot.disk
+        network = snapshot.network
         return {
             "cpu": {
-                "percent": psutil.cpu_percent(),
-                "count": psutil.cpu_count(),
-                "freq": psutil.cpu_freq()._asdict(),
+                "percent": snapshot.cpu_percent,
+                "count": snapshot.cpu_count,
+                "freq": snapshot.cpu_freq._asdict() if snapshot.cpu_freq else {},
             },
             "memory": {
-                "total": psutil.virtual_memory().total,
-                "available": psutil.virtual_memory().available,
-                "percent": psutil.virtual_memory().percent,
-                "used": psutil.virtual_memory().used,
-                "free": psutil.virtual_memory().free,
+                "total": memory.total,
+                "available": memory.available,
+                "percent": memory.percent,
+                "used": memory.used,
+                "free": memory.free,
             },
             "disk": {
-                "total": psutil.disk_usage("/").total,
-                "used": psutil.disk_usage("/").used,
-                "free": psutil.disk_usage("/").free,
-                "percent": psutil.disk_usage("/").percent,
+                "total": disk.total,
+                "used": disk.used,
+                "free": disk.free,
+                "percent": disk.percent,
             },
             "network": {
-                "bytes_sent": psutil.net_io_counters().bytes_sent,
-                "bytes_recv": psutil.net_io_counters().bytes_recv,
-                "packets_sent": psutil.net_io_counters().packets_sent,
-                "packets_recv": psutil.net_io_counters().packets_recv,
+                "bytes_sent": network.bytes_sent,
+                "bytes_recv": network.bytes_recv,
+                "packets_sent": network.packets_sent,
+                "packets_recv": network.packets_recv,
             },
-            "load": {"load_avg": psutil.getloadavg()},
+            "load": {"load_avg": snapshot.load_avg},
         }
 
     def _collect_process_metrics(self) -> Dict[str, Any]:
         """Collect process-specific metrics."""
-        metrics = {}
+        processes = self.process_config.get("processes", [])
+        if self._matcher is None or self._matcher.process_configs != processes:
+            self._matcher = ProcessMatcher(processes)
 
-        for process in psutil.process_iter():
+        metrics = {}
+        for name, process in self._matcher.scan():
             try:
-                cmdline = process.cmdline()
-                for proc_config in self.process_config.get("processes", []):
-                    pattern = proc_config["pattern"]
-                    if any(re.search(pattern, cmd) for cmd in cmdline):
-                        proc_metrics = {
-                            "pid": process.pid,
-                            "cpu_percent": process.cpu_percent(),
-                            "memory": {
-                                "rss": process.memory_info().rss,
-                                "vms": process.memory_info().vms,
-                            },
-                            "num_threads": process.num_threads(),
-                        }
-                        metrics[proc_config["name"]] = proc_metrics
-                        break
+                with process.oneshot():
+                    memory_info = process.memory_info()
+                    metrics[name] = {
+                        "pid": process.pid,
+                        "cpu_percent": process.cpu_percent(),
+                        "memory": {
+                            "rss": memory_info.rss,
+                            "vms": memory_info.vms,
+                        },
+                        "num_threads": process.num_threads(),
+                    }
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 continue
 
         return metrics
 
     def _collect_metrics(self) -> None:
-        """Collect and store all metrics."""
-        timestamp = datetime.now().isoformat()
+        """Collect and append all metrics to the segmented log."""
+        now = datetime.now()
 
         metrics = {
-            "timestamp": timestamp,
+            "timestamp": now.isoformat(),
             "system": self._collect_system_metrics(),
             "processes": self._collect_process_metrics(),
         }
 
-        # Ensure data directory exists
-        os.makedirs(self.data_dir, exist_ok=True)
+        timestamp = now.timestamp()
+        self._resume_rollups(timestamp)
+        self.log.append(metrics, timestamp)
+        series = flatten_metrics(metrics["system"])
+        self.rollups.add(timestamp, series)
+
+        # Resource usage percentages, the metric names used by the dashboard
+        usage = {
+            resource: readings["percent"]
+            for resource, readings in metrics["system"].items()
+            if isinstance(readings, dict) and "percent" in readings
+        }
+        if self.writer is not None:
+            if not self.writer.is_running:
+                self.writer.start()
+            stamp = now.isoformat(sep=" ", timespec="microseconds")
+            for metric_type, value in usage.items():
+                self.writer.write({"timestamp": stamp, "metric_type": metric_type, "value": value})
+        self._evaluate_alerts(timestamp, {**series, **usage})
+
+    def _evaluate_alerts(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Evaluate alert rules; rules may name a series or a bare resource."""
+        alerts = self.alerts.observe_many(timestamp, values)
+        for alert in alerts:
+            logger.warning(
+                f"Alert {alert.status}: {alert.rule.metric} {alert.rule.comparison}"
+                f" {alert.rule.threshold} ({alert.rule.severity}), value {alert.value}",
+            )
+        if self.alert_store is not None:
+            self.alert_store.add(alerts)
+
+    def _resume_rollups(self, timestamp: float) -> None:
+        """Restore the open rollup windows left by earlier runs.
+
+        Windows come from the checkpoint written by :meth:`start`; only samples
+        logged after it are replayed. Without a usable checkpoint the windows
+        are rebuilt from the log back to the start of the coarsest window.
+        """
+        if self._rollups_resumed:
+            return
+        self._rollups_resumed = True
+        checkpoint = self.rollups.load(self.rollup_checkpoint)
+        start = self.rollups.window_start(timestamp) if checkpoint is None else checkpoint
+        self.rollups.replay(
+            (ts, flatten_metrics(record.get("system", {})))
+            for ts, record in self.log.read(start, timestamp)
+            if checkpoint is None or ts > checkpoint
+        )
+
+    def history(
+        self,
+        series: str,
+        start: float,
+        end: float,
+        max_points: int = 500,
+    ) -> Tuple[int, List[Tuple[float, Dict[str, float]]]]:
+        """Get downsampled history of one series, e.g. ``"cpu.percent"``.
 
-        # Save metrics to file
-        metrics_file = os.path.join(self.data_dir, f"metrics_{timestamp}.json")
-        with open(metrics_file, "w") as f:
-            json.dump(metrics, f, indent=2)
+        Args:
+        ----
+            series: Dotted series name.
+            start: Range start in epoch seconds.
+            end: Range end in epoch seconds.
+            max_points: Upper bound on the number of points wanted.
+
+        Returns:
+        -------
+            Tuple of the resolution in seconds and ``(timestamp, aggregates)``
+            pairs in time order.
+        """
+        return self.rollups.query(series, start, end, max_points)
+
+    def checkpoint(self) -> None:
+        """Sync the log and save the open rollup windows, alert state and pending alerts."""
+        self.log.flush()
+        self.rollups.save(self.rollup_checkpoint)
+        self.alerts.save(self.alert_state)
+        if self.alert_store is not None:
+            self.alert_store.flush()
+
+    def close(self) -> None:
+        """Checkpoint, write the queued database rows and close the log."""
+        self.checkpoint()
+        if self.writer is not None:
+            self.writer.stop()
+        self.log.close()
 
     def start(self) -> None:
-        """Start metrics collection."""
+        """Collect one sample, persist everything and run a slice of retention."""
         self._collect_metrics()
+        self.checkpoint()
+        if self.writer is not None:
+            self.writer.stop()
+        self.retention.run(time_budget=0.5)
+
+    def run(
+        self,
+        stop: Optional[threading.Event] = None,
+        checkpoint_interval: float = CHECKPOINT_INTERVAL,
+        retention_interval: float = RETENTION_INTERVAL,
+    ) -> None:
+        """Collect every ``collection_interval`` seconds until ``stop`` is set.
+
+        The log, the database writer and the alert store stay open between
+        samples, so the log's batched fsync and the write-behind writer do
+        their job; a tick only collects. Checkpoints and retention run on
+        their own, slower cadence, and everything is closed once on the way
+        out.
+
+        Args:
+        ----
+            stop: Event ending the loop; runs until interrupted if ``None``.
+            checkpoint_interval: Seconds between :meth:`checkpoint` calls.
+            retention_interval: Seconds between retention passes; a pass
+                cut short by its time budget resumes on the next tick.
+        """
+        stop = stop or threading.Event()
+        next_checkpoint = time.monotonic() + checkpoint_interval
+        next_retention = time.monotonic()
+        try:
+            while not stop.is_set():
+                started = time.monotonic()
+                self._collect_metrics()
+                if started >= next_checkpoint:
+                    self.checkpoint()
+                    next_checkpoint = started + checkpoint_interval
+                if started >= next_retention or self.retention.in_progress:
+                    if self.retention.run(time_budget=0.5).complete:
+                        next_retention = started + retention_interval
+                stop.wait(max(0.0, self.collection_interval - (time.monotonic() - started)))
+        finally:
+            self.close()
@@ -1,11 +1,39 @@
 """Main entry point for the monitor module."""
-from monitor import MetricsMonitor
+import argparse
+import signal
+import threading
 
+from . import MetricsMonitor
 
-def main():
+
+def watch(monitor: MetricsMonitor) -> None:
+    """Collect until SIGTERM or Ctrl-C, following config changes."""
+    from dashboard.config import init_config, subscribe
+
+    init_config(monitor.settings_path)
+    subscribe(monitor.on_config)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    try:
+        monitor.run(stop)
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
     """Run the metrics monitor."""
+    parser = argparse.ArgumentParser(description="Collect system and process metrics.")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep collecting and apply config.json changes, such as alert rules, as they happen",
+    )
+    args = parser.parse_args(argv)
     monitor = MetricsMonitor()
-    monitor.start()
+    if args.watch:
+        watch(monitor)
+    else:
+        monitor.start()
 
 
 if __name__ == "__main__":
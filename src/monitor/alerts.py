@@ -0,0 +1,364 @@
+"""Streaming evaluation of windowed alert rules."""
+import json
+import logging
+import operator
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from db.dialect import Dialect
+from db.insert import Insert
+from db.writer import max_variables
+
+logger = logging.getLogger(__name__)
+
+COMPARISONS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(value: Union[str, float]) -> float:
+    """Get seconds from a number of seconds or a string like ``"5m"``.
+
+    Raises
+    ------
+        ValueError: If ``value`` is neither.
+    """
+    if isinstance(value, str) and value[-1:] in DURATION_UNITS:
+        return float(value[:-1]) * DURATION_UNITS[value[-1]]
+    return float(value)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Fire when ``metric`` breaches ``threshold`` for ``duration`` seconds."""
+
+    metric: str
+    threshold: float
+    duration: float = 300
+    severity: str = "warning"
+    comparison: str = ">"
+
+    @classmethod
+    def from_config(cls, rule: Dict[str, Any]) -> "AlertRule":
+        """Create a rule from an ``alert_rules`` config entry."""
+        comparison = rule.get("comparison", ">")
+        if comparison not in COMPARISONS:
+            msg = f"Unknown comparison: {comparison}"
+            raise ValueError(msg)
+        return cls(
+            metric=rule["metric"],
+            threshold=float(rule["threshold"]),
+            duration=parse_duration(rule.get("duration", 300)),
+            severity=rule.get("severity", "warning"),
+            comparison=comparison,
+        )
+
+
+@dataclass(frozen=True)
+class Alert:
+    """A rule starting or stopping to fire for one series."""
+
+    rule: AlertRule
+    series: str
+    timestamp: float
+    value: float
+    status: str  # "firing" or "resolved"
+
+
+class _BreachState:
+    """Sliding-window state of one (rule, series) pair.
+
+    "Breached for the whole window" holds exactly when the current unbroken
+    run of breaching samples started at least ``duration`` ago, so the start
+    of that run is all that needs to be kept.
+    """
+
+    __slots__ = ("firing", "last_seen", "since")
+
+    def __init__(self) -> None:
+        self.since: Optional[float] = None
+        self.last_seen = 0.0
+        self.firing = False
+
+
+class AlertEvaluator:
+    """Evaluate alert rules against a stream of samples.
+
+    Rules are indexed by metric name, so a sample only touches the rules
+    for its metric, and each (rule, series) pair keeps constant-size state
+    regardless of ``duration``. A rule fires once when its threshold has
+    been breached by every sample for ``duration`` seconds and resolves on
+    the first sample back within the threshold. A gap between samples
+    longer than ``duration`` restarts the window, since nothing is known
+    about the gap.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule]) -> None:
+        """Initialize the evaluator with ``rules``."""
+        self.rules: List[AlertRule] = []
+        self._by_metric: Dict[str, List[Tuple[int, AlertRule, Callable[[float, float], bool]]]] = {}
+        self._state: Dict[Tuple[int, str], _BreachState] = {}
+        self.update_rules(rules)
+
+    @staticmethod
+    def rules_from_config(config: Mapping[str, Any]) -> List[AlertRule]:
+        """Get the rules of ``metrics.alert_rules`` or ``alert_rules``."""
+        rules = config.get("metrics", {}).get("alert_rules", config.get("alert_rules", []))
+        return [AlertRule.from_config(rule) for rule in rules]
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any]) -> "AlertEvaluator":
+        """Create an evaluator from ``metrics.alert_rules`` or ``alert_rules``."""
+        return cls(cls.rules_from_config(config))
+
+    def update_rules(self, rules: Iterable[AlertRule]) -> None:
+        """Replace the rules and rebuild the metric index.
+
+        Window state is matched to the new rules by their settings, so rules
+        that stay configured keep their state and state of removed rules is
+        dropped.
+        """
+        rules = list(rules)
+        by_metric: Dict[str, List[Tuple[int, AlertRule, Callable[[float, float], bool]]]] = {}
+        indices: Dict[AlertRule, List[int]] = {}
+        for index, rule in enumerate(rules):
+            by_metric.setdefault(rule.metric, []).append(
+                (index, rule, COMPARISONS[rule.comparison]),
+            )
+            indices.setdefault(rule, []).append(index)
+        state = {}
+        for (index, series), breach in self._state.items():
+            for new_index in indices.get(self.rules[index], ()):
+                state[(new_index, series)] = breach
+        self.rules, self._by_metric, self._state = rules, by_metric, state
+
+    def reconfigure(self, config: Mapping[str, Any]) -> None:
+        """Apply the alert rules of a new configuration, e.g. a config snapshot's ``data``.
+
+        A configuration with an invalid rule is logged and ignored, leaving
+        the current rules in place.
+        """
+        try:
+            rules = self.rules_from_config(config)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Keeping current alert rules, invalid configuration: {e}")
+            return
+        self.update_rules(rules)
+
+    def observe(self, timestamp: float, metric: str, value: float, series: str = "") -> List[Alert]:
+        """Feed one sample and get the alerts it caused.
+
+        Args:
+        ----
+            timestamp: Sample time in epoch seconds.
+            metric: Metric name the rules refer to.
+            value: Sample value.
+            series: Series of the metric, e.g. a host or process name.
+
+        Returns:
+        -------
+            Alerts that started or stopped firing.
+        """
+        rules = self._by_metric.get(metric)
+        if not rules:
+            return []
+        alerts = []
+        for index, rule, breaches in rules:
+            key = (index, series)
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = _BreachState()
+
+            if not breaches(value, rule.threshold):
+                if state.firing:
+                    alerts.append(Alert(rule, series, timestamp, value, "resolved"))
+                state.since = None
+                state.firing = False
+            else:
+                if state.since is None or timestamp - state.last_seen > rule.duration:
+                    state.since = timestamp
+                if not state.firing and timestamp - state.since >= rule.duration:
+                    state.firing = True
+                    alerts.append(Alert(rule, series, timestamp, value, "firing"))
+            state.last_seen = timestamp
+        return alerts
+
+    def observe_many(
+        self, timestamp: float, values: Dict[str, float], series: str = "",
+    ) -> List[Alert]:
+        """Feed one sample of several metrics taken at the same time."""
+        alerts = []
+        for metric, value in values.items():
+            if metric in self._by_metric:
+                alerts.extend(self.observe(timestamp, metric, value, series))
+        return alerts
+
+    def firing(self) -> List[Tuple[AlertRule, str]]:
+        """Get the ``(rule, series)`` pairs currently firing."""
+        return [
+            (self.rules[index], series)
+            for (index, series), state in self._state.items()
+            if state.firing
+        ]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Write the window state of every (rule, series) pair for :meth:`load`.
+
+        The file is replaced atomically, so a crash leaves either the old or
+        the new state.
+        """
+        path = Path(path)
+        entries = [
+            [asdict(self.rules[index]), series, state.since, state.last_seen, state.firing]
+            for (index, series), state in self._state.items()
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(".tmp")
+        temp.write_text(json.dumps({"state": entries}, separators=(",", ":")))
+        os.replace(temp, path)
+
+    def load(self, path: Union[str, Path]) -> int:
+        """Restore window state written by :meth:`save`, e.g. by an earlier run.
+
+        State is matched to rules by their settings, so it survives rules
+        being reordered; state of rules no longer configured is dropped.
+
+        Returns
+        -------
+            Number of (rule, series) pairs restored.
+        """
+        indices: Dict[AlertRule, List[int]] = {}
+        for index, rule in enumerate(self.rules):
+            indices.setdefault(rule, []).append(index)
+        try:
+            entries = json.loads(Path(path).read_text())["state"]
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable alert state {path}: {e}")
+            return 0
+
+        restored = 0
+        for fields, series, since, last_seen, firing in entries:
+            try:
+                rule = AlertRule(**fields)
+            except TypeError:
+                continue
+            for index in indices.get(rule, ()):
+                state = self._state[(index, series)] = _BreachState()
+                state.since = since
+                state.last_seen = last_seen
+                state.firing = firing
+                restored += 1
+        return restored
+
+
+class AlertStore:
+    """Buffer alerts and insert them into the ``alerts`` table in batches.
+
+    Alerts are written with multi-row ``INSERT`` statements in a single
+    transaction once ``batch_size`` alerts are buffered or the oldest
+    buffered alert is ``flush_interval`` seconds old. Statements are
+    chunked so none binds more parameters than SQLite allows.
+    """
+
+    def __init__(
+        self,
+        database: Union[str, Path],
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        table: str = "alerts",
+        max_pending: int = 10000,
+    ) -> None:
+        """Initialize the store for the ``database`` file.
+
+        At most ``max_pending`` alerts are buffered; while writes keep
+        failing, the oldest are dropped beyond that.
+        """
+        self.database = str(database)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.table = table
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.dialect = Dialect("sqlite")
+        self._pending: List[Alert] = []
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, alerts: Iterable[Alert]) -> None:
+        """Buffer alerts, writing a batch when one is due."""
+        with self._lock:
+            for alert in alerts:
+                if not self._pending:
+                    self._oldest = time.monotonic()
+                self._pending.append(alert)
+            self._drop_oldest()
+            due = self._pending and (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every buffered alert.
+
+        Returns
+        -------
+            Number of alerts written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        rows = [
+            {
+                "timestamp": datetime.fromtimestamp(alert.timestamp).isoformat(
+                    sep=" ", timespec="microseconds",
+                ),
+                "metric_type": alert.rule.metric,
+                "value": alert.value,
+                "threshold": alert.rule.threshold,
+                "status": alert.status,
+            }
+            for alert in pending
+        ]
+        try:
+            connection = sqlite3.connect(self.database)
+            try:
+                chunk_size = max(1, max_variables(connection) // len(rows[0]))
+                with connection:
+                    for offset in range(0, len(rows), chunk_size):
+                        insert = Insert(self.table, self.dialect)
+                        for values in rows[offset:offset + chunk_size]:
+                            insert.add_values(values)
+                        connection.execute(insert.build(), insert.get_parameters())
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing {len(pending)} alerts: {e}")
+            with self._lock:
+                self._pending[:0] = pending
+                self._drop_oldest()
+            return 0
+        return len(pending)
+
+    def _drop_oldest(self) -> None:
+        excess = len(self._pending) - self.max_pending
+        if excess > 0:
+            del self._pending[:excess]
+            self.dropped += excess
+            logger.warning(f"Alert buffer full, dropped the {excess} oldest alerts")
@@ -0,0 +1,434 @@
+"""Columnar archives of historical metrics in Arrow IPC or Parquet.
+
+An archive is one table with a ``timestamp`` column and one ``float64``
+column per metric, e.g. ``system.cpu`` for nested JSON samples or
+``cpu`` for rows of the SQLite ``metrics`` table; a metric missing from a
+sample is null. Files ending in ``.parquet`` are written as Parquet, any
+other name as an Arrow IPC file. Both are compressed with zstd by
+default. IPC files are memory-mapped on read; written with
+``compression=None`` their columns are used in place without copying.
+"""
+import heapq
+import json
+import operator
+import os
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from db.dialect import Dialect
+from db.select import Select
+from db.writer import BatchWriter
+from utils._arrow_utils import pyarrow_array_to_numpy_and_mask
+
+from .metrics_log import MetricsLog
+from .rollup import flatten_metrics
+
+TIMESTAMP_COLUMN = "timestamp"
+TIMESTAMP_TYPE = pa.timestamp("us")
+
+# One archive row: sample time and metric name to value
+Record = Tuple[datetime, Dict[str, float]]
+
+
+def archive_schema(columns: Sequence[str]) -> pa.Schema:
+    """Get the schema of an archive holding ``columns``."""
+    return pa.schema(
+        [pa.field(TIMESTAMP_COLUMN, TIMESTAMP_TYPE, nullable=False)]
+        + [pa.field(column, pa.float64()) for column in columns],
+    )
+
+
+def _is_parquet(path: Path) -> bool:
+    return path.suffix == ".parquet"
+
+
+def write_archive(
+    path: Union[str, Path],
+    records: Iterable[Record],
+    columns: Sequence[str],
+    batch_size: int = 65536,
+    compression: Optional[str] = "zstd",
+) -> int:
+    """Write records to an archive, ``batch_size`` rows at a time.
+
+    Args:
+    ----
+        path: Archive file; ``.parquet`` selects Parquet, anything else
+            Arrow IPC.
+        records: ``(timestamp, values)`` pairs in time order.
+        columns: Metric columns of the archive; other values are ignored.
+        batch_size: Rows per record batch (Parquet row group).
+        compression: Codec name, or ``None`` for uncompressed zero-copy IPC.
+
+    Returns:
+    -------
+        Number of rows written.
+    """
+    path = Path(path)
+    schema = archive_schema(columns)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    if _is_parquet(path):
+        writer = pq.ParquetWriter(tmp_path, schema, compression=compression or "none")
+    else:
+        options = ipc.IpcWriteOptions(compression=compression)
+        writer = ipc.new_file(tmp_path, schema, options=options)
+
+    rows = 0
+    try:
+        timestamps: List[datetime] = []
+        values: Dict[str, List[Optional[float]]] = {column: [] for column in columns}
+        for timestamp, record in records:
+            timestamps.append(timestamp)
+            for column, column_values in values.items():
+                column_values.append(record.get(column))
+            if len(timestamps) == batch_size:
+                writer.write_batch(_batch(schema, timestamps, values))
+                rows += len(timestamps)
+                timestamps = []
+                values = {column: [] for column in columns}
+        if timestamps or not rows:
+            writer.write_batch(_batch(schema, timestamps, values))
+            rows += len(timestamps)
+    finally:
+        writer.close()
+    os.replace(tmp_path, path)
+    return rows
+
+
+def _batch(
+    schema: pa.Schema, timestamps: List[datetime], values: Dict[str, List[Optional[float]]],
+) -> pa.RecordBatch:
+    arrays = [pa.array(timestamps, TIMESTAMP_TYPE)]
+    arrays.extend(pa.array(column_values, pa.float64()) for column_values in values.values())
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def read_archive(path: Union[str, Path], columns: Optional[Sequence[str]] = None) -> pa.Table:
+    """Read an archive, memory-mapping IPC files.
+
+    Args:
+    ----
+        path: Archive file.
+        columns: Metric columns to read; ``None`` reads all of them.
+
+    Returns:
+    -------
+        pa.Table: ``timestamp`` plus the requested metric columns.
+    """
+    path = Path(path)
+    wanted = None if columns is None else [TIMESTAMP_COLUMN, *columns]
+    if _is_parquet(path):
+        return pq.read_table(path, columns=wanted, memory_map=True)
+    table = ipc.open_file(pa.memory_map(str(path))).read_all()
+    return table if wanted is None else table.select(wanted)
+
+
+def load_series(
+    path: Union[str, Path], columns: Optional[Sequence[str]] = None,
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Load metric columns as numpy arrays for charting.
+
+    Each chunk's buffers are viewed with
+    :func:`pyarrow_array_to_numpy_and_mask`; single-chunk columns of an
+    uncompressed IPC archive are therefore views of the mapped file.
+
+    Args:
+    ----
+        path: Archive file.
+        columns: Metric columns to load; ``None`` loads all of them.
+
+    Returns:
+    -------
+        Mapping of metric name to ``(timestamps, values, valid)`` arrays,
+        where ``valid`` is False for samples missing the metric.
+    """
+    table = read_archive(path, columns)
+    timestamps = _to_numpy(table.column(TIMESTAMP_COLUMN), np.dtype("datetime64[us]"))[0]
+    return {
+        name: (timestamps, *_to_numpy(table.column(name), np.dtype(np.float64)))
+        for name in table.column_names
+        if name != TIMESTAMP_COLUMN
+    }
+
+
+def _to_numpy(column: pa.ChunkedArray, dtype: np.dtype) -> Tuple[np.ndarray, np.ndarray]:
+    if column.num_chunks == 1:
+        return pyarrow_array_to_numpy_and_mask(column.chunk(0), dtype)
+    parts = [pyarrow_array_to_numpy_and_mask(chunk, dtype) for chunk in column.chunks]
+    if not parts:
+        return np.empty(0, dtype), np.empty(0, bool)
+    return np.concatenate([data for data, _ in parts]), np.concatenate([mask for _, mask in parts])
+
+
+def iter_records(path: Union[str, Path]) -> Iterator[Record]:
+    """Stream the rows of an archive, skipping null values."""
+    path = Path(path)
+    if _is_parquet(path):
+        batches = pq.ParquetFile(path).iter_batches()
+    else:
+        reader = ipc.open_file(pa.memory_map(str(path)))
+        batches = (reader.get_batch(index) for index in range(reader.num_record_batches))
+    for batch in batches:
+        columns = batch.to_pydict()
+        timestamps = columns.pop(TIMESTAMP_COLUMN)
+        for row, timestamp in enumerate(timestamps):
+            yield timestamp, {
+                name: values[row] for name, values in columns.items() if values[row] is not None
+            }
+
+
+def _sqlite_timestamp(value: datetime) -> str:
+    # Same text form SQLAlchemy stores DATETIME columns in
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+
+def export_sqlite(
+    database: Union[str, Path],
+    path: Union[str, Path],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    table: str = "metrics",
+    **options: Any,
+) -> int:
+    """Export rows of the SQLite ``metrics`` table to an archive.
+
+    Rows are read in timestamp order and pivoted on the fly, one archive
+    row per distinct timestamp and one column per ``metric_type``, so
+    memory use does not grow with the size of the table.
+
+    Args:
+    ----
+        database: SQLite database file.
+        path: Archive file to write.
+        start: Inclusive range start; ``None`` starts at the oldest row.
+        end: Exclusive range end; ``None`` runs to the newest row.
+        table: Table with ``timestamp``, ``metric_type`` and ``value`` columns.
+        **options: Passed to :func:`write_archive`.
+
+    Returns:
+    -------
+        Number of archive rows written.
+    """
+    dialect = Dialect("sqlite")
+    placeholder = dialect.placeholder
+    timestamp_column = dialect.quote_identifier("timestamp")
+    select = (
+        Select(table, dialect)
+        .columns_list("timestamp", "metric_type", "value")
+        .order(timestamp_column)
+    )
+    if start is not None:
+        select.where(f"{timestamp_column} >= {placeholder}", _sqlite_timestamp(start))
+    if end is not None:
+        select.where(f"{timestamp_column} < {placeholder}", _sqlite_timestamp(end))
+
+    connection = sqlite3.connect(str(database))
+    try:
+        quote = dialect.quote_identifier
+        types = f"SELECT DISTINCT {quote('metric_type')} FROM {quote(table)}"
+        columns = sorted(row[0] for row in connection.execute(types))
+
+        def records() -> Iterator[Record]:
+            current: Optional[str] = None
+            values: Dict[str, float] = {}
+            rows = connection.execute(select.build(), select.get_parameters())
+            for timestamp, metric_type, value in rows:
+                if timestamp != current:
+                    if current is not None:
+                        yield datetime.fromisoformat(current), values
+                    current, values = timestamp, {}
+                values[metric_type] = value
+            if current is not None:
+                yield datetime.fromisoformat(current), values
+
+        return write_archive(path, records(), columns, **options)
+    finally:
+        connection.close()
+
+
+def import_sqlite(
+    path: Union[str, Path],
+    database: Union[str, Path],
+    table: str = "metrics",
+    batch_size: int = 10000,
+) -> int:
+    """Insert the rows of an archive into the SQLite ``metrics`` table.
+
+    Every non-null value becomes one ``(timestamp, metric_type, value)``
+    row; each ``batch_size`` rows are inserted in one transaction.
+
+    Returns
+    -------
+        Number of table rows inserted.
+    """
+    writer = BatchWriter(database, table, ["timestamp", "metric_type", "value"])
+    connection = sqlite3.connect(str(database))
+    inserted = 0
+    try:
+        rows: List[Dict[str, Any]] = []
+        for timestamp, values in iter_records(path):
+            formatted = _sqlite_timestamp(timestamp)
+            rows.extend(
+                {"timestamp": formatted, "metric_type": metric_type, "value": value}
+                for metric_type, value in values.items()
+            )
+            if len(rows) >= batch_size:
+                writer.write_batch(rows, connection)
+                inserted += len(rows)
+                rows = []
+        if rows:
+            writer.write_batch(rows, connection)
+            inserted += len(rows)
+    finally:
+        connection.close()
+    return inserted
+
+
+def _sample_timestamp(record: Dict[str, Any], path: Path) -> datetime:
+    timestamp = record.get(TIMESTAMP_COLUMN)
+    if isinstance(timestamp, str) and timestamp:
+        try:
+            return datetime.fromisoformat(timestamp)
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(path.stat().st_mtime)
+
+
+def _sample_values(record: Dict[str, Any]) -> Dict[str, float]:
+    return flatten_metrics({key: value for key, value in record.items() if key != TIMESTAMP_COLUMN})
+
+
+def json_records(files: Iterable[Union[str, Path]]) -> Iterator[Record]:
+    """Stream JSON sample files one at a time.
+
+    Raises
+    ------
+        ValueError: If the files are not in time order.
+    """
+    previous: Optional[datetime] = None
+    for file in map(Path, files):
+        with open(file) as f:
+            record = json.load(f)
+        timestamp = _sample_timestamp(record, file)
+        if previous is not None and timestamp < previous:
+            msg = f"{file} is older than the sample before it; pass the files in time order"
+            raise ValueError(msg)
+        previous = timestamp
+        yield timestamp, _sample_values(record)
+
+
+def log_records(
+    log: MetricsLog, start: Optional[float] = None, end: Optional[float] = None,
+) -> Iterator[Record]:
+    """Stream the samples of a :class:`MetricsLog` between ``start`` and ``end``.
+
+    ``start`` defaults to the oldest segment on disk and ``end`` to now.
+    """
+    if start is None:
+        segments = log.segments()
+        if not segments:
+            return
+        start = segments[0]
+    for timestamp, record in log.read(start, end):
+        yield datetime.fromtimestamp(timestamp), _sample_values(record)
+
+
+def merge_records(*sources: Iterable[Record]) -> Iterator[Record]:
+    """Merge record streams that are each in time order into one, lazily."""
+    return heapq.merge(*sources, key=operator.itemgetter(0))
+
+
+def export_json(
+    files: Iterable[Union[str, Path]],
+    path: Union[str, Path],
+    log: Optional[MetricsLog] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    columns: Optional[Sequence[str]] = None,
+    **options: Any,
+) -> int:
+    """Export JSON sample files and the samples of a metrics log to an archive.
+
+    Each file holds one sample such as the snapshots written by
+    ``save_metrics``. Numeric fields are flattened into dotted column
+    names; lists such as ``processes`` are not archived. The sample time
+    is its ``timestamp`` field, or the file's modification time.
+
+    The files and the log are both read in time order and merged as they
+    are streamed, so only a record of each is held in memory. Without
+    ``columns``, a first pass over the inputs finds them.
+
+    Args:
+    ----
+        files: JSON sample files in time order, e.g. sorted
+            ``metrics_<timestamp>.json`` names.
+        path: Archive file to write.
+        log: Metrics log whose samples are exported too.
+        start: Start of the log range in epoch seconds; defaults to its
+            oldest sample.
+        end: End of the log range in epoch seconds; defaults to now.
+        columns: Metric columns of the archive; ``None`` archives all.
+        **options: Passed to :func:`write_archive`.
+
+    Returns:
+    -------
+        Number of archive rows written.
+
+    Raises:
+    ------
+        ValueError: If the files are not in time order.
+    """
+    files = [Path(file) for file in files]
+    if end is None:
+        end = datetime.now().timestamp()
+
+    def sources() -> List[Iterator[Record]]:
+        streams = [json_records(files)]
+        if log is not None:
+            streams.append(log_records(log, start, end))
+        return streams
+
+    if columns is None:
+        found = set()
+        for _, values in merge_records(*sources()):
+            found.update(values)
+        columns = sorted(found)
+    return write_archive(path, merge_records(*sources()), columns, **options)
+
+
+def unflatten_metrics(values: Dict[str, float]) -> Dict[str, Any]:
+    """Rebuild a nested record from dotted series names."""
+    record: Dict[str, Any] = {}
+    for name, value in values.items():
+        *parents, key = name.split(".")
+        node = record
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return record
+
+
+def import_json(path: Union[str, Path], directory: Union[str, Path]) -> int:
+    """Write every archive row back as a ``metrics_<timestamp>.json`` sample file.
+
+    Returns
+    -------
+        Number of files written.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    written = 0
+    for timestamp, values in iter_records(path):
+        record = unflatten_metrics(values)
+        record[TIMESTAMP_COLUMN] = timestamp.isoformat()
+        with open(directory / f"metrics_{timestamp.isoformat()}.json", "w") as f:
+            json.dump(record, f, separators=(",", ":"))
+        written += 1
+    return written
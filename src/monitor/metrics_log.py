@@ -0,0 +1,274 @@
+"""Segmented append-only metrics log."""
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+# Sparse index entry: record timestamp (float64) and byte offset (uint64)
+INDEX_ENTRY = struct.Struct("<dQ")
+
+
+class MetricsLog:
+    """Append-only log of metrics records split into time-based segments.
+
+    Each record is one line of ``<timestamp>\\t<compact JSON>``. Segments cover
+    ``segment_seconds`` of wall time and are named after their aligned start
+    time, so the segments overlapping any time range are computed rather than
+    discovered by listing the directory. Every segment has a sparse binary
+    index of ``(timestamp, offset)`` entries written every ``index_every``
+    records, which lets range reads seek close to the first wanted record
+    instead of scanning the segment from the beginning.
+
+    Appends are flushed to the OS immediately so readers in other processes
+    see them, but ``fsync`` is batched: it runs every ``fsync_every`` records,
+    after ``fsync_interval`` seconds, on rotation and on close.
+
+    Timestamps are expected to be non-decreasing.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        segment_seconds: int = 3600,
+        index_every: int = 64,
+        fsync_every: int = 32,
+        fsync_interval: float = 5.0,
+    ) -> None:
+        """Initialize the log in ``directory``."""
+        self.directory = Path(directory)
+        self.segment_seconds = segment_seconds
+        self.index_every = index_every
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._segment_start: Optional[int] = None
+        self._data: Optional[BinaryIO] = None
+        self._index: Optional[BinaryIO] = None
+        self._records_since_index = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "MetricsLog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def segment_start(self, timestamp: float) -> int:
+        """Get the aligned start time of the segment holding ``timestamp``."""
+        return int(timestamp // self.segment_seconds) * self.segment_seconds
+
+    def segment_path(self, start: int) -> Path:
+        """Get the data file path of the segment starting at ``start``."""
+        return self.directory / f"metrics-{start:010d}.log"
+
+    def index_path(self, start: int) -> Path:
+        """Get the index file path of the segment starting at ``start``."""
+        return self.directory / f"metrics-{start:010d}.idx"
+
+    def append(self, record: Dict[str, Any], timestamp: Optional[float] = None) -> None:
+        """Append a record to the log.
+
+        Args:
+        ----
+            record: JSON-serializable record.
+            timestamp: Record time in epoch seconds; defaults to now.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        line = f"{timestamp:.6f}\t{json.dumps(record, separators=(',', ':'))}\n".encode()
+
+        with self._lock:
+            start = self.segment_start(timestamp)
+            if start != self._segment_start:
+                self._open_segment(start)
+            assert self._data is not None and self._index is not None
+
+            if self._records_since_index == 0:
+                self._index.write(INDEX_ENTRY.pack(timestamp, self._data.tell()))
+                self._index.flush()
+            self._records_since_index = (self._records_since_index + 1) % self.index_every
+
+            self._data.write(line)
+            self._data.flush()
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+
+    def flush(self) -> None:
+        """Force pending records to stable storage."""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """Sync and close the current segment."""
+        with self._lock:
+            self._close_segment()
+
+    def read(
+        self,
+        start: float,
+        end: Optional[float] = None,
+    ) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        """Stream records with ``start <= timestamp <= end`` in time order.
+
+        Args:
+        ----
+            start: Range start in epoch seconds.
+            end: Range end in epoch seconds; defaults to now.
+
+        Yields:
+        ------
+            ``(timestamp, record)`` tuples.
+        """
+        if end is None:
+            end = time.time()
+        segment = self.segment_start(start)
+        while segment <= end:
+            yield from self._read_segment(segment, start, end)
+            segment += self.segment_seconds
+
+    def latest(self, max_segments: int = 24) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """Get the newest record, looking back at most ``max_segments`` segments."""
+        segment = self.segment_start(time.time())
+        for _ in range(max_segments):
+            entries = self._load_index(segment)
+            if entries:
+                last = None
+                for last in self._read_segment(segment, entries[-1][0], float("inf")):
+                    pass
+                if last is not None:
+                    return last
+            segment -= self.segment_seconds
+        return None
+
+    def segments(self) -> List[int]:
+        """Get the start times of all segments on disk, oldest first."""
+        starts = []
+        for path in self.directory.glob("metrics-*.log"):
+            try:
+                starts.append(int(path.stem.split("-", 1)[1]))
+            except ValueError:
+                continue
+        return sorted(starts)
+
+    def remove_segment(self, start: int) -> Tuple[int, int]:
+        """Delete a segment and its index.
+
+        Args:
+        ----
+            start: Start time of the segment.
+
+        Returns:
+        -------
+            Number of bytes reclaimed and number of files deleted.
+
+        Raises:
+        ------
+            ValueError: If the segment is the one being written.
+        """
+        with self._lock:
+            if start == self._segment_start:
+                msg = f"Segment {start} is open for writing"
+                raise ValueError(msg)
+            reclaimed = 0
+            deleted = 0
+            for path in (self.segment_path(start), self.index_path(start)):
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                reclaimed += size
+                deleted += 1
+            return reclaimed, deleted
+
+    def _read_segment(
+        self, segment: int, start: float, end: float,
+    ) -> Iterator[Tuple[float, Dict[str, Any]]]:
+        path = self.segment_path(segment)
+        if not path.exists():
+            return
+        entries = self._load_index(segment)
+        timestamps = [entry[0] for entry in entries]
+        position = bisect.bisect_right(timestamps, start) - 1
+        offset = entries[position][1] if position >= 0 else 0
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # record still being written
+                ts_raw, _, payload = line.partition(b"\t")
+                try:
+                    timestamp = float(ts_raw)
+                except ValueError:
+                    continue
+                if timestamp < start:
+                    continue
+                if timestamp > end:
+                    return
+                yield timestamp, json.loads(payload)
+
+    def _load_index(self, segment: int) -> List[Tuple[float, int]]:
+        try:
+            data = self.index_path(segment).read_bytes()
+        except FileNotFoundError:
+            return []
+        usable = len(data) - len(data) % INDEX_ENTRY.size
+        return list(INDEX_ENTRY.iter_unpack(data[:usable]))
+
+    def _open_segment(self, start: int) -> None:
+        self._close_segment()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.segment_path(start)
+        self._truncate_partial_record(path)
+        self._data = open(path, "ab")
+        self._index = open(self.index_path(start), "ab")
+        self._segment_start = start
+        # Index the first record written by this writer, even when resuming
+        self._records_since_index = 0
+
+    def _close_segment(self) -> None:
+        if self._data is not None and self._index is not None:
+            self._sync()
+            self._data.close()
+            self._index.close()
+        self._data = None
+        self._index = None
+        self._segment_start = None
+
+    def _sync(self) -> None:
+        if self._data is not None and self._index is not None and self._unsynced:
+            os.fsync(self._data.fileno())
+            os.fsync(self._index.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    @staticmethod
+    def _truncate_partial_record(path: Path) -> None:
+        """Drop a trailing record left incomplete by a crash."""
+        if not path.exists() or path.stat().st_size == 0:
+            return
+        with open(path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+            size = f.seek(0, os.SEEK_END)
+            chunk = 4096
+            position = size
+            while position > 0:
+                position = max(0, position - chunk)
+                f.seek(position)
+                newline = f.read(size - position).rfind(b"\n")
+                if newline != -1:
+                    f.truncate(position + newline + 1)
+                    return
+            f.truncate(0)
@@ -0,0 +1,64 @@
+"""Precompiled process matching for process metrics."""
+import re
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import psutil
+
+
+class ProcessMatcher:
+    """Match running processes against configured command line patterns.
+
+    All patterns are compiled once into a single alternation that serves as a
+    prefilter: a process whose arguments do not match the alternation cannot
+    match any pattern, which is the common case and costs one regex search per
+    argument. Only when the prefilter hits are the individual patterns tried,
+    in configuration order, so the first configured pattern still wins.
+
+    Match results are cached per PID together with the process create time.
+    A PID whose create time is unchanged keeps its cached result without
+    re-reading its command line; a recycled PID gets a new create time and is
+    matched again.
+    """
+
+    def __init__(self, process_configs: List[Dict[str, Any]]) -> None:
+        """Compile the patterns of ``process_configs``."""
+        self.process_configs = process_configs
+        self._patterns = [
+            (config["name"], re.compile(config["pattern"])) for config in process_configs
+        ]
+        self._any = re.compile("|".join(f"(?:{config['pattern']})" for config in process_configs))
+        self._cache: Dict[int, Tuple[Any, Optional[str]]] = {}
+
+    def match(self, cmdline: List[str]) -> Optional[str]:
+        """Get the name of the first config matching any argument."""
+        if not self._patterns or not any(self._any.search(arg) for arg in cmdline):
+            return None
+        for name, pattern in self._patterns:
+            if any(pattern.search(arg) for arg in cmdline):
+                return name
+        return None
+
+    def scan(self) -> Iterator[Tuple[str, psutil.Process]]:
+        """Yield ``(config name, process)`` for every matching process."""
+        seen = set()
+        for process in psutil.process_iter(["create_time"]):
+            pid = process.pid
+            seen.add(pid)
+            create_time = process.info["create_time"]
+            cached = self._cache.get(pid)
+            if cached is not None and cached[0] == create_time:
+                name = cached[1]
+            else:
+                try:
+                    name = self.match(process.cmdline())
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    continue
+                except psutil.AccessDenied:
+                    name = None
+                self._cache[pid] = (create_time, name)
+            if name is not None:
+                yield name, process
+
+        # Forget processes that have exited
+        for pid in self._cache.keys() - seen:
+            del self._cache[pid]
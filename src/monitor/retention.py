@@ -0,0 +1,267 @@
+"""Retention enforcement for every metrics backend."""
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from db.dialect import Dialect
+from db.select import Select
+from db.update_delete import Delete
+
+from .metrics_log import MetricsLog
+
+logger = logging.getLogger(__name__)
+
+# (bytes reclaimed, rows deleted, files deleted) by one unit of work
+Step = Tuple[int, int, int]
+
+
+@dataclass
+class RetentionReport:
+    """Data reclaimed by one :meth:`RetentionEngine.run`."""
+
+    bytes_reclaimed: int = 0
+    rows_deleted: int = 0
+    files_deleted: int = 0
+    complete: bool = False
+    elapsed: float = 0.0
+    targets: Dict[str, Tuple[int, int, int]] = field(default_factory=dict)
+
+    def add(self, target: str, step: Step) -> None:
+        """Account for one unit of work of ``target``."""
+        reclaimed, rows, files = step
+        self.bytes_reclaimed += reclaimed
+        self.rows_deleted += rows
+        self.files_deleted += files
+        totals = self.targets.get(target, (0, 0, 0))
+        self.targets[target] = (totals[0] + reclaimed, totals[1] + rows, totals[2] + files)
+
+
+class SegmentRetention:
+    """Delete whole :class:`MetricsLog` segments that ended before the cutoff."""
+
+    def __init__(self, log: MetricsLog, name: Optional[str] = None) -> None:
+        """Initialize the target for ``log``."""
+        self.log = log
+        self.name = name or str(log.directory)
+
+    def steps(self, cutoff: float, max_datapoints: Optional[int]) -> Iterator[Step]:
+        """Yield after each deleted segment."""
+        for start in self.log.segments():
+            if start + self.log.segment_seconds > cutoff:
+                break
+            try:
+                reclaimed, deleted = self.log.remove_segment(start)
+            except ValueError:
+                continue
+            yield reclaimed, 0, deleted
+
+
+class FileRetention:
+    """Delete files older than the cutoff or beyond the newest ``max_datapoints``."""
+
+    def __init__(self, directory: Union[str, Path], pattern: str = "*.json") -> None:
+        """Initialize the target for files matching ``pattern`` in ``directory``."""
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.name = str(self.directory)
+
+    def steps(self, cutoff: float, max_datapoints: Optional[int]) -> Iterator[Step]:
+        """Yield after each deleted file."""
+        files = []
+        for path in self.directory.glob(self.pattern):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort(reverse=True)
+
+        for position, (mtime, size, path) in enumerate(files):
+            if mtime >= cutoff and (max_datapoints is None or position < max_datapoints):
+                continue
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            yield size, 0, 1
+
+
+class SQLiteRetention:
+    """Delete expired rows of a SQLite metrics table in bounded batches.
+
+    Rows older than the cutoff are deleted first; then every series keeps at
+    most ``max_datapoints`` newest rows. Each batch is its own transaction,
+    so the writer is never locked out for longer than one batch.
+    """
+
+    def __init__(
+        self,
+        database: Union[str, Path],
+        table: str = "metrics",
+        timestamp_column: str = "timestamp",
+        series_column: Optional[str] = "metric_type",
+        batch_size: int = 1000,
+    ) -> None:
+        """Initialize the target for ``table`` in the ``database`` file."""
+        self.database = str(database)
+        self.table = table
+        self.timestamp_column = timestamp_column
+        self.series_column = series_column
+        self.batch_size = batch_size
+        self.dialect = Dialect("sqlite")
+        self.name = f"{self.database}:{table}"
+
+    def steps(self, cutoff: float, max_datapoints: Optional[int]) -> Iterator[Step]:
+        """Yield after each deleted batch."""
+        quote = self.dialect.quote_identifier
+        placeholder = self.dialect.placeholder
+        timestamp = quote(self.timestamp_column)
+        connection = sqlite3.connect(self.database)
+        try:
+            yield from self._delete_batches(
+                connection, f"{timestamp} < {placeholder}", [self._format_timestamp(cutoff)],
+            )
+            if max_datapoints is None or self.series_column is None:
+                return
+
+            series_column = quote(self.series_column)
+            table = quote(self.table)
+            distinct = f"SELECT DISTINCT {series_column} FROM {table}"
+            for (series,) in connection.execute(distinct).fetchall():
+                boundary = (
+                    Select(self.table, self.dialect)
+                    .columns_list(self.timestamp_column)
+                    .where(f"{series_column} = {placeholder}", series)
+                    .order(timestamp, desc=True)
+                    .limit(1)
+                    .offset(max_datapoints)
+                )
+                row = connection.execute(boundary.build(), boundary.get_parameters()).fetchone()
+                if row is None:
+                    continue
+                yield from self._delete_batches(
+                    connection,
+                    f"{series_column} = {placeholder} AND {timestamp} <= {placeholder}",
+                    [series, row[0]],
+                )
+        finally:
+            connection.close()
+
+    def _delete_batches(
+        self, connection: sqlite3.Connection, condition: str, params: List[Any],
+    ) -> Iterator[Step]:
+        quote = self.dialect.quote_identifier
+        ids = (
+            Select(self.table, self.dialect)
+            .columns_list("id")
+            .where(condition, *params)
+            .order(quote(self.timestamp_column))
+            .limit(self.batch_size)
+        )
+        delete = Delete(self.table, self.dialect).where(
+            f"{quote('id')} IN ({ids.build()})", *ids.get_parameters(),
+        )
+        sql = delete.build()
+        while True:
+            with connection:
+                deleted = connection.execute(sql, delete.get_parameters()).rowcount
+            if deleted:
+                yield 0, deleted, 0
+            if deleted < self.batch_size:
+                return
+
+    @staticmethod
+    def _format_timestamp(epoch: float) -> str:
+        # Same text form SQLAlchemy stores DATETIME columns in
+        return datetime.fromtimestamp(epoch).isoformat(sep=" ", timespec="microseconds")
+
+
+class RetentionEngine:
+    """Enforce ``retention.days`` and ``max_datapoints`` across backends.
+
+    Work is split into small steps (one segment, file or row batch each).
+    :meth:`run` executes steps until its ``time_budget`` is spent and then
+    returns, resuming from the same place on the next call, so it can be
+    called from a collection loop without stalling it.
+    """
+
+    def __init__(
+        self,
+        targets: Iterable[Any],
+        days: float = 30,
+        max_datapoints: Optional[int] = None,
+    ) -> None:
+        """Initialize the engine.
+
+        Args:
+        ----
+            targets: Backends exposing ``name`` and ``steps(cutoff, max_datapoints)``.
+            days: Age in days after which data expires.
+            max_datapoints: Newest data points kept per series, if limited.
+        """
+        self.targets = list(targets)
+        self.days = days
+        self.max_datapoints = max_datapoints
+        self._pending: Optional[Iterator[Tuple[str, Step]]] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], targets: Iterable[Any]) -> "RetentionEngine":
+        """Create an engine from a config with a ``metrics.retention`` section."""
+        retention = config.get("metrics", {}).get("retention", {})
+        return cls(targets, retention.get("days", 30), retention.get("max_datapoints"))
+
+    @property
+    def in_progress(self) -> bool:
+        """Whether a pass was interrupted by its time budget."""
+        return self._pending is not None
+
+    def run(
+        self,
+        time_budget: Optional[float] = None,
+        now: Optional[float] = None,
+    ) -> RetentionReport:
+        """Run retention until done or until ``time_budget`` seconds elapse.
+
+        Args:
+        ----
+            time_budget: Seconds to spend; ``None`` runs the pass to completion.
+            now: Current epoch time used to compute the cutoff of a new pass.
+
+        Returns:
+        -------
+            RetentionReport: What this call reclaimed and whether the pass
+            finished.
+        """
+        started = time.monotonic()
+        if self._pending is None:
+            cutoff = (time.time() if now is None else now) - self.days * 86400
+            self._pending = self._steps(cutoff)
+
+        report = RetentionReport()
+        for target, step in self._pending:
+            report.add(target, step)
+            if time_budget is not None and time.monotonic() - started >= time_budget:
+                break
+        else:
+            self._pending = None
+            report.complete = True
+
+        report.elapsed = time.monotonic() - started
+        logger.info(
+            f"Retention reclaimed {report.bytes_reclaimed} bytes, {report.rows_deleted} rows"
+            f" and {report.files_deleted} files in {report.elapsed:.3f}s"
+            f"{'' if report.complete else ' (continuing)'}",
+        )
+        return report
+
+    def _steps(self, cutoff: float) -> Iterator[Tuple[str, Step]]:
+        for target in self.targets:
+            try:
+                for step in target.steps(cutoff, self.max_datapoints):
+                    yield target.name, step
+            except Exception as e:
+                logger.error(f"Retention failed for {target.name}: {e}")
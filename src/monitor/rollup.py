@@ -0,0 +1,310 @@
+"""Streaming downsampling of metrics into fixed-size windows."""
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .metrics_log import MetricsLog
+
+DEFAULT_FUNCTIONS = ("avg", "max", "min")
+
+
+class WindowStats:
+    """Running statistics of one series over one window.
+
+    Only the running count, sum, min, max and last value are kept, so memory
+    is constant no matter how many samples the window receives.
+    """
+
+    __slots__ = ("count", "last", "max", "min", "sum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.last = math.nan
+
+    @property
+    def avg(self) -> float:
+        """Mean of the samples added so far."""
+        return self.sum / self.count if self.count else math.nan
+
+    def add(self, value: float) -> None:
+        """Add one sample."""
+        self.count += 1
+        self.sum += value
+        self.last = value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def state(self) -> List[float]:
+        """Get the running statistics as ``[count, sum, min, max, last]``."""
+        return [self.count, self.sum, self.min, self.max, self.last]
+
+    @classmethod
+    def from_state(cls, state: Sequence[float]) -> "WindowStats":
+        """Rebuild statistics saved by :meth:`state`."""
+        stats = cls()
+        count, stats.sum, stats.min, stats.max, stats.last = state
+        stats.count = int(count)
+        return stats
+
+    def to_dict(self, functions: Iterable[str] = DEFAULT_FUNCTIONS) -> Dict[str, float]:
+        """Get the configured aggregates plus ``count`` and ``last``."""
+        result = {name: getattr(self, name) for name in functions}
+        result["count"] = self.count
+        result["last"] = self.last
+        return result
+
+
+def flatten_metrics(record: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Flatten nested numeric fields of a record into dotted series names.
+
+    Args:
+    ----
+        record: Metrics record such as ``{"cpu": {"percent": 12.0}}``.
+        prefix: Name prefix used while recursing.
+
+    Returns:
+    -------
+        Mapping like ``{"cpu.percent": 12.0}``; non-numeric fields are skipped.
+    """
+    values = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            values.update(flatten_metrics(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[name] = float(value)
+    return values
+
+
+class RollupStore:
+    """Finished windows of every resolution, one :class:`MetricsLog` each.
+
+    A record holds one window of all series: ``{series: aggregates}``,
+    stored at the window start time. Segments span ``windows_per_segment``
+    windows, so coarse resolutions do not spread a handful of records over
+    many small files.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        resolutions: Sequence[int],
+        windows_per_segment: int = 288,
+    ) -> None:
+        """Initialize the store in ``directory``."""
+        self.directory = Path(directory)
+        self.logs = {
+            resolution: MetricsLog(
+                self.directory / f"rollup-{resolution}",
+                segment_seconds=resolution * windows_per_segment,
+            )
+            for resolution in resolutions
+        }
+
+    def write(self, resolution: int, start: int, window: Dict[str, Dict[str, float]]) -> None:
+        """Append a finished window."""
+        self.logs[resolution].append(window, float(start))
+
+    def read(
+        self, resolution: int, start: float, end: float,
+    ) -> Iterator[Tuple[float, Dict[str, Dict[str, float]]]]:
+        """Stream windows starting within ``[start, end]``."""
+        return self.logs[resolution].read(start, end)
+
+    def close(self) -> None:
+        """Close every resolution's log."""
+        for log in self.logs.values():
+            log.close()
+
+
+class RollupAggregator:
+    """Downsample a stream of samples into windows at several resolutions.
+
+    Every sample updates the open window of each resolution in O(1). When a
+    sample falls past the end of a window, the window is written to the
+    :class:`RollupStore` and a new one is opened. :meth:`query` serves a
+    time range from the finest resolution whose point count fits the
+    requested budget, so long ranges read a few hundred rollups instead of
+    every raw sample.
+
+    Samples are expected in non-decreasing time order.
+    """
+
+    def __init__(
+        self,
+        store: RollupStore,
+        functions: Iterable[str] = DEFAULT_FUNCTIONS,
+    ) -> None:
+        """Initialize the aggregator for the resolutions of ``store``."""
+        self.store = store
+        self.resolutions = sorted(store.logs)
+        self.functions = tuple(functions)
+        unknown = set(self.functions) - {"avg", "max", "min", "count", "last"}
+        if unknown:
+            msg = f"Unknown aggregation functions: {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        self._open: Dict[int, Tuple[int, Dict[str, WindowStats]]] = {}
+        self._last: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, timestamp: float, values: Dict[str, float]) -> None:
+        """Add one sample of several series.
+
+        Args:
+        ----
+            timestamp: Sample time in epoch seconds.
+            values: Series name to value.
+        """
+        with self._lock:
+            self._add(timestamp, values, write=True)
+
+    def replay(self, samples: Iterable[Tuple[float, Dict[str, float]]]) -> None:
+        """Rebuild open windows from samples already seen by a previous run.
+
+        Windows finished during replay were written when their samples first
+        arrived, so nothing is written to the store here.
+        """
+        with self._lock:
+            for timestamp, values in samples:
+                self._add(timestamp, values, write=False)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Checkpoint the open windows so the next run can :meth:`load` them.
+
+        The file is replaced atomically, so a crash leaves either the old or
+        the new checkpoint.
+        """
+        path = Path(path)
+        with self._lock:
+            state = {
+                "timestamp": self._last,
+                "open": {
+                    str(resolution): [
+                        start, {name: stats.state() for name, stats in series.items()},
+                    ]
+                    for resolution, (start, series) in self._open.items()
+                },
+            }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_suffix(".tmp")
+        temp.write_text(json.dumps(state, separators=(",", ":")))
+        os.replace(temp, path)
+
+    def load(self, path: Union[str, Path]) -> Optional[float]:
+        """Restore open windows checkpointed by :meth:`save`.
+
+        A checkpoint taken with other resolutions is ignored, since its
+        windows would not line up with this aggregator's.
+
+        Returns:
+        -------
+            Time of the newest sample the checkpoint covers, or ``None`` if
+            there is no usable checkpoint.
+        """
+        try:
+            state = json.loads(Path(path).read_text())
+            opened = {
+                int(resolution): (int(start), {
+                    name: WindowStats.from_state(stats) for name, stats in series.items()
+                })
+                for resolution, (start, series) in state["open"].items()
+            }
+            timestamp = state["timestamp"]
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+        if timestamp is None or set(opened) != set(self.resolutions):
+            return None
+        with self._lock:
+            self._open = opened
+            self._last = float(timestamp)
+        return self._last
+
+    def window_start(self, timestamp: float) -> int:
+        """Get the start of the coarsest window containing ``timestamp``."""
+        resolution = self.resolutions[-1]
+        return int(timestamp // resolution) * resolution
+
+    def _add(self, timestamp: float, values: Dict[str, float], write: bool) -> None:
+        self._last = timestamp
+        for resolution in self.resolutions:
+            start = int(timestamp // resolution) * resolution
+            current = self._open.get(resolution)
+            if current is None or current[0] != start:
+                if current is not None and write:
+                    self._write(resolution, *current)
+                current = (start, {})
+                self._open[resolution] = current
+            series = current[1]
+            for name, value in values.items():
+                stats = series.get(name)
+                if stats is None:
+                    stats = series[name] = WindowStats()
+                stats.add(value)
+
+    def resolution_for(self, start: float, end: float, max_points: int) -> int:
+        """Get the finest resolution covering ``[start, end]`` in ``max_points`` windows."""
+        span = max(end - start, 0)
+        for resolution in self.resolutions:
+            if span / resolution <= max_points:
+                return resolution
+        return self.resolutions[-1]
+
+    def query(
+        self,
+        series: str,
+        start: float,
+        end: float,
+        max_points: int = 500,
+    ) -> Tuple[int, List[Tuple[float, Dict[str, float]]]]:
+        """Get the windows of one series within a time range.
+
+        Args:
+        ----
+            series: Series name, e.g. ``"cpu.percent"``.
+            start: Range start in epoch seconds.
+            end: Range end in epoch seconds.
+            max_points: Upper bound on the number of windows wanted.
+
+        Returns:
+        -------
+            Tuple of the resolution used and ``(window start, aggregates)``
+            pairs in time order, including the still open window.
+        """
+        resolution = self.resolution_for(start, end, max_points)
+        first = int(start // resolution) * resolution
+        points = [
+            (timestamp, window[series])
+            for timestamp, window in self.store.read(resolution, first, end)
+            if series in window
+        ]
+        with self._lock:
+            current = self._open.get(resolution)
+            if current is not None and first <= current[0] <= end and series in current[1]:
+                points.append((float(current[0]), current[1][series].to_dict(self.functions)))
+        return resolution, points
+
+    def close(self) -> None:
+        """Close the store.
+
+        Open windows are not written: the next run restores them with
+        :meth:`load` or :meth:`replay` and writes them once they are finished.
+        """
+        self.store.close()
+
+    def _write(self, resolution: int, start: int, series: Dict[str, WindowStats]) -> None:
+        if series:
+            window = {name: stats.to_dict(self.functions) for name, stats in series.items()}
+            self.store.write(resolution, start, window)
+
+
+def default_resolutions(interval: int) -> Tuple[int, ...]:
+    """Get the base ``interval`` plus hourly and daily tiers coarser than it."""
+    return tuple(sorted({interval, *(tier for tier in (3600, 86400) if tier > interval)}))
@@ -0,0 +1,76 @@
+"""Single-pass psutil snapshots."""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import psutil
+
+
+@dataclass(frozen=True)
+class SystemSnapshot:
+    """One consistent frame of system readings taken in a single pass."""
+
+    timestamp: float
+    cpu_percent: float
+    cpu_count: Optional[int]
+    cpu_freq: Any
+    memory: Any
+    disk: Any
+    network: Any
+    load_avg: Tuple[float, float, float]
+
+
+class TTLCache:
+    """Cache slow-changing readings for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize the cache."""
+        self.ttl = ttl
+        self._values: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Get a cached value, calling ``loader`` when missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and now - cached[0] < self.ttl:
+                return cached[1]
+        value = loader()
+        with self._lock:
+            self._values[key] = (now, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        with self._lock:
+            self._values.clear()
+
+
+class SnapshotReader:
+    """Read every psutil source once per tick.
+
+    Fast-changing sources (CPU usage, memory, disk, network, load) are read
+    exactly once per :meth:`read`, so all fields derived from a snapshot come
+    from the same syscall. Sources that rarely change (CPU count and
+    frequency) are cached for ``static_ttl`` seconds.
+    """
+
+    def __init__(self, disk_path: str = "/", static_ttl: float = 300.0) -> None:
+        """Initialize the reader."""
+        self.disk_path = disk_path
+        self.static = TTLCache(static_ttl)
+
+    def read(self) -> SystemSnapshot:
+        """Take a snapshot of all system sources."""
+        return SystemSnapshot(
+            timestamp=time.time(),
+            cpu_percent=psutil.cpu_percent(),
+            cpu_count=self.static.get("cpu_count", psutil.cpu_count),
+            cpu_freq=self.static.get("cpu_freq", psutil.cpu_freq),
+            memory=psutil.virtual_memory(),
+            disk=psutil.disk_usage(self.disk_path),
+            network=psutil.net_io_counters(),
+            load_avg=psutil.getloadavg(),
+        )
@@ -50,8 +50,11 @@ def main() -> None:
 
     with col1:
         st.subheader("System Metrics")
+        from dashboard.metrics import get_engine
         from src.metrics.collector import collector
 
+        if collector.engine is None:
+            collector.engine = get_engine()
         metrics = collector.collect_all_metrics()
         if metrics:
             st.json(metrics)
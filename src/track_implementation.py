@@ -1,12 +1,43 @@
-"""Implementation tracking module."""
+"""Implementation tracking module.
+
+Progress is kept in two files under ``tracking/``: a small
+``implementation_latest.json`` snapshot, replaced atomically on every
+update, and an append-only ``implementation_history.jsonl`` log with one
+compact JSON entry per line. Recording progress appends one line instead
+of rewriting the whole history. Once the log grows past ``COMPACT_BYTES``
+all but its newest ``HISTORY_KEEP`` entries move to a gzip archive beside
+it, so no entry is lost. The history of a legacy
+``implementation_metrics.json`` is moved into the log the first time the
+directory is used.
+"""
+import contextlib
+import gzip
 import json
 import logging
 import os
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+TRACKING_DIR = Path("tracking")
+LATEST_FILE = "implementation_latest.json"
+HISTORY_FILE = "implementation_history.jsonl"
+# Single-file format written before the history log existed
+LEGACY_FILE = "implementation_metrics.json"
+# The legacy file is renamed to this once its history is in the log
+MIGRATED_SUFFIX = ".migrated"
+
+HISTORY_KEEP = 1000
+COMPACT_BYTES = 4 * 1024 * 1024
+DEFAULT_TAIL = 100
+
+_TAIL_BLOCK = 64 * 1024
+
+_history_lock = threading.Lock()
+
 
 def load_metrics(filepath):
     """Load metrics from a JSON file."""
@@ -35,29 +66,210 @@ def save_metrics(metrics, filepath):
         logger.error(f"Error saving metrics to {filepath}: {e}")
 
 
-def track_implementation_progress(metrics):
-    """Track implementation progress by saving metrics to a file."""
+def write_atomic(data, filepath):
+    """Replace ``filepath`` with ``data`` so readers never see a partial file.
+
+    The text is written to a temporary file in the same directory, synced,
+    and renamed over ``filepath``.
+    """
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=filepath.parent, prefix=f".{filepath.name}.")
     try:
-        timestamp = datetime.now().isoformat()
-        metrics_dir = Path("tracking/history")
-        metrics_dir.mkdir(parents=True, exist_ok=True)
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def append_history(entry, filepath, compact_bytes=COMPACT_BYTES, keep=HISTORY_KEEP):
+    """Append one entry to a history log, compacting it when it grows too big.
+
+    Args:
+    ----
+        entry: JSON-serializable history entry.
+        filepath: History log path.
+        compact_bytes: Log size that triggers compaction.
+        keep: Entries kept by compaction.
+    """
+    filepath = Path(filepath)
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+    with _history_lock:
+        with open(filepath, "ab+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # Leave a torn last line on its own instead of joining it
+                    line = b"\n" + line
+            f.write(line)
+            size = f.tell()
+        if size > compact_bytes:
+            compact_history(filepath, keep)
 
-        # Save current metrics
-        current_metrics_file = metrics_dir / f"metrics_{timestamp}.json"
-        save_metrics(metrics, current_metrics_file)
 
-        # Update implementation metrics
-        implementation_file = Path("tracking/implementation_metrics.json")
-        implementation_metrics = load_metrics(implementation_file)
+def _tail_offset(f, count):
+    """Get the offset where the last ``count`` lines of a binary file start."""
+    position = f.seek(0, os.SEEK_END)
+    data = b""
+    while position > 0:
+        step = min(_TAIL_BLOCK, position)
+        position -= step
+        f.seek(position)
+        data = f.read(step) + data
+        # A newline ending the file does not start another line
+        index = len(data) - 1 if data.endswith(b"\n") else len(data)
+        for _ in range(count):
+            index = data.rfind(b"\n", 0, index)
+            if index == -1:
+                break
+        else:
+            return position + index + 1
+    return 0
+
+
+def compact_history(filepath, keep=HISTORY_KEEP):
+    """Move all but the newest ``keep`` entries of a history log to an archive.
+
+    The older lines are copied unchanged into a new
+    ``<name>-<time>.jsonl.gz`` file beside the log before the log is
+    rewritten with the rest.
+
+    Returns
+    -------
+        Path: The archive, or ``None`` if there was nothing to move.
+    """
+    filepath = Path(filepath)
+    with open(filepath, "rb") as f:
+        offset = _tail_offset(f, keep)
+        if offset == 0:
+            return None
+        archive = filepath.with_name(
+            f"{filepath.stem}-{datetime.now():%Y%m%dT%H%M%S%f}{filepath.suffix}.gz",
+        )
+        f.seek(0)
+        with gzip.open(archive, "wb") as out:
+            remaining = offset
+            while remaining > 0:
+                block = f.read(min(_TAIL_BLOCK, remaining))
+                out.write(block)
+                remaining -= len(block)
+        rest = f.read()
+    write_atomic(rest.decode(), filepath)
+    logger.info(f"Compacted {filepath} to {keep} entries, older ones are in {archive}")
+    return archive
+
+
+def migrate_legacy(directory=TRACKING_DIR):
+    """Move the history of a legacy ``implementation_metrics.json`` into the log.
+
+    The legacy entries go before any already in the log, the snapshot
+    (its ``latest`` entry, or the file itself if it has none) becomes the
+    latest file if there is none, and the legacy file is
+    renamed with ``MIGRATED_SUFFIX`` so this happens once. A migration
+    interrupted before the rename is not applied twice.
+
+    Returns
+    -------
+        bool: Whether a legacy file was migrated.
+    """
+    directory = Path(directory)
+    legacy_file = directory / LEGACY_FILE
+    if not legacy_file.exists():
+        return False
+    legacy = load_metrics(legacy_file)
+    history = legacy.pop("history", None)
+    history = history if isinstance(history, list) else []
+    # track_implementation_progress kept the snapshot under "latest"; older
+    # files are the snapshot itself
+    if isinstance(legacy.get("latest"), dict):
+        legacy = legacy["latest"]
+    history_file = directory / HISTORY_FILE
 
-        # Update metrics with timestamp
-        metrics["timestamp"] = timestamp
-        implementation_metrics["history"] = implementation_metrics.get("history", [])
-        implementation_metrics["history"].append(metrics)
-        implementation_metrics["latest"] = metrics
+    with _history_lock:
+        try:
+            existing = history_file.read_bytes()
+        except FileNotFoundError:
+            existing = b""
+        first = existing.split(b"\n", 1)[0]
+        if history and not (first and _same_entry(first, history[0])):
+            lines = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in history)
+            write_atomic(lines + existing.decode(), history_file)
+    if legacy and not (directory / LATEST_FILE).exists():
+        write_atomic(json.dumps(legacy, indent=4), directory / LATEST_FILE)
+    os.replace(legacy_file, legacy_file.with_name(LEGACY_FILE + MIGRATED_SUFFIX))
+    logger.info(f"Moved {len(history)} entries of {legacy_file} into {history_file}")
+    return True
 
-        # Save updated implementation metrics
-        save_metrics(implementation_metrics, implementation_file)
+
+def _same_entry(line, entry):
+    try:
+        return json.loads(line) == entry
+    except json.JSONDecodeError:
+        return False
+
+
+def read_history_tail(filepath, count=DEFAULT_TAIL):
+    """Read the newest ``count`` entries of a history log.
+
+    The file is read backwards in blocks until enough lines are found, so
+    the cost depends on ``count`` rather than on the size of the log. A
+    truncated last line left by an interrupted write is skipped.
+
+    Args:
+    ----
+        filepath: History log path.
+        count: Number of entries wanted.
+
+    Returns:
+    -------
+        list: Up to ``count`` entries, oldest first.
+    """
+    if count <= 0:
+        return []
+    try:
+        f = open(filepath, "rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        position = f.seek(0, os.SEEK_END)
+        data = b""
+        # One more newline than entries so the first line is known to be whole
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(_TAIL_BLOCK, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+
+    lines = data.split(b"\n")
+    if position > 0:
+        lines = lines[1:]
+    entries = []
+    for line in lines[-count - 1:]:
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping unreadable history entry in {filepath}")
+    return entries[-count:]
+
+
+def track_implementation_progress(metrics, directory=TRACKING_DIR):
+    """Track implementation progress by saving metrics to a file."""
+    try:
+        directory = Path(directory)
+        metrics["timestamp"] = datetime.now().isoformat()
+
+        migrate_legacy(directory)
+        append_history(metrics, directory / HISTORY_FILE)
+        write_atomic(json.dumps(metrics, indent=4), directory / LATEST_FILE)
 
         logger.info("Implementation progress tracked successfully")
         return True
@@ -66,11 +278,25 @@ def track_implementation_progress(metrics):
         return False
 
 
-def get_implementation_status():
-    """Get the current implementation status."""
+def get_implementation_status(directory=TRACKING_DIR, tail=DEFAULT_TAIL):
+    """Get the current implementation status.
+
+    Args:
+    ----
+        directory: Tracking directory.
+        tail: Number of newest history entries to include.
+
+    Returns:
+    -------
+        dict: ``latest`` snapshot and the ``history`` tail, oldest first.
+    """
     try:
-        implementation_file = Path("tracking/implementation_metrics.json")
-        return load_metrics(implementation_file)
+        directory = Path(directory)
+        migrate_legacy(directory)
+        return {
+            "latest": load_metrics(directory / LATEST_FILE),
+            "history": read_history_tail(directory / HISTORY_FILE, tail),
+        }
     except Exception as e:
         logger.error(f"Error getting implementation status: {e}")
         return {}
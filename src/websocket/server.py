@@ -2,28 +2,30 @@
 import asyncio
 import json
 import logging
+import time
 from pathlib import Path
 
 import websockets  # type: ignore
 
+from monitor.metrics_log import MetricsLog
+
 logger = logging.getLogger(__name__)
 
 
 async def send_metrics(websocket):
-    """Send metrics to connected clients."""
-    metrics_dir = Path("metrics")
+    """Stream records appended to the metrics log to a connected client."""
+    log = MetricsLog(Path("metrics") / "data")
+    latest = log.latest()
+    last_sent = time.time()
+    if latest is not None:
+        last_sent, record = latest
+        await websocket.send(json.dumps(record))
     while True:
         try:
-            system_metrics = json.loads((metrics_dir / "system_metrics.json").read_text())
-            process_metrics = json.loads((metrics_dir / "process_metrics.json").read_text())
-            await websocket.send(
-                json.dumps(
-                    {
-                        "system": system_metrics,
-                        "processes": process_metrics,
-                    },
-                ),
-            )
+            for timestamp, record in log.read(last_sent):
+                if timestamp > last_sent:
+                    await websocket.send(json.dumps(record))
+                    last_sent = timestamp
             await asyncio.sleep(1)
         except Exception as e:
             logger.error(f"Error sending metrics: {e}")
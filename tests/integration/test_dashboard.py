@@ -6,6 +6,8 @@ from unittest.mock import patch
 
 import pytest
 
+from dashboard.timeseries import SeriesStore
+
 
 def test_dashboard_config(project_root):
     """Test dashboard configuration loading."""
@@ -28,7 +30,6 @@ def mock_session_state():
 
     class MockState:
         def __init__(self) -> None:
-            self.metrics_history: list[dict] = []
             self.last_update: Optional[float] = None
 
         def get(self, key: str, default: Any = None) -> Any:
@@ -42,26 +43,34 @@ def mock_session_state():
     return MockState()
 
 
-def test_update_metrics(mock_metrics, mock_session_state):
+@pytest.fixture()
+def store():
+    """Fixture for an empty history store."""
+    return SeriesStore(["cpu", "memory", "disk"], capacity=10)
+
+
+def test_update_metrics(mock_metrics, mock_session_state, store):
     """Test metrics update functionality."""
     from dashboard.main import update_metrics
 
     # Update metrics
-    update_metrics(mock_session_state, mock_metrics)
+    update_metrics(mock_session_state, mock_metrics, store=store)
 
     # Verify metrics were stored
-    assert len(mock_session_state.metrics_history) == 1
-    assert mock_session_state.metrics_history[0] == mock_metrics
+    assert len(store) == 1
+    assert store.latest() == mock_metrics["system"]
     assert mock_session_state.last_update is not None
 
 
 @pytest.mark.parametrize(("mock_go", "mock_st"), [(None, None)], indirect=True)
-def test_display_metrics(mock_make_subplots, mock_go, mock_st, mock_metrics, mock_session_state):
+def test_display_metrics(
+    mock_make_subplots, mock_go, mock_st, mock_metrics, mock_session_state, store,
+):
     """Test metrics display functionality."""
-    from dashboard.main import display_metrics
+    from dashboard.main import display_metrics, update_metrics
 
     # Setup mock data
-    mock_session_state.metrics_history = [mock_metrics]
+    update_metrics(mock_session_state, mock_metrics, store=store)
 
     # Mock plotly imports
     with patch("dashboard.main.make_subplots", mock_make_subplots), patch(
@@ -70,7 +79,7 @@ def test_display_metrics(mock_make_subplots, mock_go, mock_st, mock_metrics, moc
     ):
         # Display metrics
         metrics_to_show = ["CPU Usage", "Memory Usage", "Disk Usage"]
-        display_metrics(mock_session_state, metrics_to_show)
+        display_metrics(mock_session_state, metrics_to_show, store=store)
 
         # Verify display calls
         assert mock_st.plotly_chart.called
@@ -0,0 +1,193 @@
+"""Unit tests for windowed alert rule evaluation."""
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from src.monitor.alerts import Alert, AlertEvaluator, AlertRule, AlertStore
+
+
+@pytest.fixture()
+def evaluator():
+    """Evaluator with one 30 second CPU rule."""
+    return AlertEvaluator([AlertRule("cpu", 80, duration=30, severity="critical")])
+
+
+def test_fires_after_full_duration(evaluator):
+    """Test a rule fires only after breaching for the whole duration."""
+    alerts = [evaluator.observe(t, "cpu", 90.0) for t in range(0, 40, 10)]
+
+    assert alerts[:3] == [[], [], []]
+    assert len(alerts[3]) == 1
+    assert alerts[3][0].status == "firing"
+    assert alerts[3][0].rule.severity == "critical"
+    # Fires once per breach
+    assert evaluator.observe(40, "cpu", 95.0) == []
+
+
+def test_dip_restarts_window(evaluator):
+    """Test a sample within the threshold restarts the window."""
+    evaluator.observe(0, "cpu", 90.0)
+    evaluator.observe(20, "cpu", 50.0)
+    evaluator.observe(30, "cpu", 90.0)
+
+    assert evaluator.observe(50, "cpu", 90.0) == []
+    assert evaluator.observe(60, "cpu", 90.0)[0].status == "firing"
+
+
+def test_resolves_and_gap_restarts(evaluator):
+    """Test recovery resolves the alert and long gaps restart the window."""
+    for t in (0, 10, 20, 30):
+        evaluator.observe(t, "cpu", 90.0)
+    assert evaluator.firing() == [(evaluator.rules[0], "")]
+
+    assert evaluator.observe(40, "cpu", 10.0)[0].status == "resolved"
+    assert evaluator.firing() == []
+
+    evaluator.observe(50, "cpu", 90.0)
+    assert evaluator.observe(200, "cpu", 90.0) == []
+
+
+def test_series_and_metric_index():
+    """Test state is kept per series and unrelated metrics are skipped."""
+    evaluator = AlertEvaluator(
+        [AlertRule("cpu", 80, duration=0), AlertRule("memory", 10, duration=0, comparison="<")],
+    )
+
+    alerts = evaluator.observe_many(0, {"cpu": 90.0, "memory": 50.0, "disk": 99.0}, series="a")
+    alerts += evaluator.observe(0, "memory", 5.0, series="b")
+
+    fired = [(alert.rule.metric, alert.series) for alert in alerts]
+    assert fired == [("cpu", "a"), ("memory", "b")]
+
+
+def test_from_config():
+    """Test rules are read from metrics.alert_rules."""
+    rule = {"metric": "cpu", "threshold": 80, "duration": 300, "severity": "warning"}
+    config = {"metrics": {"alert_rules": [rule]}}
+
+    evaluator = AlertEvaluator.from_config(config)
+
+    assert evaluator.rules == [AlertRule("cpu", 80.0, 300.0, "warning")]
+    with pytest.raises(ValueError):
+        AlertRule.from_config({"metric": "cpu", "threshold": 1, "comparison": "!="})
+
+
+def test_store_batches_inserts(tmp_path, evaluator):
+    """Test alerts are buffered and inserted in one batch."""
+    database = tmp_path / "dashboard.db"
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "CREATE TABLE alerts (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+            " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL, threshold FLOAT NOT NULL,"
+            " status VARCHAR(16) NOT NULL)",
+        )
+    store = AlertStore(database, batch_size=3, flush_interval=60)
+    rule = evaluator.rules[0]
+    store.add([Alert(rule, "", 0.0, 90.0, "firing"), Alert(rule, "", 1.0, 10.0, "resolved")])
+    with sqlite3.connect(database) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 0
+
+    store.add([Alert(rule, "", 2.0, 95.0, "firing")])
+    with sqlite3.connect(database) as connection:
+        rows = connection.execute(
+            "SELECT metric_type, value, threshold, status FROM alerts ORDER BY id",
+        ).fetchall()
+
+    assert rows == [
+        ("cpu", 90.0, 80.0, "firing"),
+        ("cpu", 10.0, 80.0, "resolved"),
+        ("cpu", 95.0, 80.0, "firing"),
+    ]
+    assert store.flush() == 0
+
+
+def test_store_chunks_under_variable_limit(tmp_path, evaluator):
+    """Test a large flush is split into statements under the parameter limit."""
+    database = tmp_path / "dashboard.db"
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "CREATE TABLE alerts (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+            " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL, threshold FLOAT NOT NULL,"
+            " status VARCHAR(16) NOT NULL)",
+        )
+    store = AlertStore(database, batch_size=100, flush_interval=60)
+    rule = evaluator.rules[0]
+    store.add([Alert(rule, "", float(t), 90.0, "firing") for t in range(5)])
+
+    statements = []
+    connect = sqlite3.connect
+
+    def traced_connect(path):
+        connection = connect(path)
+        connection.set_trace_callback(statements.append)
+        return connection
+
+    with patch("src.monitor.alerts.max_variables", return_value=10), patch(
+        "sqlite3.connect", side_effect=traced_connect,
+    ):
+        assert store.flush() == 5
+
+    inserts = [sql for sql in statements if sql.startswith("INSERT")]
+    assert len(inserts) == 3  # 2 + 2 + 1 rows of 5 parameters
+    assert statements.count("COMMIT") == 1
+    with sqlite3.connect(database) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 5
+
+
+def test_duration_units():
+    """Test durations may be given with a unit suffix."""
+    rule = AlertRule.from_config({"metric": "cpu", "threshold": 80, "duration": "5m"})
+
+    assert rule.duration == 300.0
+
+
+def test_state_carries_over_runs(tmp_path, evaluator):
+    """Test a breach window started by one run fires in the next."""
+    path = tmp_path / "alert-state.json"
+    for t in (0, 10, 20):
+        evaluator.observe(t, "cpu", 90.0)
+    evaluator.save(path)
+
+    # Reordered rules keep their state; a removed rule's state is dropped
+    resumed = AlertEvaluator([AlertRule("memory", 50), evaluator.rules[0]])
+    assert resumed.load(path) == 1
+    assert resumed.observe(30, "cpu", 90.0)[0].status == "firing"
+    assert AlertEvaluator([AlertRule("cpu", 70)]).load(path) == 0
+    assert AlertEvaluator([]).load(tmp_path / "missing.json") == 0
+
+
+def test_store_bounds_requeued_alerts(tmp_path, evaluator):
+    """Test failed batches are kept only up to max_pending alerts."""
+    store = AlertStore(tmp_path / "missing" / "dashboard.db", batch_size=2, max_pending=3)
+    rule = evaluator.rules[0]
+
+    for t in range(5):
+        store.add([Alert(rule, "", float(t), 90.0, "firing")])
+
+    assert [alert.timestamp for alert in store._pending] == [2.0, 3.0, 4.0]
+    assert store.dropped == 2
+
+
+def test_update_rules_keeps_state_of_unchanged_rules(evaluator):
+    """Test replacing the rules keeps the windows of rules that stay configured."""
+    kept = evaluator.rules[0]
+    evaluator.observe(0, "cpu", 90.0)
+
+    evaluator.update_rules([AlertRule("memory", 50, duration=0), kept])
+
+    assert evaluator.observe(0, "memory", 60.0)[0].rule.metric == "memory"
+    assert evaluator.observe(30, "cpu", 90.0)[0].status == "firing"
+    assert sorted(rule.metric for rule, _ in evaluator.firing()) == ["cpu", "memory"]
+
+
+def test_reconfigure_keeps_rules_on_invalid_config(evaluator):
+    """Test a configuration with a broken rule leaves the current rules alone."""
+    rules = list(evaluator.rules)
+
+    evaluator.reconfigure({"alert_rules": [{"metric": "cpu"}]})
+    assert evaluator.rules == rules
+
+    evaluator.reconfigure({"alert_rules": []})
+    assert evaluator.rules == []
+    assert evaluator.observe(0, "cpu", 99.0) == []
@@ -0,0 +1,161 @@
+"""Unit tests for columnar metrics archives."""
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from src.monitor.archive import (
+    export_json,
+    export_sqlite,
+    import_json,
+    import_sqlite,
+    iter_records,
+    load_series,
+    read_archive,
+    unflatten_metrics,
+    write_archive,
+)
+
+START = datetime(2024, 1, 1)
+SCHEMA = (
+    "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+    " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)"
+)
+
+
+def sqlite_timestamp(value):
+    """Format a timestamp like SQLite DATETIME columns."""
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+
+@pytest.fixture()
+def database(tmp_path):
+    """Metrics database with cpu every second and memory every other second."""
+    path = tmp_path / "metrics.db"
+    rows = []
+    for second in range(10):
+        timestamp = sqlite_timestamp(START + timedelta(seconds=second))
+        rows.append((timestamp, "cpu", float(second)))
+        if second % 2 == 0:
+            rows.append((timestamp, "memory", 50.0 + second))
+    with sqlite3.connect(path) as connection:
+        connection.execute(SCHEMA)
+        connection.executemany(
+            "INSERT INTO metrics (timestamp, metric_type, value) VALUES (?, ?, ?)", rows,
+        )
+    return path
+
+
+@pytest.mark.parametrize("name", ["metrics.arrow", "metrics.parquet"])
+def test_sqlite_round_trip(database, tmp_path, name):
+    """Test the metrics table pivots to columns and imports back unchanged."""
+    archive = tmp_path / name
+
+    assert export_sqlite(database, archive, batch_size=4) == 10
+    table = read_archive(archive)
+    assert table.column_names == ["timestamp", "cpu", "memory"]
+    assert table.column("memory").null_count == 5
+
+    target = tmp_path / "restored.db"
+    with sqlite3.connect(target) as connection:
+        connection.execute(SCHEMA)
+    assert import_sqlite(archive, target) == 15
+
+    query = "SELECT timestamp, metric_type, value FROM metrics ORDER BY timestamp, metric_type"
+    with sqlite3.connect(database) as original, sqlite3.connect(target) as restored:
+        assert restored.execute(query).fetchall() == original.execute(query).fetchall()
+
+
+def test_export_sqlite_range(database, tmp_path):
+    """Test only rows within the time range are exported."""
+    archive = tmp_path / "metrics.arrow"
+
+    start, end = START + timedelta(seconds=2), START + timedelta(seconds=5)
+    assert export_sqlite(database, archive, start, end) == 3
+    assert [timestamp.second for timestamp, _ in iter_records(archive)] == [2, 3, 4]
+
+
+def test_load_series_zero_copy(tmp_path):
+    """Test uncompressed IPC columns load as views of the mapped file."""
+    archive = tmp_path / "metrics.arrow"
+    records = [
+        (START + timedelta(seconds=i), {"cpu": float(i)} if i != 1 else {}) for i in range(3)
+    ]
+    write_archive(archive, records, ["cpu"], compression=None)
+
+    timestamps, values, valid = load_series(archive)["cpu"]
+
+    assert not values.flags.owndata
+    assert values[[0, 2]].tolist() == [0.0, 2.0]
+    assert valid.tolist() == [True, False, True]
+    assert timestamps[2] == np.datetime64("2024-01-01T00:00:02")
+
+
+def test_json_round_trip(tmp_path):
+    """Test JSON sample files flatten to columns and are rebuilt."""
+    samples = tmp_path / "samples"
+    samples.mkdir()
+    for second in range(3):
+        timestamp = (START + timedelta(seconds=second)).isoformat()
+        record = {
+            "system": {"cpu": float(second), "memory": 40.0},
+            "processes": [],
+            "timestamp": timestamp,
+        }
+        (samples / f"metrics_{timestamp}.json").write_text(json.dumps(record, indent=4))
+    archive = tmp_path / "metrics.arrow"
+
+    assert export_json(sorted(samples.iterdir()), archive) == 3
+    assert read_archive(archive).column_names == ["timestamp", "system.cpu", "system.memory"]
+
+    restored = tmp_path / "restored"
+    assert import_json(archive, restored) == 3
+    first = json.loads((restored / "metrics_2024-01-01T00:00:00.json").read_text())
+    assert first == {"system": {"cpu": 0.0, "memory": 40.0}, "timestamp": "2024-01-01T00:00:00"}
+
+
+def test_export_json_merges_log(tmp_path):
+    """Test sample files and a metrics log are merged in time order."""
+    from src.monitor.metrics_log import MetricsLog
+
+    samples = tmp_path / "samples"
+    samples.mkdir()
+    for second in (0, 2):
+        timestamp = START + timedelta(seconds=second)
+        record = {"system": {"cpu": float(second)}, "timestamp": timestamp.isoformat()}
+        (samples / f"metrics_{second}.json").write_text(json.dumps(record))
+    log = MetricsLog(tmp_path / "log")
+    for second in (1, 3):
+        timestamp = (START + timedelta(seconds=second)).timestamp()
+        log.append({"system": {"cpu": float(second), "memory": 5.0}}, timestamp)
+    log.close()
+    archive = tmp_path / "metrics.arrow"
+
+    rows = export_json(sorted(samples.iterdir()), archive, log=log, end=START.timestamp() + 10)
+
+    assert rows == 4
+    table = read_archive(archive)
+    assert table.column_names == ["timestamp", "system.cpu", "system.memory"]
+    assert table.column("system.cpu").to_pylist() == [0.0, 1.0, 2.0, 3.0]
+    assert table.column("system.memory").to_pylist() == [None, 5.0, None, 5.0]
+
+
+def test_export_json_rejects_unordered_files(tmp_path):
+    """Test files out of time order are refused instead of sorted in memory."""
+    files = []
+    for second in (1, 0):
+        timestamp = (START + timedelta(seconds=second)).isoformat()
+        file = tmp_path / f"metrics_{second}.json"
+        file.write_text(json.dumps({"cpu": 1.0, "timestamp": timestamp}))
+        files.append(file)
+
+    with pytest.raises(ValueError):
+        export_json(files, tmp_path / "metrics.arrow", columns=["cpu"])
+
+
+def test_unflatten_metrics():
+    """Test dotted names become nested fields."""
+    nested = unflatten_metrics({"a.b": 1.0, "a.c.d": 2.0, "e": 3.0})
+    assert nested == {"a": {"b": 1.0, "c": {"d": 2.0}}, "e": 3.0}
@@ -0,0 +1,255 @@
+"""Unit tests for the WebSocket broadcast engine."""
+import asyncio
+import json
+
+import pytest
+
+from dashboard.websocket.broadcast import BroadcastEngine
+from dashboard.websocket.encoding import decode_binary
+from dashboard.websocket.server import ServerSettings
+
+
+class FakeWebSocket:
+    """Minimal WebSocket double recording sent frames."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.sent: list[str] = []
+        self.delay = delay
+
+    async def send(self, frame: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(frame)
+
+
+def metrics_message(**data):
+    """Build a metrics message with the given data fields."""
+    return {"type": "metrics", "timestamp": "t", "data": data}
+
+
+@pytest.mark.asyncio
+async def test_first_frame_full_then_delta():
+    """Test clients get a full frame first and only changed fields after."""
+    engine = BroadcastEngine()
+    ws = FakeWebSocket()
+    engine.add(ws)
+
+    await engine.broadcast(metrics_message(cpu=1.0, memory=2.0))
+    await engine.broadcast(metrics_message(cpu=5.0, memory=2.0))
+
+    first, second = (json.loads(frame) for frame in ws.sent)
+    assert first == {
+        "type": "metrics",
+        "timestamp": "t",
+        "delta": False,
+        "data": {"cpu": 1.0, "memory": 2.0},
+    }
+    assert second["delta"] is True
+    assert second["data"] == {"cpu": 5.0}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_payload_sends_nothing():
+    """Test a tick with no changes produces no frame."""
+    engine = BroadcastEngine()
+    ws = FakeWebSocket()
+    engine.add(ws)
+
+    await engine.broadcast(metrics_message(cpu=1.0))
+    await engine.broadcast(metrics_message(cpu=1.0))
+
+    assert len(ws.sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_subscription_groups_share_one_frame():
+    """Test clients are filtered by subscription and share serialized frames."""
+    engine = BroadcastEngine()
+    cpu_a, cpu_b, everything = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    engine.subscribe(cpu_a, ["cpu"])
+    engine.subscribe(cpu_b, ["cpu"])
+    engine.add(everything)
+
+    await engine.broadcast(metrics_message(cpu=1.0, memory=2.0))
+
+    assert json.loads(cpu_a.sent[0])["data"] == {"cpu": 1.0}
+    assert cpu_a.sent[0] is cpu_b.sent[0]
+    assert json.loads(everything.sent[0])["data"] == {"cpu": 1.0, "memory": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_resubscribe_gets_full_frame():
+    """Test changing subscription resets the client to a full frame."""
+    engine = BroadcastEngine()
+    ws = FakeWebSocket()
+    engine.subscribe(ws, ["cpu"])
+    await engine.broadcast(metrics_message(cpu=1.0, memory=2.0))
+
+    engine.subscribe(ws, ["cpu", "memory"])
+    await engine.broadcast(metrics_message(cpu=1.0, memory=2.0))
+
+    frame = json.loads(ws.sent[-1])
+    assert frame["delta"] is False
+    assert frame["data"] == {"cpu": 1.0, "memory": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_slow_client_dropped_without_stalling_others():
+    """Test a client exceeding the send timeout is dropped."""
+    engine = BroadcastEngine(send_timeout=0.05)
+    slow, fast = FakeWebSocket(delay=1.0), FakeWebSocket()
+    engine.add(slow)
+    engine.add(fast)
+
+    dropped = await asyncio.wait_for(engine.broadcast(metrics_message(cpu=1.0)), 0.5)
+
+    assert dropped == {slow}
+    assert len(fast.sent) == 1
+    assert slow not in engine.clients
+
+
+@pytest.mark.asyncio
+async def test_plain_message_sent_verbatim():
+    """Test messages without a data mapping are sent unchanged."""
+    engine = BroadcastEngine()
+    ws = FakeWebSocket()
+    engine.subscribe(ws, ["cpu"])
+
+    await engine.broadcast({"type": "alert", "message": "high cpu"})
+
+    assert json.loads(ws.sent[0]) == {"type": "alert", "message": "high cpu"}
+
+
+class BlockedWebSocket(FakeWebSocket):
+    """WebSocket whose sends wait until released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def send(self, frame: str) -> None:
+        await self.release.wait()
+        self.sent.append(frame)
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_does_not_delay_broadcast():
+    """Test queuing returns at once while a peer's send is stalled."""
+    engine = BroadcastEngine(send_timeout=10)
+    stalled, fast = BlockedWebSocket(), FakeWebSocket()
+    engine.add(stalled)
+    engine.add(fast)
+
+    for cpu in range(3):
+        await asyncio.wait_for(engine.broadcast(metrics_message(cpu=float(cpu)), wait=False), 0.05)
+        await asyncio.sleep(0)
+
+    assert len(fast.sent) == 3
+    assert engine.stats()["queue_depth"] == {"total": 2, "max": 2}
+    stalled.release.set()
+    await asyncio.sleep(0.01)
+    assert [json.loads(frame)["data"]["cpu"] for frame in stalled.sent] == [0.0, 1.0, 2.0]
+
+
+@pytest.mark.asyncio
+async def test_latest_wins_overflow_sends_full_frame():
+    """Test a full queue is replaced by a full frame of the newest state."""
+    engine = BroadcastEngine(queue_size=2)
+    ws = BlockedWebSocket()
+    engine.add(ws)
+
+    for cpu in range(5):
+        await engine.broadcast(metrics_message(cpu=float(cpu), memory=1.0), wait=False)
+    ws.release.set()
+    await asyncio.sleep(0.01)
+
+    frames = [json.loads(frame) for frame in ws.sent]
+    assert frames[-1] == {
+        "type": "metrics",
+        "timestamp": "t",
+        "delta": False,
+        "data": {"cpu": 4.0, "memory": 1.0},
+    }
+    assert engine.stats()["dropped_frames"] > 0
+    assert len(frames) < 5
+    assert ws in engine.clients
+
+
+@pytest.mark.asyncio
+async def test_disconnect_overflow_drops_client():
+    """Test the disconnect policy drops a client whose queue is full."""
+    engine = BroadcastEngine(queue_size=1, overflow="disconnect")
+    ws = BlockedWebSocket()
+    engine.add(ws)
+
+    dropped = set()
+    for cpu in range(3):
+        dropped |= await engine.broadcast(metrics_message(cpu=float(cpu)), wait=False)
+
+    assert dropped == {ws}
+    assert ws not in engine.clients
+
+
+def test_unknown_overflow_policy_rejected():
+    """Test only known overflow policies are accepted."""
+    with pytest.raises(ValueError):
+        BroadcastEngine(overflow="block")
+
+
+@pytest.mark.asyncio
+async def test_stats_report_send_latency():
+    """Test send latency percentiles are reported."""
+    engine = BroadcastEngine()
+    assert engine.stats()["send_latency"] == {"p50": None, "p95": None, "p99": None}
+    ws = FakeWebSocket(delay=0.01)
+    engine.add(ws)
+
+    await engine.broadcast(metrics_message(cpu=1.0))
+
+    latency = engine.stats()["send_latency"]
+    assert 0.005 < latency["p50"] <= latency["p99"] < 1.0
+
+
+def test_server_settings_from_config(tmp_path):
+    """Test limits are read from the config file, with defaults when it is missing."""
+    path = tmp_path / "websocket.json"
+    path.write_text(json.dumps({
+        "security": {"max_connections": 5, "timeout": 10},
+        "broadcast": {"queue_size": 2},
+    }))
+
+    settings = ServerSettings.load(str(path))
+    assert settings.max_connections == 5
+    assert settings.timeout == 10.0
+    assert settings.heartbeat_interval == 30.0
+    assert (settings.queue_size, settings.overflow_policy) == (2, "latest")
+    assert ServerSettings.load(str(tmp_path / "missing.json")) == ServerSettings()
+
+
+@pytest.mark.asyncio
+async def test_binary_subscriber_gets_schema_then_frames():
+    """Test binary clients get the schema before frames using new IDs."""
+    engine = BroadcastEngine()
+    binary, text = FakeWebSocket(), FakeWebSocket()
+    engine.subscribe(binary, None, "binary")
+    engine.add(text)
+
+    await engine.broadcast(metrics_message(cpu=1.0, memory=2.0))
+    await engine.broadcast(metrics_message(cpu=3.0, memory=2.0))
+    await engine.broadcast(metrics_message(cpu=3.0, memory=2.0, swap=4.0))
+
+    schema, full, delta, schema_again, last = binary.sent
+    assert json.loads(schema) == {"type": "schema", "metrics": ["cpu", "memory"]}
+    assert decode_binary(full, ["cpu", "memory"])["data"] == {"cpu": 1.0, "memory": 2.0}
+    assert decode_binary(delta, ["cpu", "memory"]) == {
+        "type": "metrics", "timestamp": None, "delta": True, "data": {"cpu": 3.0},
+    }
+    names = json.loads(schema_again)["metrics"]
+    assert decode_binary(last, names)["data"] == {"swap": 4.0}
+    assert [json.loads(frame)["delta"] for frame in text.sent] == [False, True, True]
+
+
+def test_unknown_encoding_rejected():
+    """Test only known encodings can be subscribed to."""
+    with pytest.raises(ValueError):
+        BroadcastEngine().subscribe(FakeWebSocket(), None, "msgpack")
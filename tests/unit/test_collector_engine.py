@@ -0,0 +1,138 @@
+"""Unit tests for the asynchronous collector engine."""
+import asyncio
+import time
+
+import pytest
+
+from dashboard.collector_engine import CollectorEngine, Source
+
+
+def slow_probe(value, delay=0.2):
+    """Build a blocking probe that sleeps before returning ``value``."""
+
+    def probe():
+        time.sleep(delay)
+        return value
+
+    return probe
+
+
+@pytest.mark.asyncio
+async def test_sources_sampled_concurrently():
+    """Test blocking probes run in parallel without blocking the loop."""
+    engine = CollectorEngine([Source("a", slow_probe(1)), Source("b", slow_probe(2))])
+
+    started = time.perf_counter()
+    readings = await engine.collect()
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.35
+    assert readings["a"].value == 1
+    assert readings["b"].value == 2
+    assert engine.version == 2
+
+
+@pytest.mark.asyncio
+async def test_failing_probe_keeps_previous_reading():
+    """Test a failing probe is logged and does not affect other sources."""
+    calls = []
+
+    def flaky():
+        calls.append(None)
+        if len(calls) > 1:
+            raise RuntimeError("probe failed")
+        return "first"
+
+    engine = CollectorEngine([Source("flaky", flaky), Source("ok", lambda: "ok")])
+    await engine.collect()
+    readings = await engine.collect()
+
+    assert readings["flaky"].value == "first"
+    assert readings["ok"].value == "ok"
+
+
+def test_sources_follow_their_own_interval():
+    """Test each source is sampled on its own interval in the engine thread."""
+    counts = {"fast": 0, "slow": 0}
+
+    def counter(name):
+        def probe():
+            counts[name] += 1
+            return counts[name]
+
+        return probe
+
+    engine = CollectorEngine([
+        Source("fast", counter("fast"), interval=0.01),
+        Source("slow", counter("slow"), interval=60.0),
+    ])
+    engine.start()
+    try:
+        assert engine.is_running
+        assert engine.value("slow") == 1  # initial round published before start returns
+        time.sleep(0.2)
+    finally:
+        engine.stop(timeout=2)
+
+    assert not engine.is_running
+    assert counts["fast"] > 3
+    assert counts["slow"] == 1
+
+
+def test_readings_are_replaced_not_mutated():
+    """Test published readings mappings are never mutated."""
+    engine = CollectorEngine([Source("a", lambda: 1)])
+    first = engine.collect_now()
+    second = engine.collect_now()
+
+    assert first is not second
+    assert first["a"].timestamp <= second["a"].timestamp
+
+
+@pytest.mark.asyncio
+async def test_run_in_callers_loop():
+    """Test the engine can run inside an existing event loop."""
+    engine = CollectorEngine([Source("a", lambda: "x", interval=0.01)])
+    task = asyncio.create_task(engine.run())
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert engine.value("a") == "x"
+
+
+@pytest.mark.asyncio
+async def test_collect_now_refuses_running_loop():
+    """Test sampling synchronously from inside an event loop fails instead of blocking it."""
+    engine = CollectorEngine([Source("a", lambda: 1)])
+
+    with pytest.raises(RuntimeError):
+        engine.collect_now()
+    await engine.collect()
+
+    assert engine.value("a") == 1
+
+
+def test_src_collector_reads_injected_engine():
+    """Test the src collector reads the engine it was given instead of importing one."""
+    from src.metrics.collector import MetricsCollector
+
+    memory = type("Memory", (), {"percent": 40.0})()
+    disk = type("Disk", (), {"percent": 55.0})()
+    network = type(
+        "Network", (), {"bytes_sent": 1, "bytes_recv": 2, "packets_sent": 3, "packets_recv": 4},
+    )()
+    engine = CollectorEngine([
+        Source("cpu", lambda: 12.5),
+        Source("memory", lambda: memory),
+        Source("disk", lambda: disk),
+        Source("network", lambda: network),
+    ])
+    engine.collect_now()
+
+    metrics = MetricsCollector(engine).collect_system_metrics()
+
+    usage = (metrics["cpu_usage"], metrics["memory_usage"], metrics["disk_usage"])
+    assert usage == (12.5, 40.0, 55.0)
+    assert metrics["network"]["packets_recv"] == 4
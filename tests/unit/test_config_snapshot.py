@@ -0,0 +1,171 @@
+"""Unit tests for versioned configuration snapshots and hot reload."""
+import json
+import threading
+import time
+
+import pytest
+
+from dashboard.config.config import ConfigManager
+from dashboard.config.snapshot import ConfigSnapshot, ConfigWatcher
+
+CONFIG = {
+    "metrics": {
+        "collection_interval": 60,
+        "enabled_metrics": ["cpu", "memory", "disk"],
+        "thresholds": {"cpu": 80, "memory": 90, "disk": 85},
+    },
+    "websocket": {"host": "localhost", "port": 8765},
+    "database": {"host": "localhost", "port": 5432, "name": "dashboard"},
+    "logging": {"level": "INFO", "file": "dashboard.log"},
+}
+
+
+@pytest.fixture()
+def config_path(tmp_path):
+    """Valid configuration file."""
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(CONFIG))
+    return path
+
+
+@pytest.fixture()
+def manager(config_path):
+    """Manager for the configuration file."""
+    manager = ConfigManager(str(config_path))
+    yield manager
+    manager.stop_watching()
+
+
+def edit(path, **metrics):
+    """Rewrite the file with changed metrics settings."""
+    config = json.loads(path.read_text())
+    config["metrics"].update(metrics)
+    path.write_text(json.dumps(config))
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait until ``condition()`` holds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_snapshot_views_and_defaults():
+    """Test views are resolved with defaults when the snapshot is built."""
+    snapshot = ConfigSnapshot.from_config(
+        {"metrics": {"collection_interval": 5}, "environment": "production"},
+    )
+
+    assert snapshot.collection_interval == 5.0
+    assert snapshot.metric_thresholds == {"cpu": 80.0, "memory": 90.0, "disk": 85.0}
+    assert snapshot.websocket["port"] == 8765
+    assert snapshot.production
+
+
+def test_snapshot_is_isolated_from_source():
+    """Test later changes to the source dict do not leak into a snapshot."""
+    config = json.loads(json.dumps(CONFIG))
+    snapshot = ConfigSnapshot.from_config(config)
+    config["metrics"]["thresholds"]["cpu"] = 1
+
+    assert snapshot.metric_thresholds["cpu"] == 80
+
+
+def test_snapshot_data_is_read_only(manager):
+    """Test snapshot data cannot be changed in place and config hands out a copy."""
+    snapshot = manager.snapshot()
+
+    with pytest.raises(TypeError):
+        snapshot.data["metrics"]["thresholds"]["cpu"] = 1
+    with pytest.raises(TypeError):
+        manager.get_config()["websocket"] = {}
+    config = manager.config
+    config["metrics"]["thresholds"]["cpu"] = 1
+    config["metrics"]["enabled_metrics"].append("network")
+
+    assert snapshot.metric_thresholds["cpu"] == 80
+    assert snapshot.data["metrics"]["enabled_metrics"] == ("cpu", "memory", "disk")
+    assert json.loads(json.dumps(manager.config)) == manager.config
+
+
+def test_subscriber_rebuilds_alert_index(manager):
+    """Test an alert evaluator subscribed to the manager follows rule changes."""
+    from src.monitor.alerts import AlertEvaluator, AlertRule
+
+    evaluator = AlertEvaluator.from_config(manager.get_config())
+    manager.subscribe(lambda snapshot: evaluator.reconfigure(snapshot.data))
+
+    assert manager.update_alert_rules([{"metric": "cpu", "threshold": 50, "duration": 0}]).is_valid
+
+    assert evaluator.rules == [AlertRule("cpu", 50.0, 0.0)]
+    assert evaluator.observe(0, "cpu", 60.0)[0].status == "firing"
+
+
+def test_update_publishes_new_version(manager):
+    """Test an update swaps in the next version and notifies subscribers."""
+    seen = []
+    manager.subscribe(seen.append)
+    first = manager.snapshot()
+
+    thresholds = {"cpu": 50, "memory": 90, "disk": 85}
+    assert manager.update_config({"metrics": {"thresholds": thresholds}}).is_valid
+
+    assert first.metric_thresholds["cpu"] == 80
+    assert manager.snapshot().version == first.version + 1
+    assert [snapshot.metric_thresholds["cpu"] for snapshot in seen] == [50]
+    assert manager.reload() is False
+
+
+def test_invalid_update_rejected(manager):
+    """Test a change failing validation leaves the snapshot alone."""
+    version = manager.snapshot().version
+
+    assert not manager.update_config({"websocket": {"port": 0}}).is_valid
+    assert manager.snapshot().version == version
+
+
+def test_reload_keeps_snapshot_on_bad_edit(manager, config_path):
+    """Test broken or invalid edits are not swapped in."""
+    version = manager.snapshot().version
+    config_path.write_text("{not json")
+    assert manager.reload() is False
+
+    config_path.write_text(json.dumps(CONFIG))
+    edit(config_path, collection_interval="often")
+    assert manager.reload() is False
+    assert manager.snapshot().version == version
+
+    edit(config_path, collection_interval=10)
+    assert manager.reload() is True
+    assert manager.snapshot().collection_interval == 10.0
+
+
+def test_watch_picks_up_edit(manager, config_path):
+    """Test an edit to the file is published without any call."""
+    changed = threading.Event()
+    manager.subscribe(lambda snapshot: changed.set())
+    manager.watch(poll_interval=0.05)
+
+    edit(config_path, collection_interval=15)
+
+    assert changed.wait(5)
+    assert manager.snapshot().collection_interval == 15.0
+
+
+def test_watcher_polling_fallback(config_path, monkeypatch):
+    """Test changes are still seen by polling when inotify is unavailable."""
+
+    def unavailable(directory):
+        raise OSError("no inotify")
+
+    monkeypatch.setattr("dashboard.config.snapshot._Inotify", unavailable)
+    calls = []
+    watcher = ConfigWatcher(str(config_path), lambda: calls.append(1), poll_interval=0.02)
+    watcher.start()
+    try:
+        assert not watcher.uses_inotify
+        edit(config_path, collection_interval=20)
+        wait_for(lambda: calls)
+    finally:
+        watcher.stop()
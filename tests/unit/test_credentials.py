@@ -0,0 +1,229 @@
+"""Unit tests for password hashing, credential stores and login rate limiting."""
+import asyncio
+import hashlib
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from dashboard.auth import credentials
+from dashboard.auth.credentials import (
+    ChainCredentialStore,
+    CredentialManager,
+    CredentialStore,
+    EnvironmentCredentialStore,
+    LoginRateLimiter,
+    SQLCredentialStore,
+    check_password,
+    hash_password,
+    needs_rehash,
+)
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashing(monkeypatch):
+    """Keep the hash parameters small so tests run quickly."""
+    monkeypatch.setattr(credentials, "SCRYPT_N", 2**10)
+    monkeypatch.setattr(credentials, "PBKDF2_ITERATIONS", 1000)
+
+
+@pytest.fixture
+def engine():
+    """In-memory database with the users table."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool,
+    )
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(64) NOT NULL UNIQUE,"
+                " password_hash VARCHAR(128) NOT NULL, created_at DATETIME NOT NULL)",
+            ),
+        )
+    return engine
+
+
+class MemoryStore(CredentialStore):
+    """Credential store in a dictionary."""
+
+    def __init__(self, **hashes):
+        self.hashes = hashes
+
+    def get_password_hash(self, username):
+        return self.hashes.get(username)
+
+    def set_password_hash(self, username, password_hash):
+        self.hashes[username] = password_hash
+
+
+@pytest.mark.parametrize("algorithm", ["scrypt", "pbkdf2_sha256"])
+def test_hash_round_trip(algorithm):
+    """Test hashes verify the right password only and fit the users table."""
+    encoded = hash_password("s3cret", algorithm)
+
+    assert check_password("s3cret", encoded)
+    assert not check_password("wrong", encoded)
+    assert len(encoded) <= 128
+    assert encoded != hash_password("s3cret", algorithm)
+
+
+def test_legacy_hash_accepted_and_flagged(monkeypatch):
+    """Test old salted SHA-256 hashes still verify but need rehashing."""
+    monkeypatch.setenv("AUTH_SALT", "pepper")
+    legacy = hashlib.sha256(b"adminpepper").hexdigest()
+
+    assert check_password("admin", legacy)
+    assert not check_password("other", legacy)
+    assert needs_rehash(legacy)
+    assert needs_rehash(hash_password("admin", "pbkdf2_sha256"))
+    assert not needs_rehash(hash_password("admin"))
+
+
+def test_unreadable_hash_rejected():
+    """Test malformed hashes fail instead of raising."""
+    assert not check_password("x", "scrypt$1$2")
+    assert not check_password("x", "bcrypt$whatever")
+
+
+def test_sql_store(engine):
+    """Test the users table store creates, reads and updates users."""
+    store = SQLCredentialStore(engine)
+    assert store.get_password_hash("alice") is None
+
+    store.set_password_hash("alice", "first")
+    store.set_password_hash("alice", "second")
+
+    assert store.get_password_hash("alice") == "second"
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT COUNT(*) FROM users")).scalar() == 1
+
+
+def test_sql_store_reads_through_reader(engine):
+    """Test lookups use the reader engine and writes the writer."""
+    reader = MagicMock(wraps=engine)
+    store = SQLCredentialStore(engine, reader=reader)
+
+    store.set_password_hash("alice", "hash")
+
+    assert store.get_password_hash("alice") == "hash"
+    reader.connect.assert_called_once()
+    reader.begin.assert_not_called()
+
+
+def test_sql_store_without_table():
+    """Test a database without the users table knows no users."""
+    store = SQLCredentialStore(create_engine("sqlite://"))
+
+    assert store.get_password_hash("alice") is None
+
+
+def test_legacy_admin_moves_into_table(engine, monkeypatch):
+    """Test the environment admin logs in and gets a scrypt hash in the table."""
+    monkeypatch.setenv("ADMIN_USER", "admin")
+    monkeypatch.setenv("ADMIN_PASS", hashlib.sha256(b"adminsalt").hexdigest())
+    monkeypatch.setenv("AUTH_SALT", "salt")
+    table = SQLCredentialStore(engine)
+    manager = CredentialManager(ChainCredentialStore(table, EnvironmentCredentialStore()))
+
+    assert manager.authenticate("admin", "admin")
+    assert table.get_password_hash("admin").startswith("scrypt$")
+    assert manager.authenticate("admin", "admin")
+    assert not manager.authenticate("admin", "nope")
+    manager.shutdown()
+
+
+def test_unknown_user_rejected():
+    """Test unknown users are rejected after a full-cost check."""
+    manager = CredentialManager(MemoryStore())
+
+    with patch.object(credentials, "check_password", wraps=check_password) as check:
+        assert not manager.authenticate("ghost", "anything")
+
+    assert check.call_count == 1
+    manager.shutdown()
+
+
+def test_failed_attempts_rate_limited():
+    """Test a user out of attempts is refused without hashing."""
+    store = MemoryStore(alice=hash_password("right"))
+    manager = CredentialManager(store, limiter=LoginRateLimiter(3, 60))
+
+    with patch.object(credentials, "check_password", wraps=check_password) as check:
+        results = [manager.authenticate("alice", "wrong") for _ in range(10)]
+        started = time.perf_counter()
+        assert not manager.authenticate("alice", "right")
+        refused_in = time.perf_counter() - started
+
+    assert results == [False] * 10
+    assert check.call_count == 3
+    assert manager.rejected == 8
+    assert refused_in < 0.005
+    manager.shutdown()
+
+
+def test_successful_login_refunds_attempt():
+    """Test successful logins do not use up the bucket."""
+    store = MemoryStore(alice=hash_password("right"))
+    manager = CredentialManager(store, limiter=LoginRateLimiter(2, 60))
+
+    assert all(manager.authenticate("alice", "right") for _ in range(5))
+    manager.shutdown()
+
+
+def test_bucket_refills():
+    """Test attempts come back over time, per user."""
+    limiter = LoginRateLimiter(capacity=2, refill_seconds=10)
+    now = 1000.0
+    with patch.object(credentials.time, "monotonic", side_effect=lambda: now):
+        assert limiter.acquire("alice")
+        assert limiter.acquire("alice")
+        assert not limiter.acquire("alice")
+        assert limiter.acquire("bob")
+        now += 10
+        assert limiter.acquire("alice")
+        assert not limiter.acquire("alice")
+
+
+def test_limiter_bounded():
+    """Test refilled buckets are dropped when too many users are tracked."""
+    limiter = LoginRateLimiter(capacity=1, refill_seconds=0.001, max_tracked=10)
+    for index in range(100):
+        limiter.acquire(f"user{index}")
+
+    assert len(limiter._buckets) <= 10
+
+
+def test_full_pool_refuses_attempts():
+    """Test attempts beyond the pending limit fail at once."""
+    release = threading.Event()
+
+    class SlowStore(MemoryStore):
+        def get_password_hash(self, username):
+            release.wait()
+            return super().get_password_hash(username)
+
+    manager = CredentialManager(SlowStore(alice=hash_password("right")), workers=1, max_pending=1)
+    first = manager.submit_check("alice", "right")
+
+    assert manager.submit_check("alice", "right") is None
+    release.set()
+    assert first.result()
+    assert manager.authenticate("alice", "right")
+    manager.shutdown()
+
+
+def test_authenticate_async():
+    """Test the event loop awaits the check instead of blocking on it."""
+    manager = CredentialManager(MemoryStore(alice=hash_password("right")))
+
+    async def login():
+        return await asyncio.gather(
+            manager.authenticate_async("alice", "right"),
+            manager.authenticate_async("alice", "wrong"),
+        )
+
+    assert asyncio.run(login()) == [True, False]
+    manager.shutdown()
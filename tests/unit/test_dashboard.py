@@ -4,11 +4,19 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from dashboard.timeseries import SeriesStore
+
 
 @pytest.fixture()
 def mock_session_state():
     """Create mock session state."""
-    return {"metrics_history": [], "last_update": None}
+    return {"last_update": None}
+
+
+@pytest.fixture()
+def store():
+    """Create an empty history store."""
+    return SeriesStore(["cpu", "memory", "disk"], capacity=10)
 
 
 @pytest.fixture()
@@ -21,34 +29,39 @@ def mock_metrics():
     }
 
 
-def test_update_metrics(mock_metrics, mock_session_state):
+def test_update_metrics(mock_metrics, mock_session_state, store):
     """Test metrics update functionality."""
     from dashboard.main import update_metrics
 
-    # Mock MetricsCollector
-    with patch("dashboard.main.MetricsCollector") as MockCollector:
-        # Configure mock
-        mock_collector = MagicMock()
-        mock_collector.get_metrics.return_value = mock_metrics
-        MockCollector.return_value = mock_collector
-
+    # Mock the shared sampler
+    with patch("dashboard.main.get_latest_metrics", return_value=mock_metrics) as mock_latest:
         # Test update
-        result = update_metrics(mock_session_state)
+        result = update_metrics(mock_session_state, store=store)
 
         # Verify results
-        assert len(mock_session_state["metrics_history"]) == 1
-        assert mock_session_state["metrics_history"][0] == mock_metrics
+        assert len(store) == 1
+        assert store.latest() == {"cpu": 50.0, "memory": 60.0, "disk": 70.0}
+        assert mock_session_state["last_update"] is not None
         assert result == mock_metrics
-        MockCollector.assert_called_once()
-        mock_collector.get_metrics.assert_called_once()
+        mock_latest.assert_called_once()
+
 
+def test_update_metrics_skips_duplicate_snapshots(mock_metrics, mock_session_state, store):
+    """Test sessions rerunning on the same snapshot append it only once."""
+    from dashboard.main import update_metrics
 
-def test_display_metrics(mock_metrics, mock_session_state):
+    update_metrics(mock_session_state, mock_metrics, store=store)
+    update_metrics({}, mock_metrics, store=store)
+
+    assert len(store) == 1
+
+
+def test_display_metrics(mock_metrics, mock_session_state, store):
     """Test metrics display functionality."""
-    from dashboard.main import display_metrics
+    from dashboard.main import display_metrics, update_metrics
 
-    # Setup mock state
-    mock_session_state["metrics_history"] = [mock_metrics]
+    # Setup history
+    update_metrics(mock_session_state, mock_metrics, store=store)
 
     # Setup streamlit mocks
     with patch("dashboard.main.st") as mock_st:
@@ -64,7 +77,7 @@ def test_display_metrics(mock_metrics, mock_session_state):
 
         # Test display
         metrics_to_show = ["CPU Usage", "Memory Usage"]
-        display_metrics(mock_session_state, metrics_to_show)
+        display_metrics(mock_session_state, metrics_to_show, store=store)
 
         # Verify streamlit calls
         mock_st.columns.assert_called_once_with(2)
@@ -74,29 +87,26 @@ def test_display_metrics(mock_metrics, mock_session_state):
         mock_st.metric.assert_any_call("Memory Usage", "60.0%", delta=None)
 
 
-def test_empty_metrics(mock_session_state):
+def test_empty_metrics(mock_session_state, store):
     """Test handling of empty metrics."""
     from dashboard.main import display_metrics
 
-    # Setup empty state
-    mock_session_state["metrics_history"] = []
-
     # Setup streamlit mock
     with patch("dashboard.main.st") as mock_st:
         # Test display with empty metrics
         metrics_to_show = ["CPU Usage", "Memory Usage"]
-        display_metrics(mock_session_state, metrics_to_show)
+        display_metrics(mock_session_state, metrics_to_show, store=store)
 
         # Verify warning displayed
         mock_st.warning.assert_called_once_with("No metrics data available")
 
 
-def test_invalid_metric_name(mock_metrics, mock_session_state):
+def test_invalid_metric_name(mock_metrics, mock_session_state, store):
     """Test handling of invalid metric names."""
-    from dashboard.main import display_metrics
+    from dashboard.main import display_metrics, update_metrics
 
-    # Setup state with data
-    mock_session_state["metrics_history"] = [mock_metrics]
+    # Setup history
+    update_metrics(mock_session_state, mock_metrics, store=store)
 
     # Setup streamlit mock
     with patch("dashboard.main.st") as mock_st:
@@ -112,7 +122,7 @@ def test_invalid_metric_name(mock_metrics, mock_session_state):
 
         # Test display with invalid metric
         metrics_to_show = ["Invalid Metric"]
-        display_metrics(mock_session_state, metrics_to_show)
+        display_metrics(mock_session_state, metrics_to_show, store=store)
 
         # Verify no metrics displayed
         mock_st.metric.assert_not_called()
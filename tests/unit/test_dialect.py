@@ -68,3 +68,9 @@ def test_dialect_specific_formatting():
     sqlite_dialect = Dialect("sqlite")
     sqlite_dialect.schema = "main"
     assert sqlite_dialect.format_table_name("users") == '"main"."users"'
+
+
+def test_placeholder():
+    """Test parameter placeholders follow the driver paramstyle."""
+    assert Dialect("postgresql").placeholder == "%s"
+    assert Dialect("sqlite").placeholder == "?"
@@ -0,0 +1,188 @@
+"""Unit tests for Prometheus exposition from the shared snapshot."""
+import threading
+from collections import namedtuple
+
+import pytest
+from prometheus_client import CollectorRegistry, Histogram
+
+from dashboard.exposition import (
+    CONTENT_TYPE_PROTOBUF,
+    ExpositionCache,
+    SnapshotCollector,
+    choose_format,
+    generate_protobuf,
+    make_wsgi_app,
+    openmetrics_schema,
+)
+from dashboard.metrics import ProcessSample
+
+om = openmetrics_schema()
+
+Memory = namedtuple("Memory", "percent used available")
+Usage = namedtuple("Usage", "percent used total")
+Network = namedtuple("Network", "bytes_sent bytes_recv")
+
+
+class FakeEngine:
+    """Engine stand-in serving fixed readings and counting lookups."""
+
+    def __init__(self, readings):
+        self.readings = readings
+        self.lookups = 0
+
+    def value(self, name, default=None):
+        self.lookups += 1
+        return self.readings.get(name, default)
+
+
+@pytest.fixture
+def engine():
+    """Engine with one reading of every source the collector exports."""
+    return FakeEngine(
+        {
+            "cpu": 12.5,
+            "memory": Memory(40.0, 4096, 6144),
+            "disks": {
+                "/": ("/dev/sda1", Usage(50.0, 100, 200)),
+                "/home": ("/dev/sdb1", Usage(25.0, 50, 200)),
+            },
+            "network": Network(1000, 2000),
+            "processes": tuple(
+                ProcessSample(pid, f"proc{pid}", float(pid), 1.0) for pid in range(1, 6)
+            ),
+        },
+    )
+
+
+@pytest.fixture
+def registry(engine):
+    """Registry holding a snapshot collector over the fake engine."""
+    registry = CollectorRegistry()
+    registry.register(SnapshotCollector(engine, max_processes=3))
+    return registry
+
+
+def test_collector_labels_disks_and_processes(registry):
+    """Test disks and the heaviest processes are exported as labelled series."""
+    assert registry.get_sample_value("system_cpu_usage_percent") == 12.5
+    assert registry.get_sample_value("system_memory_used_bytes") == 4096
+    assert registry.get_sample_value(
+        "system_disk_usage_percent", {"mountpoint": "/home", "device": "/dev/sdb1"},
+    ) == 25.0
+    assert registry.get_sample_value("system_network_sent_bytes_total") == 1000
+
+    pids = {
+        sample.labels["pid"]
+        for family in registry.collect()
+        if family.name == "process_cpu_usage_percent"
+        for sample in family.samples
+    }
+    assert pids == {"3", "4", "5"}
+    labels = {"pid": "5", "name": "proc5"}
+    assert registry.get_sample_value("process_cpu_usage_percent", labels) == 5.0
+
+
+def test_collector_skips_missing_readings():
+    """Test sources without a reading yet are left out."""
+    registry = CollectorRegistry()
+    registry.register(SnapshotCollector(FakeEngine({"cpu": 1.0})))
+
+    assert [family.name for family in registry.collect()] == ["system_cpu_usage_percent"]
+
+
+def test_cache_encodes_once_per_ttl(registry, engine):
+    """Test concurrent scrapes within the TTL share one encode."""
+    cache = ExpositionCache(registry, ttl=60)
+    barrier = threading.Barrier(8)
+    bodies = []
+
+    def scrape():
+        barrier.wait()
+        bodies.append(cache.get("text")[0])
+
+    threads = [threading.Thread(target=scrape) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert cache.encodes == 1
+    assert len(set(bodies)) == 1
+    assert b"system_cpu_usage_percent 12.5" in bodies[0]
+
+    lookups = engine.lookups
+    cache.get("openmetrics")
+    assert cache.encodes == 2
+    assert engine.lookups > lookups
+
+
+def test_cache_reencodes_after_ttl(registry):
+    """Test an expired entry is encoded again."""
+    cache = ExpositionCache(registry, ttl=0)
+    cache.get()
+    cache.get()
+
+    assert cache.encodes == 2
+
+
+def test_protobuf_round_trip(registry):
+    """Test the protobuf exposition parses back into the same values."""
+    histogram = Histogram("scrape_seconds", "Scrape time", buckets=(0.1, 1.0), registry=registry)
+    histogram.observe(0.5)
+
+    metric_set = om.MetricSet.FromString(generate_protobuf(registry))
+    families = {family.name: family for family in metric_set.metric_families}
+
+    cpu = families["system_cpu_usage_percent"]
+    assert cpu.type == om.GAUGE
+    assert cpu.metrics[0].metric_points[0].gauge_value.double_value == 12.5
+
+    sent = families["system_network_sent_bytes"]
+    assert sent.type == om.COUNTER
+    assert sent.metrics[0].metric_points[0].counter_value.double_value == 1000
+
+    disks = families["system_disk_total_bytes"]
+    labels = [{label.name: label.value for label in metric.labels} for metric in disks.metrics]
+    assert {"mountpoint": "/", "device": "/dev/sda1"} in labels
+
+    point = families["scrape_seconds"].metrics[0].metric_points[0].histogram_value
+    assert point.count == 1
+    assert point.double_value == 0.5
+    assert [(bucket.upper_bound, bucket.count) for bucket in point.buckets] == [
+        (0.1, 0), (1.0, 1), (float("inf"), 1),
+    ]
+    assert point.created.seconds > 0
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, "text"),
+        ("text/plain;version=0.0.4", "text"),
+        ("application/openmetrics-text;version=1.0.0,text/plain;q=0.5", "openmetrics"),
+        ("application/openmetrics-protobuf;version=1.0.0", "protobuf"),
+    ],
+)
+def test_choose_format(accept, expected):
+    """Test the exposition format follows the Accept header."""
+    assert choose_format(accept) == expected
+
+
+def test_wsgi_app_negotiates_protobuf(registry):
+    """Test the WSGI app answers protobuf scrapes with the protobuf body."""
+    cache = ExpositionCache(registry)
+    app = make_wsgi_app(cache)
+    responses = []
+
+    body = b"".join(
+        app(
+            {"HTTP_ACCEPT": "application/openmetrics-protobuf;version=1.0.0"},
+            lambda status, headers: responses.append((status, dict(headers))),
+        ),
+    )
+
+    status, headers = responses[0]
+    assert status == "200 OK"
+    assert headers["Content-Type"] == CONTENT_TYPE_PROTOBUF
+    assert int(headers["Content-Length"]) == len(body)
+    assert om.MetricSet.FromString(body).metric_families
@@ -1,4 +1,6 @@
 """Test metrics collection functionality."""
+import pytest
+
 from dashboard.metrics import MetricsCollector, collect_metrics
 
 
@@ -109,3 +111,173 @@ def test_metrics_collector_initialization():
     custom_config = {"interval": 5}
     collector = MetricsCollector(custom_config)
     assert collector.config == custom_config
+
+
+def test_sampler_snapshot_does_not_block():
+    """Test sampler publishes snapshots without blocking CPU sampling."""
+    from dashboard.metrics import MetricsSampler
+
+    with patch("psutil.cpu_percent", return_value=50.0) as mock_cpu, patch(
+        "psutil.virtual_memory",
+        return_value=type("obj", (object,), {"percent": 75.0})(),
+    ), patch("psutil.disk_usage", return_value=type("obj", (object,), {"percent": 80.0})()), patch(
+        "psutil.process_iter",
+        return_value=[],
+    ):
+        sampler = MetricsSampler(interval=0.01)
+        sampler.start()
+        try:
+            assert sampler.is_running
+            snapshot = sampler.get_snapshot()
+        finally:
+            sampler.stop()
+
+    assert not sampler.is_running
+    assert snapshot["system"] == {"cpu": 50.0, "memory": 75.0, "disk": 80.0}
+    assert snapshot["processes"] == []
+    assert snapshot["timestamp"]
+    assert all(call.kwargs == {"interval": None} for call in mock_cpu.call_args_list)
+
+
+def test_sampler_snapshots_are_immutable():
+    """Test published snapshots are not mutated by later samples."""
+    from dashboard.metrics import MetricsSampler
+
+    sampler = MetricsSampler()
+    with patch("psutil.cpu_percent", return_value=10.0), patch(
+        "psutil.virtual_memory",
+        return_value=type("obj", (object,), {"percent": 75.0})(),
+    ), patch("psutil.disk_usage", return_value=type("obj", (object,), {"percent": 80.0})()), patch(
+        "psutil.process_iter",
+        return_value=[],
+    ):
+        first = sampler.sample()
+        with patch("psutil.cpu_percent", return_value=90.0):
+            second = sampler.sample()
+
+    assert first["system"]["cpu"] == 10.0
+    assert second["system"]["cpu"] == 90.0
+    assert sampler.get_snapshot() is second
+
+
+def test_metrics_route_reads_shared_sampler():
+    """Test /metrics serves the shared snapshot instead of re-sampling."""
+    from dashboard import create_app
+    from dashboard.metrics import stop_sampler
+
+    snapshot = {
+        "system": {"cpu": 1.0, "memory": 2.0, "disk": 3.0},
+        "processes": [],
+        "timestamp": "t",
+    }
+    app = create_app({"TESTING": True})
+    with patch("dashboard.routes.get_latest_metrics", return_value=snapshot) as mock_latest:
+        response = app.test_client().get("/metrics")
+    stop_sampler()
+
+    assert response.status_code == 200
+    assert response.get_json() == {"status": "success", "data": snapshot}
+    mock_latest.assert_called_once_with(1.0)
+
+
+class FakeProcess:
+    """Minimal psutil.Process double for the process tracker."""
+
+    def __init__(self, pid, name, cpu, memory, create_time=1.0):
+        self.info = {"pid": pid, "name": name, "create_time": create_time}
+        self.cpu = cpu
+        self.memory = memory
+        self._create_time = create_time
+        self.cpu_calls = 0
+
+    def create_time(self):
+        return self._create_time
+
+    def oneshot(self):
+        from contextlib import nullcontext
+
+        return nullcontext()
+
+    def cpu_percent(self, interval=None):
+        self.cpu_calls += 1
+        return self.cpu
+
+    def memory_percent(self):
+        return self.memory
+
+
+def test_process_tracker_reuses_process_objects():
+    """Test tracked processes keep their psutil object across ticks."""
+    from dashboard.metrics import ProcessTracker
+
+    tracker = ProcessTracker()
+    original = FakeProcess(1, "a", 5.0, 1.0)
+    with patch("psutil.process_iter", return_value=[original]):
+        tracker.sample()
+    with patch("psutil.process_iter", return_value=[FakeProcess(1, "a", 7.0, 1.0)]):
+        samples = tracker.sample()
+
+    assert original.cpu_calls == 2
+    assert samples[0].cpu_percent == 5.0
+
+    # A recycled PID has a new create time and gets a fresh object
+    recycled = FakeProcess(1, "b", 9.0, 1.0, create_time=2.0)
+    with patch("psutil.process_iter", return_value=[recycled]):
+        samples = tracker.sample()
+    assert samples[0].cpu_percent == 9.0
+
+    with patch("psutil.process_iter", return_value=[]):
+        assert tracker.sample() == ()
+    assert tracker._processes == {}
+
+
+def test_top_processes_sort_keys():
+    """Test ranking processes by CPU and by memory."""
+    from dashboard.metrics import ProcessSample, top_processes
+
+    samples = (
+        ProcessSample(1, "cpu-heavy", 90.0, 1.0),
+        ProcessSample(2, "mem-heavy", 1.0, 90.0),
+        ProcessSample(3, "idle", 0.0, 0.5),
+    )
+
+    assert [p["pid"] for p in top_processes(samples, 2, "cpu")] == [1, 2]
+    assert [p["pid"] for p in top_processes(samples, 1, "memory")] == [2]
+    with pytest.raises(ValueError):
+        top_processes(samples, 1, "disk")
+
+
+def test_metrics_route_top_processes():
+    """Test /metrics ranks processes from the top and sort query parameters."""
+    from dashboard import create_app
+
+    snapshot = {"system": {}, "processes": [], "timestamp": "t"}
+    top = [{"pid": 2, "name": "mem-heavy", "cpu_percent": 1.0, "memory_percent": 90.0}]
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+    with patch("dashboard.routes.get_latest_metrics", return_value=snapshot), patch(
+        "dashboard.routes.get_top_processes",
+        return_value=top,
+    ) as mock_top:
+        response = client.get("/metrics?top=5&sort=memory")
+        bad_top = client.get("/metrics?top=abc")
+        bad_sort = client.get("/metrics?sort=disk")
+
+    assert response.status_code == 200
+    assert response.get_json()["data"]["processes"] == top
+    mock_top.assert_called_once_with(5, "memory", 1.0)
+    assert bad_top.status_code == 400
+    assert bad_sort.status_code == 400
+
+
+def test_sampler_empty_before_first_round():
+    """Test a sampler whose engine has not sampled yet serves an empty snapshot without sampling."""
+    from dashboard.metrics import MetricsSampler
+
+    sampler = MetricsSampler()
+    with patch.object(sampler.engine, "collect_now") as collect_now:
+        snapshot = sampler.get_snapshot()
+
+    collect_now.assert_not_called()
+    assert snapshot["system"] == {"cpu": 0.0, "memory": 0.0, "disk": 0.0}
+    assert snapshot["processes"] == []
@@ -60,15 +60,11 @@ def mock_psutil():
 @pytest.fixture()
 def mock_prometheus():
     """Mock Prometheus server fixture."""
-    with patch("dashboard.core_scripts.metrics_collector.start_http_server") as server_mock:
+    with patch("dashboard.core_scripts.metrics_collector.start_exposition_server") as server_mock:
         with patch("dashboard.core_scripts.metrics_collector.CollectorRegistry") as registry_mock:
-            with patch("dashboard.core_scripts.metrics_collector.Histogram") as histogram_mock:
-                registry_mock.return_value = CollectorRegistry()
-                server_mock.return_value = None
-                histogram_instance = MagicMock()
-                histogram_instance.observe = MagicMock()
-                histogram_mock.return_value = histogram_instance
-                yield server_mock
+            registry_mock.side_effect = CollectorRegistry
+            server_mock.return_value = (MagicMock(), MagicMock())
+            yield server_mock
 
 
 @pytest.fixture()
@@ -102,12 +98,16 @@ def test_collect_project_metrics(collector):
     assert isinstance(datetime.fromisoformat(metrics["timestamp"]), datetime)
 
 
-def test_record_response_time(collector):
+def test_record_response_time(mock_config, mock_prometheus):
     """Test response time recording."""
+    from dashboard.request_timing import RequestTimer
+
+    collector = MetricsCollector(port=8000, request_timer=RequestTimer())
     # Should not raise any exceptions
     collector.record_response_time(0.5)
-    # Verify observe was called
-    collector.response_time.observe.assert_called_once_with(0.5)
+
+    assert collector.response_time is collector.request_timer
+    assert sum(collector.request_timer.totals()["other"][:-1]) == 1
 
 
 def test_cleanup_old_metrics(collector):
@@ -124,7 +124,7 @@ def test_cleanup_old_metrics(collector):
 
 def test_initialization_error():
     """Test initialization with server start failure."""
-    with patch("dashboard.core_scripts.metrics_collector.start_http_server") as mock:
+    with patch("dashboard.core_scripts.metrics_collector.start_exposition_server") as mock:
         mock.side_effect = Exception("Server start failed")
         with pytest.raises(Exception, match="Server start failed"):
             MetricsCollector(port=8000)
@@ -146,3 +146,69 @@ def test_logging_setup(mock_config, mock_prometheus):
     """Test logging setup."""
     collector = MetricsCollector(port=8000)
     assert collector.logger.level == 20  # INFO level
+
+
+def test_system_metrics_from_engine(mock_config, mock_prometheus):
+    """Test system metrics are read from a shared collector engine."""
+    from dashboard.collector_engine import CollectorEngine, Source
+
+    engine = CollectorEngine([
+        Source("cpu", lambda: 12.5),
+        Source("memory", lambda: Mock(percent=40.0)),
+        Source("disk", lambda: Mock(percent=55.0)),
+    ])
+    engine.collect_now()
+    collector = MetricsCollector(port=8000, engine=engine)
+
+    with patch("dashboard.core_scripts.metrics_collector.psutil") as mock_psutil:
+        metrics = collector.collect_system_metrics()
+
+    mock_psutil.cpu_percent.assert_not_called()
+    assert metrics["cpu_usage"] == 12.5
+    assert metrics["memory_usage"] == 40.0
+    assert metrics["disk_usage"] == 55.0
+
+
+def test_system_metrics_served_from_snapshot(mock_config, mock_prometheus):
+    """Test system gauges come from the snapshot collector served by the exposition server."""
+    from prometheus_client import generate_latest
+
+    from dashboard.collector_engine import CollectorEngine, Source
+
+    engine = CollectorEngine([Source("cpu", lambda: 12.5)])
+    engine.collect_now()
+    collector = MetricsCollector(port=8000, engine=engine)
+
+    text = generate_latest(collector.registry).decode()
+
+    assert mock_prometheus.call_args.kwargs["registry"] is collector.registry
+    assert "system_cpu_usage_percent 12.5" in text
+    assert "\ncpu_usage_percent" not in text
+
+
+def test_shares_request_timer_with_app(mock_config, mock_prometheus):
+    """Test the response time histogram is the timer the Flask app records into."""
+    from prometheus_client import generate_latest
+
+    from dashboard import create_app
+    from dashboard.exposition import get_shared_request_timer
+
+    app = create_app({"TESTING": True})
+    app.test_client().get("/health")
+    collector = MetricsCollector(port=8000)
+
+    assert collector.request_timer is app.extensions["request_timer"]
+    assert 'response_time_seconds_count{endpoint="dashboard.health_check"} 1.0' in (
+        generate_latest(collector.registry).decode()
+    )
+    assert get_shared_request_timer() is collector.request_timer
+
+
+def test_stop_is_idempotent(collector, mock_prometheus):
+    """Test stop shuts the server down once and is a no-op afterwards."""
+    server, _ = mock_prometheus.return_value
+
+    collector.stop()
+    collector.stop()
+
+    server.shutdown.assert_called_once_with()
@@ -0,0 +1,80 @@
+"""Unit tests for the segmented metrics log."""
+from src.monitor.metrics_log import INDEX_ENTRY, MetricsLog
+
+
+def test_append_and_read_range(tmp_path):
+    """Test records in range are streamed back in order."""
+    with MetricsLog(tmp_path, segment_seconds=100) as log:
+        for i in range(10):
+            log.append({"value": i}, timestamp=1000.0 + i)
+
+    records = list(log.read(1003.0, 1006.0))
+
+    assert [ts for ts, _ in records] == [1003.0, 1004.0, 1005.0, 1006.0]
+    assert [record["value"] for _, record in records] == [3, 4, 5, 6]
+
+
+def test_time_based_rotation(tmp_path):
+    """Test records are split into aligned segments by time."""
+    with MetricsLog(tmp_path, segment_seconds=100) as log:
+        for ts in (150.0, 199.0, 200.0, 350.0):
+            log.append({"ts": ts}, timestamp=ts)
+
+    assert log.segment_path(100).exists()
+    assert log.segment_path(200).exists()
+    assert log.segment_path(300).exists()
+    assert [ts for ts, _ in log.read(0.0, 1000.0)] == [150.0, 199.0, 200.0, 350.0]
+    assert [ts for ts, _ in log.read(199.0, 200.0)] == [199.0, 200.0]
+
+
+def test_sparse_index_seeks_to_start(tmp_path):
+    """Test the sparse index holds one entry per index_every records."""
+    with MetricsLog(tmp_path, segment_seconds=1000, index_every=4) as log:
+        for i in range(10):
+            log.append({"i": i}, timestamp=float(i))
+
+    index = log.index_path(0).read_bytes()
+    entries = list(INDEX_ENTRY.iter_unpack(index))
+
+    assert [ts for ts, _ in entries] == [0.0, 4.0, 8.0]
+    with open(log.segment_path(0), "rb") as f:
+        f.seek(entries[1][1])
+        assert f.readline().startswith(b"4.000000\t")
+    assert [r["i"] for _, r in log.read(5.0, 6.0)] == [5, 6]
+
+
+def test_fsync_batching(tmp_path, monkeypatch):
+    """Test fsync runs once per batch rather than per record."""
+    calls = []
+    monkeypatch.setattr("src.monitor.metrics_log.os.fsync", calls.append)
+    log = MetricsLog(tmp_path, fsync_every=5, fsync_interval=3600)
+    for i in range(12):
+        log.append({"i": i}, timestamp=float(i))
+
+    # Two full batches, each syncing the data and index files
+    assert len(calls) == 4
+    log.close()
+    assert len(calls) == 6
+
+
+def test_latest_and_partial_record(tmp_path):
+    """Test a torn trailing record is ignored and truncated on reopen."""
+    log = MetricsLog(tmp_path, segment_seconds=10**10)
+    log.append({"i": 1}, timestamp=1.0)
+    log.close()
+    with open(log.segment_path(0), "ab") as f:
+        f.write(b'2.000000\t{"i":')
+
+    assert [r["i"] for _, r in log.read(0.0, 10.0)] == [1]
+
+    log.append({"i": 3}, timestamp=3.0)
+    log.close()
+    assert [r["i"] for _, r in log.read(0.0, 10.0)] == [1, 3]
+    assert log.latest() == (3.0, {"i": 3})
+
+
+def test_read_missing_segments(tmp_path):
+    """Test reading a range with no segments yields nothing."""
+    log = MetricsLog(tmp_path)
+    assert list(log.read(0.0, 7200.0)) == []
+    assert log.latest() is None
@@ -1,5 +1,6 @@
 """Test module for system monitor."""
 import json
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -155,10 +156,7 @@ def test_collect_process_metrics(mock_process_iter, monitor):
     assert metrics["test_script"]["num_threads"] == 4
 
 
-@patch("builtins.open")
-@patch("json.dump")
-@patch("os.makedirs")
-def test_collect_metrics(mock_makedirs, mock_json_dump, mock_open, monitor):
+def test_collect_metrics(monitor):
     """Test collecting all metrics."""
     with patch.object(monitor, "_collect_system_metrics") as mock_system_metrics:
         with patch.object(monitor, "_collect_process_metrics") as mock_process_metrics:
@@ -168,11 +166,171 @@ def test_collect_metrics(mock_makedirs, mock_json_dump, mock_open, monitor):
 
             # Call method
             monitor._collect_metrics()
+            monitor.log.close()
 
             # Verify results
-            mock_makedirs.assert_called_once()
-            mock_json_dump.assert_called_once()
-            args = mock_json_dump.call_args[0][0]
+            latest = monitor.log.latest()
+            assert latest is not None
+            _, args = latest
             assert "timestamp" in args
             assert args["system"] == {"cpu": {"percent": 50.0}}
             assert args["processes"] == {"test_process": {"cpu_percent": 10.0}}
+            assert not list(Path(monitor.data_dir).glob("metrics_*.json"))
+
+
+@patch("psutil.getloadavg", return_value=(1.0, 1.0, 1.0))
+@patch("psutil.net_io_counters")
+@patch("psutil.disk_usage")
+@patch("psutil.virtual_memory")
+@patch("psutil.cpu_freq", return_value=None)
+@patch("psutil.cpu_count", return_value=4)
+@patch("psutil.cpu_percent", return_value=5.0)
+def test_collect_system_metrics_single_pass(
+    mock_cpu_percent,
+    mock_cpu_count,
+    mock_cpu_freq,
+    mock_mem,
+    mock_disk,
+    mock_net,
+    mock_loadavg,
+    monitor,
+):
+    """Test each psutil source is read once per sample and static ones are cached."""
+    monitor._collect_system_metrics()
+    metrics = monitor._collect_system_metrics()
+
+    assert mock_mem.call_count == 2
+    assert mock_disk.call_count == 2
+    assert mock_net.call_count == 2
+    assert mock_cpu_count.call_count == 1
+    assert mock_cpu_freq.call_count == 1
+    assert metrics["cpu"]["freq"] == {}
+
+
+def test_collect_metrics_feeds_rollups(monitor):
+    """Test collected system metrics are downsampled into rollups."""
+    monitor._collect_metrics()
+    timestamp, _ = monitor.log.latest()
+
+    resolution, points = monitor.history("cpu.percent", timestamp - 60, timestamp)
+
+    assert resolution == 300
+    assert len(points) == 1
+    assert points[0][1]["count"] == 1
+    assert set(points[0][1]) == {"avg", "max", "min", "count", "last"}
+
+
+def test_start_writes_samples_to_database(mock_config_dir, tmp_path):
+    """Test usage percentages are written to the metrics table."""
+    import sqlite3
+
+    database = tmp_path / "dashboard.db"
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+            " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)",
+        )
+    (tmp_path / "config.json").write_text(json.dumps({"database": {"path": "dashboard.db"}}))
+
+    MetricsMonitor(config_dir=str(mock_config_dir)).start()
+
+    with sqlite3.connect(database) as connection:
+        types = {row[0] for row in connection.execute("SELECT metric_type FROM metrics")}
+    assert types == {"cpu", "memory", "disk"}
+
+
+def test_aggregation_from_project_config(mock_config_dir):
+    """Test the rollups follow metrics.aggregation of the project config.json."""
+    settings = {"metrics": {"aggregation": {"interval": 60, "functions": ["max"]}}}
+    (mock_config_dir.parent / "config.json").write_text(json.dumps(settings))
+
+    monitor = MetricsMonitor(config_dir=str(mock_config_dir))
+
+    assert monitor.rollups.resolutions == [60, 3600, 86400]
+    assert monitor.rollups.functions == ("max",)
+
+
+def test_start_resumes_rollups_from_checkpoint(mock_config_dir):
+    """Test a later run restores open windows from the checkpoint, not the log."""
+    MetricsMonitor(config_dir=str(mock_config_dir)).start()
+
+    monitor = MetricsMonitor(config_dir=str(mock_config_dir))
+    with patch.object(monitor.log, "read", wraps=monitor.log.read) as read:
+        monitor.start()
+    timestamp, _ = monitor.log.latest()
+    _, points = monitor.history("cpu.percent", timestamp - 60, timestamp)
+
+    start, _ = read.call_args.args
+    assert start > timestamp - 60
+    assert points[-1][1]["count"] == 2
+
+
+def test_retention_from_project_config(mock_config_dir, tmp_path):
+    """Test metrics.retention applies to the logs, tracking history and the database."""
+    import sqlite3
+
+    from src.monitor.retention import FileRetention, SQLiteRetention
+
+    sqlite3.connect(tmp_path / "dashboard.db").close()
+    settings = {
+        "metrics": {"retention": {"days": 7, "max_datapoints": 50}},
+        "database": {"path": "dashboard.db"},
+    }
+    (tmp_path / "config.json").write_text(json.dumps(settings))
+
+    monitor = MetricsMonitor(config_dir=str(mock_config_dir))
+
+    assert (monitor.retention.days, monitor.retention.max_datapoints) == (7, 50)
+    kinds = {type(target) for target in monitor.retention.targets}
+    assert {FileRetention, SQLiteRetention} <= kinds
+    database = next(t for t in monitor.retention.targets if isinstance(t, SQLiteRetention))
+    assert database.database == str(tmp_path / "dashboard.db")
+
+
+def test_alert_rules_fire_across_runs(mock_config_dir, tmp_path):
+    """Test alert_rules of the project config fire once breached over several runs."""
+    settings = {"metrics": {"alert_rules": [{"metric": "cpu", "threshold": 80, "duration": 20}]}}
+    (tmp_path / "config.json").write_text(json.dumps(settings))
+
+    for now in (1000.0, 1010.0, 1020.0):
+        # Each run is a new process, as under monitor.service
+        monitor = MetricsMonitor(config_dir=str(mock_config_dir))
+        monitor._evaluate_alerts(now, {"cpu": 95.0})
+        monitor.alerts.save(monitor.alert_state)
+
+    assert monitor.alerts.firing() == [(monitor.alerts.rules[0], "")]
+
+
+def test_on_config_rebuilds_alert_rules(monitor):
+    """Test a new config snapshot replaces the monitor's alert rules."""
+    from types import SimpleNamespace
+
+    monitor.on_config(SimpleNamespace(data={"alert_rules": [{"metric": "cpu", "threshold": 5}]}))
+
+    assert [rule.metric for rule in monitor.alerts.rules] == ["cpu"]
+
+
+def test_run_collects_without_checkpointing_every_tick(monitor):
+    """Test the long-running loop only collects per tick and closes once at the end."""
+    import threading
+
+    stop = threading.Event()
+    ticks = []
+
+    def collect():
+        ticks.append(1)
+        if len(ticks) == 5:
+            stop.set()
+
+    monitor.collection_interval = 0
+    checkpoint = patch.object(monitor, "checkpoint", wraps=monitor.checkpoint)
+    retention = patch.object(monitor.retention, "run", wraps=monitor.retention.run)
+    with patch.object(monitor, "_collect_metrics", side_effect=collect):
+        with checkpoint as checkpoint, retention as retention:
+            monitor.run(stop)
+
+    assert len(ticks) == 5
+    # Only the final checkpoint on close; retention once at startup
+    assert checkpoint.call_count == 1
+    assert retention.call_count == 1
+    assert Path(monitor.alert_state).exists()
@@ -0,0 +1,75 @@
+"""Unit tests for the precompiled process matcher."""
+from unittest.mock import MagicMock, patch
+
+import psutil
+
+from src.monitor.process_matcher import ProcessMatcher
+
+CONFIGS = [
+    {"name": "dashboard", "pattern": "python.*dashboard"},
+    {"name": "python", "pattern": "python"},
+]
+
+
+def make_process(pid, cmdline, create_time=1.0):
+    """Create a mock process as yielded by process_iter."""
+    process = MagicMock()
+    process.pid = pid
+    process.info = {"create_time": create_time}
+    process.cmdline.return_value = cmdline
+    return process
+
+
+def test_match_first_config_wins():
+    """Test configs are tried in order once the prefilter hits."""
+    matcher = ProcessMatcher(CONFIGS)
+    assert matcher.match(["python", "-m", "dashboard"]) == "python"
+    assert matcher.match(["python -m dashboard"]) == "dashboard"
+    assert matcher.match(["bash"]) is None
+
+
+def test_match_without_configs():
+    """Test nothing matches when no patterns are configured."""
+    assert ProcessMatcher([]).match(["python"]) is None
+
+
+def test_scan_caches_by_create_time():
+    """Test unchanged processes are not re-matched on the next scan."""
+    matcher = ProcessMatcher(CONFIGS)
+    process = make_process(10, ["python"])
+    other = make_process(11, ["bash"])
+
+    with patch("psutil.process_iter", return_value=[process, other]):
+        assert [name for name, _ in matcher.scan()] == ["python"]
+        assert [name for name, _ in matcher.scan()] == ["python"]
+
+    process.cmdline.assert_called_once()
+    other.cmdline.assert_called_once()
+
+
+def test_scan_rematches_recycled_pid():
+    """Test a reused PID with a new create time is matched again."""
+    matcher = ProcessMatcher(CONFIGS)
+    with patch("psutil.process_iter", return_value=[make_process(10, ["python"])]):
+        list(matcher.scan())
+    with patch("psutil.process_iter", return_value=[make_process(10, ["bash"], 2.0)]):
+        assert list(matcher.scan()) == []
+
+
+def test_scan_forgets_exited_processes():
+    """Test cache entries are dropped for processes that exited."""
+    matcher = ProcessMatcher(CONFIGS)
+    with patch("psutil.process_iter", return_value=[make_process(10, ["python"])]):
+        list(matcher.scan())
+    with patch("psutil.process_iter", return_value=[]):
+        list(matcher.scan())
+    assert matcher._cache == {}
+
+
+def test_scan_skips_vanished_process():
+    """Test processes that exit mid-scan are skipped."""
+    matcher = ProcessMatcher(CONFIGS)
+    process = make_process(10, [])
+    process.cmdline.side_effect = psutil.NoSuchProcess(10)
+    with patch("psutil.process_iter", return_value=[process]):
+        assert list(matcher.scan()) == []
@@ -0,0 +1,148 @@
+"""Unit tests for request timing instrumentation."""
+import asyncio
+import threading
+
+import pytest
+from flask import Flask
+from prometheus_client import CollectorRegistry
+
+from dashboard.request_timing import (
+    DEFAULT_LATENCY_BUCKETS,
+    OTHER_ENDPOINT,
+    UNMATCHED_ENDPOINT,
+    RequestTimer,
+    get_request_timer,
+    init_request_timing,
+    timed,
+)
+
+
+def sample(registry, suffix, endpoint, le=None):
+    """Read one sample of the response time histogram."""
+    labels = {"endpoint": endpoint}
+    if le is not None:
+        labels["le"] = le
+    return registry.get_sample_value(f"response_time_seconds_{suffix}", labels)
+
+
+@pytest.fixture
+def timer():
+    """Timer admitting three endpoints."""
+    return RequestTimer(max_endpoints=3)
+
+
+@pytest.fixture
+def registry(timer):
+    """Fresh registry exporting the timer."""
+    registry = CollectorRegistry()
+    registry.register(timer)
+    return registry
+
+
+def test_sub_millisecond_buckets(timer, registry):
+    """Test sub-millisecond durations land in their own buckets."""
+    timer.observe(0.00005, "api")
+    timer.observe(0.0003, "api")
+    timer.observe(10.0, "api")
+
+    assert sample(registry, "bucket", "api", "0.0001") == 1
+    assert sample(registry, "bucket", "api", "0.00025") == 1
+    assert sample(registry, "bucket", "api", "0.0005") == 2
+    assert sample(registry, "bucket", "api", "5.0") == 2
+    assert sample(registry, "bucket", "api", "+Inf") == 3
+    assert sample(registry, "count", "api") == 3
+    assert sample(registry, "sum", "api") == pytest.approx(10.00035)
+
+
+def test_endpoint_cardinality_is_capped(timer, registry):
+    """Test endpoints beyond the limit are counted as other."""
+    for index in range(6):
+        timer.observe(0.001, f"endpoint{index}")
+
+    assert set(timer.totals()) == {"endpoint0", "endpoint1", "endpoint2", OTHER_ENDPOINT}
+    assert sample(registry, "count", OTHER_ENDPOINT) == 3
+
+
+def test_threads_are_merged_at_scrape(timer, registry):
+    """Test observations of many threads, live or finished, all add up."""
+    barrier = threading.Barrier(4)
+    done = threading.Event()
+
+    def work():
+        for _ in range(1000):
+            timer.observe(0.001, "api")
+        barrier.wait()
+        done.wait()
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    assert sample(registry, "count", "api") == 3000
+
+    done.set()
+    for thread in threads:
+        thread.join()
+    timer.observe(0.001, "api")
+    assert sample(registry, "count", "api") == 3001
+    # Finished threads are folded into the retired total only once
+    assert sample(registry, "count", "api") == 3001
+
+
+def test_invalid_buckets_rejected():
+    """Test bucket bounds must be strictly increasing."""
+    with pytest.raises(ValueError):
+        RequestTimer(buckets=(0.1, 0.1))
+    with pytest.raises(ValueError):
+        RequestTimer(buckets=())
+
+
+def test_timed_coroutine(timer, registry):
+    """Test the asyncio wrapper records calls, including failing ones."""
+
+    @timed(timer, lambda message: f"ws.{message['type']}")
+    async def handle(message):
+        if message["type"] == "bad":
+            raise ValueError(message)
+        await asyncio.sleep(0)
+        return message["type"]
+
+    assert asyncio.run(handle({"type": "ping"})) == "ping"
+    with pytest.raises(ValueError):
+        asyncio.run(handle({"type": "bad"}))
+
+    assert sample(registry, "count", "ws.ping") == 1
+    assert sample(registry, "count", "ws.bad") == 1
+
+
+def test_flask_hooks_time_requests():
+    """Test Flask requests are labelled with their endpoint."""
+    app = Flask(__name__)
+
+    @app.route("/items/<int:item>")
+    def item(item):
+        return str(item)
+
+    timer = init_request_timing(app)
+    client = app.test_client()
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+
+    totals = timer.totals()
+    assert sum(totals["item"][:-1]) == 2
+    assert sum(totals[UNMATCHED_ENDPOINT][:-1]) == 1
+    assert timer.bounds == DEFAULT_LATENCY_BUCKETS
+    with app.app_context():
+        assert get_request_timer() is timer
+
+
+def test_flask_config_sets_buckets():
+    """Test the app config chooses buckets and the endpoint limit."""
+    app = Flask(__name__)
+    app.config.update(REQUEST_TIMING_BUCKETS=[0.001, 0.01], REQUEST_TIMING_MAX_ENDPOINTS=5)
+
+    timer = init_request_timing(app)
+
+    assert timer.bounds == (0.001, 0.01)
+    assert timer.max_endpoints == 5
@@ -0,0 +1,130 @@
+"""Unit tests for the retention engine."""
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.monitor.metrics_log import MetricsLog
+from src.monitor.retention import (
+    FileRetention,
+    RetentionEngine,
+    SegmentRetention,
+    SQLiteRetention,
+)
+
+NOW = 1_700_000_000.0
+DAY = 86400
+
+
+@pytest.fixture()
+def database(tmp_path):
+    """SQLite database with the dashboard metrics table."""
+    path = tmp_path / "dashboard.db"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+        " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)",
+    )
+    rows = []
+    for age_days in range(10):
+        moment = datetime.fromtimestamp(NOW) - timedelta(days=age_days)
+        stamp = moment.isoformat(sep=" ", timespec="microseconds")
+        rows.extend([(stamp, "cpu", 1.0), (stamp, "memory", 2.0)])
+    connection.executemany(
+        "INSERT INTO metrics (timestamp, metric_type, value) VALUES (?, ?, ?)", rows,
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+def count_rows(path, metric_type=None):
+    """Count metrics rows, optionally of one type."""
+    with sqlite3.connect(path) as connection:
+        if metric_type is None:
+            return connection.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+        return connection.execute(
+            "SELECT COUNT(*) FROM metrics WHERE metric_type = ?", (metric_type,),
+        ).fetchone()[0]
+
+
+def test_segment_retention(tmp_path):
+    """Test whole expired log segments are removed."""
+    log = MetricsLog(tmp_path, segment_seconds=DAY)
+    for age_days in (5, 3, 1, 0):
+        log.append({"cpu": 1}, NOW - age_days * DAY)
+    log.close()
+
+    report = RetentionEngine([SegmentRetention(log)], days=2).run(now=NOW)
+
+    assert report.complete
+    assert report.files_deleted == 4
+    assert report.bytes_reclaimed > 0
+    assert len(log.segments()) == 2
+
+
+def test_segment_retention_counts_files_on_disk(tmp_path):
+    """Test a segment whose index is already gone counts as one deleted file."""
+    log = MetricsLog(tmp_path, segment_seconds=DAY)
+    log.append({"cpu": 1}, NOW - 5 * DAY)
+    log.close()
+    log.index_path(log.segment_start(NOW - 5 * DAY)).unlink()
+
+    report = RetentionEngine([SegmentRetention(log)], days=2).run(now=NOW)
+
+    assert report.files_deleted == 1
+    assert log.segments() == []
+
+
+def test_file_retention_age_and_count(tmp_path):
+    """Test files expire by age and beyond the newest max_datapoints."""
+    for age_days in range(6):
+        path = tmp_path / f"metrics_{age_days}.json"
+        path.write_text("{}")
+        os.utime(path, (NOW - age_days * DAY, NOW - age_days * DAY))
+
+    report = RetentionEngine([FileRetention(tmp_path)], days=4.5, max_datapoints=3).run(now=NOW)
+
+    assert report.files_deleted == 3
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "metrics_0.json",
+        "metrics_1.json",
+        "metrics_2.json",
+    ]
+
+
+def test_sqlite_retention_batches(database):
+    """Test expired rows are deleted in batches and per-series caps apply."""
+    target = SQLiteRetention(database, batch_size=3)
+
+    report = RetentionEngine([target], days=5.5, max_datapoints=4).run(now=NOW)
+
+    assert report.complete
+    assert report.rows_deleted == 12
+    assert count_rows(database, "cpu") == 4
+    assert count_rows(database, "memory") == 4
+
+
+def test_time_budget_resumes(database):
+    """Test an interrupted pass resumes where it stopped."""
+    engine = RetentionEngine([SQLiteRetention(database, batch_size=1)], days=5.5)
+
+    first = engine.run(time_budget=0, now=NOW)
+    assert not first.complete
+    assert first.rows_deleted == 1
+    assert engine.in_progress
+
+    rest = engine.run(now=NOW)
+    assert rest.complete
+    assert first.rows_deleted + rest.rows_deleted == 8
+    assert count_rows(database) == 12
+
+
+def test_from_config(tmp_path):
+    """Test the policy is read from metrics.retention."""
+    config = {"metrics": {"retention": {"days": 7, "max_datapoints": 100}}}
+    engine = RetentionEngine.from_config(config, [FileRetention(tmp_path)])
+
+    assert engine.days == 7
+    assert engine.max_datapoints == 100
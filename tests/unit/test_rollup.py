@@ -0,0 +1,129 @@
+"""Unit tests for streaming metrics rollups."""
+import math
+
+import pytest
+
+from src.monitor.rollup import (
+    RollupAggregator,
+    RollupStore,
+    WindowStats,
+    default_resolutions,
+    flatten_metrics,
+)
+
+
+@pytest.fixture()
+def aggregator(tmp_path):
+    """Aggregator with 10 second and 100 second windows."""
+    rollups = RollupAggregator(RollupStore(tmp_path, (10, 100)))
+    yield rollups
+    rollups.close()
+
+
+def test_window_stats():
+    """Test running aggregates of a window."""
+    stats = WindowStats()
+    for value in (3.0, 1.0, 2.0):
+        stats.add(value)
+
+    assert stats.to_dict() == {"avg": 2.0, "max": 3.0, "min": 1.0, "count": 3, "last": 2.0}
+    assert math.isnan(WindowStats().avg)
+
+
+def test_flatten_metrics():
+    """Test nested numeric fields become dotted series names."""
+    record = {
+        "cpu": {"percent": 5, "freq": {"current": 2.0}},
+        "load": {"load_avg": (1, 2, 3)},
+        "ok": True,
+    }
+
+    assert flatten_metrics(record) == {"cpu.percent": 5.0, "cpu.freq.current": 2.0}
+
+
+def test_finished_windows_written(aggregator):
+    """Test windows are written once a sample falls past their end."""
+    for second in range(25):
+        aggregator.add(1000.0 + second, {"cpu": float(second)})
+
+    resolution, points = aggregator.query("cpu", 1000, 1024, max_points=10)
+
+    assert resolution == 10
+    assert [timestamp for timestamp, _ in points] == [1000.0, 1010.0, 1020.0]
+    assert points[0][1] == {"avg": 4.5, "max": 9.0, "min": 0.0, "count": 10, "last": 9.0}
+    # The last window is still open and served from memory
+    assert points[2][1]["count"] == 5
+
+
+def test_query_uses_coarser_resolution_for_long_ranges(aggregator):
+    """Test the point budget selects the resolution."""
+    for second in range(0, 400, 5):
+        aggregator.add(float(second), {"cpu": 1.0})
+
+    resolution, points = aggregator.query("cpu", 0, 399, max_points=5)
+
+    assert resolution == 100
+    assert len(points) == 4
+    assert sum(point["count"] for _, point in points) == 80
+
+
+def test_replay_restores_open_windows_without_writing(tmp_path):
+    """Test replayed samples rebuild open windows but are not rewritten."""
+    store = RollupStore(tmp_path, (10,))
+    first = RollupAggregator(store)
+    for second in range(15):
+        first.add(float(second), {"cpu": 1.0})
+    first.close()
+
+    resumed = RollupAggregator(RollupStore(tmp_path, (10,)))
+    resumed.replay((float(second), {"cpu": 1.0}) for second in range(15))
+    resumed.add(20.0, {"cpu": 1.0})
+
+    _, points = resumed.query("cpu", 0, 20, max_points=10)
+    resumed.close()
+
+    counts = [(timestamp, point["count"]) for timestamp, point in points]
+    assert counts == [(0.0, 10), (10.0, 5), (20.0, 1)]
+
+
+def test_checkpoint_restores_open_windows(tmp_path):
+    """Test a saved checkpoint resumes open windows in a new aggregator."""
+    checkpoint = tmp_path / "open.json"
+    first = RollupAggregator(RollupStore(tmp_path, (10, 100)))
+    for second in range(15):
+        first.add(float(second), {"cpu": float(second)})
+    first.save(checkpoint)
+    first.close()
+
+    resumed = RollupAggregator(RollupStore(tmp_path, (10, 100)))
+    assert resumed.load(checkpoint) == 14.0
+    resumed.add(20.0, {"cpu": 1.0})
+    _, points = resumed.query("cpu", 0, 20, max_points=10)
+    resumed.close()
+
+    counts = [(timestamp, point["count"]) for timestamp, point in points]
+    assert counts == [(0.0, 10), (10.0, 5), (20.0, 1)]
+    assert points[1][1]["max"] == 14.0
+
+
+def test_checkpoint_of_other_resolutions_ignored(tmp_path):
+    """Test a checkpoint whose windows do not line up is not loaded."""
+    checkpoint = tmp_path / "open.json"
+    first = RollupAggregator(RollupStore(tmp_path / "a", (10,)))
+    first.add(1.0, {"cpu": 1.0})
+    first.save(checkpoint)
+
+    assert RollupAggregator(RollupStore(tmp_path / "b", (60,))).load(checkpoint) is None
+    assert RollupAggregator(RollupStore(tmp_path / "c", (10,))).load(tmp_path / "missing") is None
+
+
+def test_unknown_function_rejected(tmp_path):
+    """Test unsupported aggregation functions raise."""
+    with pytest.raises(ValueError):
+        RollupAggregator(RollupStore(tmp_path, (10,)), ["p99"])
+
+
+def test_default_resolutions():
+    """Test hourly and daily tiers are added above the base interval."""
+    assert default_resolutions(300) == (300, 3600, 86400)
+    assert default_resolutions(3600) == (3600, 86400)
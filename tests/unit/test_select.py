@@ -99,3 +99,11 @@ def test_select_custom_dialect():
     sql = select.build()
 
     assert sql == 'SELECT * FROM "public"."users"'
+
+
+def test_select_offset():
+    """Test offset clause."""
+    select = Select("users").limit(10).offset(20)
+    sql = select.build()
+
+    assert sql == 'SELECT * FROM "users" LIMIT 10 OFFSET 20'
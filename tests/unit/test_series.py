@@ -0,0 +1,93 @@
+"""Unit tests for multi-series time-range queries."""
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.db.series import SeriesQuery
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture()
+def connection():
+    """In-memory metrics table with three series, one sample a minute."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute(
+        "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+        " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)",
+    )
+    connection.execute(
+        "CREATE INDEX ix_metrics_type_timestamp ON metrics (metric_type, timestamp, value)",
+    )
+    rows = [
+        (
+            (START + timedelta(minutes=minute)).isoformat(sep=" ", timespec="microseconds"),
+            metric_type,
+            float(minute),
+        )
+        for minute in range(10)
+        for metric_type in ("cpu", "disk", "memory")
+    ]
+    connection.executemany(
+        "INSERT INTO metrics (timestamp, metric_type, value) VALUES (?, ?, ?)", rows,
+    )
+    yield connection
+    connection.close()
+
+
+def test_fetch_several_series(connection):
+    """Test one query returns every requested series within the range."""
+    page = SeriesQuery().fetch(
+        connection, ["memory", "cpu"], START + timedelta(minutes=2), START + timedelta(minutes=5),
+    )
+
+    assert page.cursor is None
+    assert set(page.series) == {"cpu", "memory"}
+    assert [value for _, value in page.series["cpu"]] == [2.0, 3.0, 4.0]
+    assert [value for _, value in page.series["memory"]] == [2.0, 3.0, 4.0]
+
+
+def test_keyset_pagination(connection):
+    """Test pages continue after the cursor without gaps or repeats."""
+    query = SeriesQuery()
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page = query.fetch(
+            connection, ["cpu", "disk", "memory"], START, START + timedelta(hours=1),
+            limit=7, after=cursor,
+        )
+        pages += 1
+        seen.extend(
+            (metric_type, ts) for metric_type, points in page.series.items() for ts, _ in points
+        )
+        cursor = page.cursor
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 30
+    assert pages == 5
+
+
+def test_query_uses_covering_index(connection):
+    """Test SQLite answers the query from the index without sorting."""
+    select = SeriesQuery().select(
+        ["cpu", "disk"], START, START + timedelta(hours=1), limit=10, after=START,
+    )
+    explained = connection.execute("EXPLAIN QUERY PLAN " + select.build(), select.get_parameters())
+    plan = " ".join(row[-1] for row in explained)
+
+    assert (
+        "COVERING INDEX ix_metrics_type_timestamp"
+        " (metric_type=? AND timestamp>? AND timestamp<?)" in plan
+    )
+    assert "TEMP B-TREE" not in plan
+
+
+def test_select_order_multiple_columns():
+    """Test ordering on several columns."""
+    select = SeriesQuery().select(["cpu"], "a", "b")
+
+    assert select.build().endswith('ORDER BY "metric_type" ASC, "timestamp" ASC')
@@ -0,0 +1,36 @@
+"""Unit tests for psutil snapshots."""
+from unittest.mock import MagicMock, patch
+
+from src.monitor.snapshot import SnapshotReader, TTLCache
+
+
+def test_ttl_cache_reuses_value():
+    """Test cached values are reused until the TTL expires."""
+    cache = TTLCache(ttl=60)
+    loader = MagicMock(return_value=1)
+
+    assert cache.get("key", loader) == 1
+    assert cache.get("key", loader) == 1
+    loader.assert_called_once()
+
+
+def test_ttl_cache_expires():
+    """Test values are reloaded after the TTL."""
+    cache = TTLCache(ttl=0)
+    loader = MagicMock(side_effect=[1, 2])
+
+    assert cache.get("key", loader) == 1
+    assert cache.get("key", loader) == 2
+
+
+def test_snapshot_reads_each_source_once():
+    """Test a snapshot makes one call per psutil source."""
+    with patch("src.monitor.snapshot.psutil") as mock_psutil:
+        mock_psutil.getloadavg.return_value = (0.5, 0.5, 0.5)
+        snapshot = SnapshotReader(disk_path="/data").read()
+
+    assert snapshot.memory is mock_psutil.virtual_memory.return_value
+    assert snapshot.load_avg == (0.5, 0.5, 0.5)
+    mock_psutil.disk_usage.assert_called_once_with("/data")
+    for source in ("cpu_percent", "virtual_memory", "net_io_counters", "cpu_count", "cpu_freq"):
+        assert getattr(mock_psutil, source).call_count == 1
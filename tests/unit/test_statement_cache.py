@@ -0,0 +1,71 @@
+"""Unit tests for the SQL statement cache."""
+import pytest
+
+from src.db.cache import StatementCache, statement_cache
+from src.db.dialect import Dialect
+from src.db.insert import Insert
+from src.db.select import Select
+from src.db.update_delete import Delete, Update
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty shared cache."""
+    statement_cache.clear()
+    yield
+    statement_cache.clear()
+
+
+def test_lru_eviction_and_stats():
+    """Test the cache evicts least recently used statements."""
+    cache = StatementCache(maxsize=2)
+    cache.get("a", lambda: "A")
+    cache.get("b", lambda: "B")
+    cache.get("a", lambda: "unused")
+    cache.get("c", lambda: "C")
+
+    assert cache.get("a", lambda: "rebuilt") == "A"
+    assert cache.get("b", lambda: "rebuilt") == "rebuilt"
+    assert cache.stats() == {"hits": 2, "misses": 4, "size": 2}
+
+
+def test_same_shape_hits_with_different_parameters():
+    """Test statements of the same shape share SQL regardless of values."""
+    first = Select("metrics").where("metric_type = %s", "cpu").limit(10)
+    second = Select("metrics").where("metric_type = %s", "memory").limit(10)
+
+    assert first.build() == second.build()
+    assert second.get_parameters() == ["memory"]
+    assert statement_cache.stats()["hits"] == 1
+
+
+def test_shape_changes_miss():
+    """Test anything affecting the SQL text is part of the key."""
+    one_row = Insert("metrics").add_values({"value": 1})
+    two_rows = Insert("metrics").add_values({"value": 1}).add_values({"value": 2})
+    sqlite_row = Insert("metrics", Dialect("sqlite")).add_values({"value": 1})
+
+    assert one_row.build() == 'INSERT INTO "metrics" ("value") VALUES (%s)'
+    assert two_rows.build() == 'INSERT INTO "metrics" ("value") VALUES (%s), (%s)'
+    assert sqlite_row.build() == 'INSERT INTO "metrics" ("value") VALUES (?)'
+    assert statement_cache.stats() == {"hits": 0, "misses": 3, "size": 3}
+
+
+def test_schema_is_part_of_the_key():
+    """Test the same table under another schema gets its own statement."""
+    dialect = Dialect("postgresql")
+    plain = Delete("metrics", dialect).where("id = %s", 1).build()
+    dialect.schema = "app"
+    qualified = Delete("metrics", dialect).where("id = %s", 1).build()
+
+    assert plain == 'DELETE FROM "metrics" WHERE id = %s'
+    assert qualified == 'DELETE FROM "app"."metrics" WHERE id = %s'
+
+
+def test_update_cached():
+    """Test repeated updates reuse the cached statement."""
+    for value in range(3):
+        sql = Update("metrics").set({"value": value}).where("id = %s", value).build()
+
+    assert sql == 'UPDATE "metrics" SET "value" = %s WHERE id = %s'
+    assert statement_cache.stats()["hits"] == 2
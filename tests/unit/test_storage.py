@@ -0,0 +1,141 @@
+"""Unit tests for the dashboard SQLite storage profile."""
+import sqlite3
+
+import pytest
+from sqlalchemy import text
+
+from dashboard.storage import (
+    DEFAULT_PRAGMAS,
+    StorageError,
+    apply_pragmas,
+    check_pragmas,
+    get_reader_engine,
+    is_sqlite_file,
+)
+
+
+@pytest.fixture()
+def app(tmp_path):
+    """Dashboard app on a SQLite file."""
+    from dashboard.app import create_app
+
+    database = tmp_path / "dashboard.db"
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{database}"})
+    yield app
+    with app.app_context():
+        get_reader_engine().dispose()
+        from dashboard.extensions import db
+
+        db.engine.dispose()
+
+
+def test_is_sqlite_file():
+    """Test only on-disk SQLite databases get the profile."""
+    assert is_sqlite_file("sqlite:///instance/dashboard.db")
+    assert not is_sqlite_file("sqlite:///:memory:")
+    assert not is_sqlite_file("sqlite://")
+    assert not is_sqlite_file("postgresql://localhost/dashboard")
+    assert not is_sqlite_file(None)
+
+
+def test_check_pragmas(tmp_path):
+    """Test applied pragmas read back clean and differences are reported."""
+    connection = sqlite3.connect(tmp_path / "metrics.db")
+    apply_pragmas(connection, DEFAULT_PRAGMAS)
+
+    assert check_pragmas(connection, DEFAULT_PRAGMAS) == {}
+    assert check_pragmas(connection, {"synchronous": "full"}) == {"synchronous": ("full", 1)}
+    connection.close()
+
+
+def test_engines_use_profile(app):
+    """Test the writer is a single WAL connection and readers are read-only."""
+    from dashboard.extensions import db
+
+    with app.app_context():
+        writer = db.engine
+        reader = get_reader_engine()
+        with writer.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        with reader.connect() as connection:
+            assert connection.execute(text("PRAGMA query_only")).scalar() == 1
+
+    assert writer.pool.size() == 1
+    assert reader.pool.size() == 4
+
+
+def test_readers_and_writer_do_not_block(app):
+    """Test the writer commits while a reader holds a snapshot open."""
+    from dashboard.extensions import db
+
+    with app.app_context():
+        writer = db.engine
+        reader = get_reader_engine()
+    with writer.begin() as connection:
+        connection.execute(text("CREATE TABLE samples (value FLOAT)"))
+        connection.execute(text("INSERT INTO samples VALUES (1.0)"))
+
+    with reader.connect() as read:
+        read.exec_driver_sql("BEGIN")
+        assert read.execute(text("SELECT COUNT(*) FROM samples")).scalar() == 1
+
+        with writer.begin() as connection:
+            connection.execute(text("INSERT INTO samples VALUES (2.0)"))
+
+        assert read.execute(text("SELECT COUNT(*) FROM samples")).scalar() == 1
+        read.exec_driver_sql("COMMIT")
+        assert read.execute(text("SELECT COUNT(*) FROM samples")).scalar() == 2
+
+
+def test_startup_fails_on_refused_pragma(tmp_path):
+    """Test a pragma SQLite did not apply stops startup."""
+    from dashboard.app import create_app
+
+    with pytest.raises(StorageError, match="pragma journal_mode"):
+        create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'dashboard.db'}",
+                "SQLITE_PRAGMAS": {"journal_mode": "nonsense"},
+            },
+        )
+
+
+def test_startup_reports_refused_pragma(tmp_path, caplog):
+    """Test a pragma SQLite did not apply is only logged when not strict."""
+    from dashboard.app import create_app
+    from dashboard.extensions import db
+
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'dashboard.db'}",
+            "SQLITE_PRAGMAS": {"journal_mode": "nonsense"},
+            "SQLITE_PRAGMAS_STRICT": False,
+        },
+    )
+    with app.app_context():
+        get_reader_engine().dispose()
+        db.engine.dispose()
+
+    assert "pragma journal_mode" in caplog.text
+
+
+def test_session_reads_from_reader_pool(app):
+    """Test db.session queries use the readers and a transaction reads its own writes."""
+    from dashboard.extensions import db
+
+    select = text("SELECT COUNT(*) FROM samples")
+    with app.app_context():
+        reader = get_reader_engine()
+        db.session.execute(text("CREATE TABLE samples (value FLOAT)"))
+        db.session.commit()
+
+        assert db.session.get_bind(clause=select.columns()) is reader
+        db.session.execute(text("INSERT INTO samples VALUES (1.0)"))
+        assert db.session.get_bind(clause=select.columns()) is db.engine
+        assert db.session.execute(select).scalar() == 1
+        db.session.commit()
+
+        assert db.session.get_bind(clause=select.columns()) is reader
+        db.session.remove()
@@ -0,0 +1,113 @@
+"""Unit tests for the ring-buffer time-series store."""
+import math
+import threading
+
+import numpy as np
+import pytest
+
+from dashboard.timeseries import SeriesStore
+
+
+def test_store_init():
+    """Test store initialization."""
+    store = SeriesStore(["cpu", "memory"], capacity=4)
+    assert store.metrics == ("cpu", "memory")
+    assert len(store) == 0
+    assert store.last_timestamp is None
+
+
+def test_store_invalid_capacity():
+    """Test error on non-positive capacity."""
+    with pytest.raises(ValueError):
+        SeriesStore(["cpu"], capacity=0)
+
+
+def test_store_append_and_window():
+    """Test appended samples come back oldest first."""
+    store = SeriesStore(["cpu"], capacity=4)
+    for i in range(3):
+        store.append(1000.0 * i, {"cpu": float(i)})
+
+    timestamps, columns = store.window()
+
+    assert timestamps.tolist() == [0.0, 1000.0, 2000.0]
+    assert columns["cpu"].tolist() == [0.0, 1.0, 2.0]
+    assert store.last_timestamp == 2000.0
+
+
+def test_store_wraps_at_capacity():
+    """Test the oldest samples are overwritten once full."""
+    store = SeriesStore(["cpu"], capacity=3)
+    for i in range(5):
+        store.append(float(i), {"cpu": float(i)})
+
+    timestamps, columns = store.window()
+
+    assert len(store) == 3
+    assert timestamps.tolist() == [2.0, 3.0, 4.0]
+    assert columns["cpu"].tolist() == [2.0, 3.0, 4.0]
+    assert store.window(2)[1]["cpu"].tolist() == [3.0, 4.0]
+
+
+def test_store_window_is_view():
+    """Test windows share memory with the store instead of copying."""
+    store = SeriesStore(["cpu"], capacity=3)
+    for i in range(5):
+        store.append(float(i), {"cpu": float(i)})
+
+    timestamps, columns = store.window()
+
+    assert not timestamps.flags.owndata
+    assert np.shares_memory(columns["cpu"], store._columns["cpu"])
+
+
+def test_store_missing_metric_is_nan():
+    """Test metrics absent from a sample are recorded as NaN."""
+    store = SeriesStore(["cpu", "disk"], capacity=2)
+    store.append(0.0, {"cpu": 1.0})
+
+    latest = store.latest()
+
+    assert latest["cpu"] == 1.0
+    assert math.isnan(latest["disk"])
+
+
+def test_store_clear():
+    """Test clearing the store."""
+    store = SeriesStore(["cpu"], capacity=2)
+    store.append(0.0, {"cpu": 1.0})
+    store.clear()
+    assert len(store) == 0
+    assert store.latest() == {}
+
+
+def test_store_append_if_newer():
+    """Test samples not newer than the newest stored are skipped."""
+    store = SeriesStore(["cpu"], capacity=4)
+
+    assert store.append_if_newer(1000.0, {"cpu": 1.0})
+    assert not store.append_if_newer(1000.0, {"cpu": 2.0})
+    assert not store.append_if_newer(500.0, {"cpu": 3.0})
+    assert store.append_if_newer(2000.0, {"cpu": 4.0})
+
+    timestamps, columns = store.window()
+    assert timestamps.tolist() == [1000.0, 2000.0]
+    assert columns["cpu"].tolist() == [1.0, 4.0]
+
+
+def test_store_append_if_newer_concurrent():
+    """Test concurrent writers of one snapshot record it once."""
+    store = SeriesStore(["cpu"], capacity=8)
+    barrier = threading.Barrier(8)
+
+    def write():
+        barrier.wait()
+        store.append_if_newer(1000.0, {"cpu": 1.0})
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(store) == 1
@@ -0,0 +1,164 @@
+"""Unit tests for cached JWT verification."""
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from dashboard.auth import tokens
+from dashboard.auth.middleware import create_token, revoke_token, verify_token
+from dashboard.auth.tokens import TokenVerifier, configure_token_verifier, get_token_verifier
+
+
+@pytest.fixture
+def verifier():
+    """Verifier with a small cache."""
+    return TokenVerifier("test-secret", maxsize=2)
+
+
+def test_verified_token_served_from_cache(verifier):
+    """Test a repeated token is verified once."""
+    token = verifier.issue({"sub": "alice"})
+
+    with patch("dashboard.auth.tokens.jwt.decode", wraps=jwt.decode) as decode:
+        for _ in range(100):
+            assert verifier.verify(token)["sub"] == "alice"
+
+    assert decode.call_count == 1
+    assert verifier.stats()["hits"] == 99
+
+
+def test_cached_claims_are_copies(verifier):
+    """Test callers cannot change the cached claims."""
+    token = verifier.issue({"sub": "alice"})
+    verifier.verify(token)["sub"] = "mallory"
+
+    assert verifier.verify(token)["sub"] == "alice"
+
+
+def test_invalid_tokens_rejected(verifier):
+    """Test bad signatures and garbage are rejected and not cached."""
+    forged = TokenVerifier("other-secret").issue({"sub": "alice"})
+
+    assert verifier.verify(forged) is None
+    assert verifier.verify("not-a-token") is None
+    assert verifier.stats()["size"] == 0
+
+
+def test_cache_entry_expires_with_token(verifier):
+    """Test a cached token is verified again once past its exp."""
+    token = verifier.issue({"sub": "alice", "exp": int(time.time()) + 1})
+    assert verifier.verify(token) is not None
+
+    with patch("dashboard.auth.tokens.time.time", return_value=time.time() + 5), patch(
+        "dashboard.auth.tokens.jwt.decode", side_effect=jwt.ExpiredSignatureError,
+    ) as decode:
+        assert verifier.verify(token) is None
+
+    assert decode.call_count == 1
+    assert verifier.stats()["size"] == 0
+
+
+def test_expired_token_rejected(verifier):
+    """Test a token past its exp is rejected."""
+    assert verifier.verify(verifier.issue({"sub": "alice", "exp": int(time.time()) - 10})) is None
+
+
+def test_cache_is_bounded(verifier):
+    """Test the least recently used token is evicted."""
+    first, second, third = (verifier.issue({"sub": name}) for name in ("a", "b", "c"))
+    verifier.verify(first)
+    verifier.verify(second)
+    verifier.verify(first)
+    verifier.verify(third)
+
+    with patch("dashboard.auth.tokens.jwt.decode", wraps=jwt.decode) as decode:
+        verifier.verify(first)
+        verifier.verify(third)
+        assert decode.call_count == 0
+        verifier.verify(second)
+        assert decode.call_count == 1
+
+
+def test_revoked_token_rejected(verifier):
+    """Test revoking a cached token takes effect at once."""
+    token = verifier.issue({"sub": "alice"})
+    other = verifier.issue({"sub": "bob"})
+    verifier.verify(token)
+
+    verifier.revoke(token)
+
+    assert verifier.verify(token) is None
+    assert verifier.is_revoked(token)
+    assert verifier.verify(other)["sub"] == "bob"
+
+
+def test_revoked_id_rejected(verifier):
+    """Test revoking a token ID rejects every token carrying it."""
+    token = verifier.issue({"sub": "alice", "jti": "session-1"})
+    verifier.verify(token)
+
+    verifier.revoke_id("session-1")
+
+    assert verifier.verify(token) is None
+    assert verifier.verify(verifier.issue({"sub": "alice", "jti": "session-2"})) is not None
+
+
+def test_expired_revocations_forgotten(verifier):
+    """Test revocations are dropped once the token would have expired anyway."""
+    token = verifier.issue({"sub": "alice", "exp": int(time.time()) + 1})
+    verifier.revoke(token)
+
+    with patch("dashboard.auth.tokens.time.time", return_value=time.time() + 5):
+        verifier.revoke_id("later", time.time() + 60)
+        verifier.revoke(verifier.issue({"sub": "bob"}))
+
+    assert not verifier.is_revoked(token)
+
+
+def test_garbage_tokens_not_retained(verifier):
+    """Test revoking strings that do not verify stores nothing."""
+    forged = TokenVerifier("other-secret").issue({"sub": "mallory"})
+
+    results = [verifier.revoke(f"garbage-{index}") for index in range(1000)]
+
+    assert not any(results)
+    assert not verifier.revoke(forged)
+    assert verifier.stats()["revoked"] == 0
+
+
+def test_revocations_capped():
+    """Test past the cap the revocation expiring first is forgotten."""
+    verifier = TokenVerifier("test-secret", max_revoked=2)
+    now = int(time.time())
+    tokens = [
+        verifier.issue({"sub": "alice", "exp": now + lifetime}) for lifetime in (300, 100, 200)
+    ]
+
+    assert all(verifier.revoke(token) for token in tokens)
+
+    assert verifier.stats()["revoked"] == 2
+    assert [verifier.is_revoked(token) for token in tokens] == [True, False, True]
+
+
+def test_key_change_clears_cache(verifier):
+    """Test tokens signed with the old key stop verifying after a key change."""
+    token = verifier.issue({"sub": "alice"})
+    verifier.verify(token)
+
+    verifier.set_key("new-secret")
+
+    assert verifier.verify(token) is None
+
+
+def test_middleware_works_without_app_context(monkeypatch):
+    """Test the middleware helpers use the shared verifier outside Flask."""
+    monkeypatch.setattr(tokens, "_verifier", None)
+    configure_token_verifier("shared-secret")
+
+    token = create_token({"sub": "alice"})
+    assert verify_token(token)["sub"] == "alice"
+    assert get_token_verifier().stats()["misses"] == 1
+
+    revoke_token(token)
+    assert verify_token(token) is None
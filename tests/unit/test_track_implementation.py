@@ -0,0 +1,131 @@
+"""Unit tests for implementation progress tracking."""
+import gzip
+import json
+
+from src.track_implementation import (
+    HISTORY_FILE,
+    LATEST_FILE,
+    LEGACY_FILE,
+    MIGRATED_SUFFIX,
+    append_history,
+    get_implementation_status,
+    migrate_legacy,
+    read_history_tail,
+    track_implementation_progress,
+    write_atomic,
+)
+
+
+def test_track_progress_appends(tmp_path):
+    """Test each call appends one history line and replaces the snapshot."""
+    for count in range(3):
+        assert track_implementation_progress({"tests": count}, tmp_path)
+
+    lines = (tmp_path / HISTORY_FILE).read_text().splitlines()
+    assert [json.loads(line)["tests"] for line in lines] == [0, 1, 2]
+    assert json.loads((tmp_path / LATEST_FILE).read_text())["tests"] == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == [HISTORY_FILE, LATEST_FILE]
+
+
+def test_status_reads_latest_and_tail(tmp_path):
+    """Test the status holds the snapshot and only the newest entries."""
+    for count in range(10):
+        track_implementation_progress({"tests": count}, tmp_path)
+
+    status = get_implementation_status(tmp_path, tail=3)
+
+    assert status["latest"]["tests"] == 9
+    assert [entry["tests"] for entry in status["history"]] == [7, 8, 9]
+
+
+def test_legacy_progress_file_unwrapped(tmp_path):
+    """Test a file written by the old tracker yields its latest entry, not the wrapper."""
+    entries = [{"tests": 1, "timestamp": "t1"}, {"tests": 2, "timestamp": "t2"}]
+    legacy = {"history": entries, "latest": entries[-1]}
+    (tmp_path / LEGACY_FILE).write_text(json.dumps(legacy))
+
+    assert get_implementation_status(tmp_path) == {"latest": entries[-1], "history": entries}
+
+
+def test_legacy_snapshot_file_migrated(tmp_path):
+    """Test a plain snapshot with history, like tracking/implementation_metrics.json, migrates."""
+    legacy = {
+        "timestamp": "2025-01-08T10:11:15",
+        "files": {"python": 3},
+        "history": [{"timestamp": "2025-01-07T10:00:00", "files": {"python": 2}}],
+    }
+    (tmp_path / LEGACY_FILE).write_text(json.dumps(legacy))
+
+    status = get_implementation_status(tmp_path)
+
+    assert status["latest"] == {"timestamp": "2025-01-08T10:11:15", "files": {"python": 3}}
+    assert status["history"] == legacy["history"]
+
+
+def test_legacy_history_migrated_once(tmp_path):
+    """Test the history of a legacy file moves into the log before newer entries."""
+    legacy = {"tests": 2, "history": [{"tests": 1}, {"tests": 2}]}
+    (tmp_path / LEGACY_FILE).write_text(json.dumps(legacy))
+
+    assert get_implementation_status(tmp_path) == {
+        "latest": {"tests": 2},
+        "history": [{"tests": 1}, {"tests": 2}],
+    }
+    track_implementation_progress({"tests": 3}, tmp_path)
+    # A copy of the legacy file left by an interrupted migration is not applied twice
+    (tmp_path / LEGACY_FILE).write_text(json.dumps(legacy))
+    assert migrate_legacy(tmp_path)
+
+    history = read_history_tail(tmp_path / HISTORY_FILE, 10)
+    assert [entry["tests"] for entry in history] == [1, 2, 3]
+    assert not (tmp_path / LEGACY_FILE).exists()
+    assert (tmp_path / (LEGACY_FILE + MIGRATED_SUFFIX)).exists()
+
+
+def test_read_history_tail_across_blocks(tmp_path, monkeypatch):
+    """Test tail reads spanning several blocks and a truncated last line."""
+    monkeypatch.setattr("src.track_implementation._TAIL_BLOCK", 16)
+    path = tmp_path / HISTORY_FILE
+    path.write_text("".join(json.dumps({"n": n}) + "\n" for n in range(50)) + '{"n": 5')
+
+    assert read_history_tail(path, 4) == [{"n": 46}, {"n": 47}, {"n": 48}, {"n": 49}]
+    assert len(read_history_tail(path, 100)) == 50
+    assert read_history_tail(tmp_path / "missing.jsonl") == []
+
+
+def test_append_compacts(tmp_path):
+    """Test the log is cut to its newest entries once it is too big."""
+    path = tmp_path / HISTORY_FILE
+    for n in range(100):
+        append_history({"n": n}, path, compact_bytes=200, keep=5)
+
+    entries = read_history_tail(path, 1000)
+    assert entries[-1] == {"n": 99}
+    assert len(entries) < 20
+    assert path.stat().st_size <= 200 + len(json.dumps({"n": 99}))
+    # Compaction moves the older entries to archives instead of dropping them
+    archived = []
+    for archive in sorted(tmp_path.glob("*.jsonl.gz")):
+        with gzip.open(archive, "rt") as f:
+            archived.extend(json.loads(line) for line in f)
+    assert archived + entries == [{"n": n} for n in range(100)]
+
+
+def test_append_after_torn_line(tmp_path):
+    """Test an entry appended after a torn last line starts a line of its own."""
+    path = tmp_path / HISTORY_FILE
+    path.write_text('{"n": 1}\n{"n": 2')
+
+    append_history({"n": 3}, path)
+
+    assert read_history_tail(path, 10) == [{"n": 1}, {"n": 3}]
+
+
+def test_write_atomic_leaves_no_temp_files(tmp_path):
+    """Test the target is replaced and no temporary file remains."""
+    target = tmp_path / "latest.json"
+    write_atomic("old", target)
+    write_atomic("new", target)
+
+    assert target.read_text() == "new"
+    assert [path.name for path in tmp_path.iterdir()] == ["latest.json"]
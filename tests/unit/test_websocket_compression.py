@@ -0,0 +1,113 @@
+"""Unit tests for shared permessage-deflate compression."""
+import asyncio
+import json
+
+import pytest
+import websockets
+from websockets.extensions.permessage_deflate import PerMessageDeflate
+from websockets.frames import OP_PING, OP_TEXT, Frame
+
+from dashboard.websocket.compression import (
+    DeflateCache,
+    SharedDeflateFactory,
+    SharedPerMessageDeflate,
+)
+
+PAYLOAD = json.dumps(
+    {"type": "metrics", "data": {f"metric_{index}": index for index in range(100)}},
+).encode()
+
+
+def extension(cache):
+    """Server side extension without context takeover."""
+    return SharedPerMessageDeflate(cache, False, True, 15, 12)
+
+
+def test_output_matches_per_connection_deflate():
+    """Test the shared output is what websockets would send and decodes back."""
+    cache = DeflateCache()
+    frame = Frame(OP_TEXT, PAYLOAD)
+
+    shared = extension(cache).encode(frame)
+    own = PerMessageDeflate(False, True, 15, 12).encode(frame)
+
+    assert shared.rsv1
+    assert shared.data == own.data
+    assert PerMessageDeflate(True, False, 12, 15).decode(shared).data == PAYLOAD
+
+
+def test_frame_compressed_once_for_all_connections():
+    """Test connections sending the same frame share one compression."""
+    cache = DeflateCache()
+    outputs = {extension(cache).encode(Frame(OP_TEXT, bytes(PAYLOAD))).data for _ in range(100)}
+
+    assert len(outputs) == 1
+    assert (cache.misses, cache.hits) == (1, 99)
+    assert cache.stats()["bytes_out"] * 3 < cache.stats()["bytes_in"]
+
+
+def test_small_and_control_frames_sent_raw():
+    """Test frames under the threshold and control frames are left alone."""
+    cache = DeflateCache(threshold=64)
+    small = Frame(OP_TEXT, b'{"type": "pong"}')
+    ping = Frame(OP_PING, PAYLOAD)
+
+    assert extension(cache).encode(small) is small
+    assert extension(cache).encode(ping) is ping
+    assert cache.raw == 1
+
+
+def test_threshold_adapts():
+    """Test the threshold rises past incompressible frames and falls back on compressible ones."""
+    cache = DeflateCache(threshold=16, max_threshold=1024)
+    noise = bytes(range(256))
+
+    assert cache.compress(noise, 12) is not None
+    assert cache.threshold == 257
+    assert cache.compress(noise, 12) is None
+    cache.compress(b"a" * 300, 12)
+    assert 16 <= cache.threshold < 257
+
+
+def test_cache_is_bounded():
+    """Test old payloads are evicted."""
+    cache = DeflateCache(maxsize=2, threshold=1)
+    for index in range(5):
+        cache.compress(b"frame %d" % index * 20, 12)
+
+    assert len(cache._cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_clients_receive_shared_frames():
+    """Test real clients negotiate the extension and decode the shared frames."""
+    cache = DeflateCache()
+    connected = []
+    done = asyncio.Event()
+
+    async def handler(websocket):
+        connected.append(websocket)
+        await done.wait()
+
+    async with websockets.serve(
+        handler, "127.0.0.1", 0, compression=None, extensions=[SharedDeflateFactory(cache)],
+    ) as server:
+        port = server.sockets[0].getsockname()[1]
+        clients = [await websockets.connect(f"ws://127.0.0.1:{port}") for _ in range(3)]
+        while len(connected) < 3:
+            await asyncio.sleep(0.01)
+        assert all(
+            "server_no_context_takeover" in client.response_headers["Sec-WebSocket-Extensions"]
+            for client in clients
+        )
+
+        text = PAYLOAD.decode()
+        await asyncio.gather(*(websocket.send(text) for websocket in connected))
+        received = [await client.recv() for client in clients]
+
+        done.set()
+        for client in clients:
+            await client.close()
+
+    assert received == [text] * 3
+    assert (cache.misses, cache.hits) == (1, 2)
@@ -0,0 +1,96 @@
+"""Unit tests for the binary WebSocket frame encoding."""
+import json
+import struct
+
+import pytest
+
+from dashboard.websocket.encoding import MetricSchema, decode_binary, encode_binary
+
+
+def test_binary_round_trip():
+    """Test numbers go through float32 and everything else through the trailer."""
+    schema = MetricSchema()
+    frame = encode_binary(
+        schema,
+        {"cpu": 12.5, "memory": 40, "healthy": True, "processes": [{"pid": 1, "name": "init"}]},
+        "2026-01-02T03:04:05",
+    )
+
+    message = decode_binary(frame, schema.names)
+
+    assert schema.names == ["cpu", "memory", ("processes", 0, "pid")]
+    assert message["delta"] is False
+    assert message["timestamp"] is not None
+    assert message["data"] == {
+        "cpu": 12.5, "memory": 40.0, "healthy": True, "processes": [{"pid": 1, "name": "init"}],
+    }
+
+
+def test_numeric_frame_layout():
+    """Test a numeric-only frame is a header, IDs and float32 values."""
+    schema = MetricSchema()
+    frame = encode_binary(schema, {"cpu": 1.0, "disk": 2.0}, delta=True)
+
+    assert len(frame) == 14 + 2 * 6
+    assert frame[:4] == b"DM\x01\x01"
+    assert struct.unpack_from("<2H2f", frame, 14) == (0, 1, 1.0, 2.0)
+    assert decode_binary(frame, schema.names)["timestamp"] is None
+
+
+def test_schema_ids_are_stable():
+    """Test names keep their IDs and new names are appended."""
+    schema = MetricSchema()
+    encode_binary(schema, {"cpu": 1.0, "memory": 2.0})
+    first_message = schema.message()
+    frame = encode_binary(schema, {"swap": 3.0, "cpu": 4.0})
+
+    assert schema.ids == {"cpu": 0, "memory": 1, "swap": 2}
+    assert json.loads(first_message) == {"type": "schema", "metrics": ["cpu", "memory"]}
+    assert json.loads(schema.message())["metrics"] == ["cpu", "memory", "swap"]
+    assert decode_binary(frame, schema.names)["data"] == {"swap": 3.0, "cpu": 4.0}
+
+
+def test_decode_rejects_bad_frames():
+    """Test foreign frames and unknown IDs are rejected."""
+    schema = MetricSchema()
+    frame = encode_binary(schema, {"cpu": 1.0})
+
+    with pytest.raises(ValueError):
+        decode_binary(b"{}", [])
+    with pytest.raises(ValueError):
+        decode_binary(b"XX" + frame[2:], schema.names)
+    with pytest.raises(ValueError):
+        decode_binary(frame, [])
+
+
+def test_binary_smaller_than_json():
+    """Test a typical numeric payload is several times smaller than JSON."""
+    data = {f"metric_{index}": index * 1.2345 for index in range(50)}
+    message = {
+        "type": "metrics", "timestamp": "2026-01-02T03:04:05.123456", "delta": False, "data": data,
+    }
+
+    frame = encode_binary(MetricSchema(), data, message["timestamp"])
+
+    assert len(frame) * 4 < len(json.dumps(message))
+
+
+def test_table_cells_packed():
+    """Test numeric cells of row lists get per-row IDs and strings stay in the trailer."""
+    schema = MetricSchema()
+    processes = [
+        {"pid": 10, "name": "init", "cpu_percent": 1.5},
+        {"pid": 20, "name": "sh", "cpu_percent": 0.5},
+    ]
+
+    frame = encode_binary(schema, {"processes": processes, "empty": []})
+
+    assert schema.names == [
+        ("processes", 0, "pid"),
+        ("processes", 0, "cpu_percent"),
+        ("processes", 1, "pid"),
+        ("processes", 1, "cpu_percent"),
+    ]
+    assert frame[14 + 6 * 4:] == b'{"processes":[{"name":"init"},{"name":"sh"}],"empty":[]}'
+    names = json.loads(schema.message())["metrics"]
+    assert decode_binary(frame, names)["data"] == {"processes": processes, "empty": []}
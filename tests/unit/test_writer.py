@@ -0,0 +1,118 @@
+"""Unit tests for the batching insert writer."""
+import queue
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.db.writer import BatchWriter
+
+COLUMNS = ["timestamp", "metric_type", "value"]
+
+
+@pytest.fixture()
+def database(tmp_path):
+    """SQLite database with the dashboard metrics table."""
+    path = tmp_path / "dashboard.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute(
+            "CREATE TABLE metrics (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL,"
+            " metric_type VARCHAR(32) NOT NULL, value FLOAT NOT NULL)",
+        )
+    return path
+
+
+def row(index):
+    """Build one metrics row."""
+    return {
+        "timestamp": f"2024-01-01 00:00:{index:02d}",
+        "metric_type": "cpu",
+        "value": float(index),
+    }
+
+
+def count_rows(path):
+    """Count rows of the metrics table."""
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+
+
+def test_batches_by_max_rows(database):
+    """Test rows are written in batches of max_rows."""
+    writer = BatchWriter(database, "metrics", COLUMNS, max_rows=5, max_latency=10)
+    for index in range(10):
+        writer.write(row(index))
+    writer.start()
+    writer.flush()
+
+    assert count_rows(database) == 10
+    assert writer.batches_written == 2
+    writer.stop()
+
+
+def test_partial_batch_written_after_max_latency(database):
+    """Test a partial batch is written once max_latency elapses."""
+    writer = BatchWriter(database, "metrics", COLUMNS, max_rows=100, max_latency=0.05)
+    writer.start()
+    writer.write(row(1))
+    started = time.monotonic()
+    writer.flush()
+
+    assert time.monotonic() - started < 1
+    assert count_rows(database) == 1
+    writer.stop()
+
+
+def test_chunks_respect_variable_limit(database):
+    """Test statements are chunked under the bound parameter limit."""
+    writer = BatchWriter(database, "metrics", COLUMNS)
+    statements = []
+    connection = sqlite3.connect(database)
+    connection.set_trace_callback(statements.append)
+
+    with patch("src.db.writer.max_variables", return_value=6):
+        writer.write_batch([row(index) for index in range(5)], connection)
+    connection.close()
+
+    inserts = [sql for sql in statements if sql.startswith("INSERT")]
+    assert len(inserts) == 3  # 2 + 2 + 1 rows of 3 parameters
+    assert statements.count("COMMIT") == 1
+    assert count_rows(database) == 5
+
+
+def test_backpressure_when_queue_full(database):
+    """Test producers block and time out while the queue is full."""
+    writer = BatchWriter(database, "metrics", COLUMNS, queue_size=1)
+    writer.write(row(1))
+
+    with pytest.raises(queue.Full):
+        writer.write(row(2), timeout=0.01)
+
+    writer.start()
+    writer.write(row(2), timeout=1)
+    writer.stop()
+    assert count_rows(database) == 2
+
+
+def test_failed_batch_does_not_stop_writer(database):
+    """Test an unexpected error drops one batch and the writer keeps draining."""
+    writer = BatchWriter(database, "metrics", COLUMNS, max_rows=1, max_latency=0.01)
+    write_batch = writer.write_batch
+    failures = [RuntimeError("boom")]
+
+    def flaky(rows, connection):
+        if failures:
+            raise failures.pop()
+        write_batch(rows, connection)
+
+    writer.start()
+    with patch.object(writer, "write_batch", side_effect=flaky):
+        writer.write(row(1))
+        writer.flush()
+        writer.write(row(2))
+        writer.flush()
+    writer.stop(timeout=1)
+
+    assert writer.rows_dropped == 1
+    assert count_rows(database) == 1